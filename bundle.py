@@ -0,0 +1,561 @@
+"""Bundle a bot and the core and common modules it uses into one file for CodinGame.
+
+Only the top-level definitions the bot actually reaches are inlined, in
+import order, and names that collide between modules are prefixed with
+their module name. Annotations, typing imports and Generic bases are
+dropped, so the submission does not pay for importing typing.
+
+usage: python bundle.py spring-challenge-2022/wind.py -o wind.bundle.py
+       python bundle.py spring-challenge-2022/main.py --check transcript.txt ...
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import tempfile
+from statistics import median
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+# core は各チャレンジの、common はリポジトリ直下の共有パッケージ
+PACKAGES: Tuple[str, ...] = ("core", "common")
+ENTRY: str = "__main__"
+TYPING: Set[str] = {"typing", "typing_extensions", "__future__"}
+STARTUP_RUNS: int = 20
+
+# 束ねたあとの名前空間で 1 つの値を指すキー
+# ("def", module, name) はモジュールで定義された名前、("import", module) と ("from", module, name) は外部の import
+Key = Tuple[str, ...]
+
+
+class Binding:
+    """What a top-level name of a module stands for."""
+
+    def __init__(self, key: Optional[Key] = None, module: Optional[str] = None, typing: bool = False):
+        self.key = key
+        self.module = module
+        self.typing = typing
+
+
+class Module:
+    def __init__(self, name: str, path: str):
+        self.name = name
+        self.path = path
+        with open(path) as f:
+            self.tree = ast.parse(f.read(), path)
+        strip_typing(self.tree)
+        self.bindings: Dict[str, Binding] = {}
+        self.statements: List[ast.stmt] = []
+        self.imports: List[str] = []
+        for statement in self.tree.body:
+            if isinstance(statement, (ast.Import, ast.ImportFrom)):
+                self.bind(statement)
+            elif is_docstring(statement) or is_main_guard(statement) and name != ENTRY:
+                continue
+            else:
+                self.statements.append(statement)
+                for defined in defined_names(statement):
+                    self.bindings[defined] = Binding(("def", name, defined))
+        self.uses: List[Set[str]] = [global_uses(statement, self.bindings) for statement in self.statements]
+
+    def bind(self, statement: Union[ast.Import, ast.ImportFrom]):
+        if isinstance(statement, ast.Import):
+            for alias in statement.names:
+                top = alias.name.split(".")[0]
+                if top in PACKAGES:
+                    raise SyntaxError(f"{self.path}:{statement.lineno}: use 'from {top} import ...'")
+                if top in TYPING:
+                    self.bindings[alias.asname or top] = Binding(typing=True)
+                elif alias.asname is None:
+                    self.bindings[top] = Binding(("import", top))
+                else:
+                    self.bindings[alias.asname] = Binding(("import", alias.name))
+            return
+        if statement.level or statement.module is None:
+            raise SyntaxError(f"{self.path}:{statement.lineno}: relative imports are not supported")
+        for alias in statement.names:
+            if alias.name == "*":
+                raise SyntaxError(f"{self.path}:{statement.lineno}: star imports are not supported")
+            name = alias.asname or alias.name
+            if statement.module in TYPING:
+                self.bindings[name] = Binding(typing=True)
+            elif statement.module in PACKAGES:
+                module = f"{statement.module}.{alias.name}"
+                self.bindings[name] = Binding(module=module)
+                self.imports.append(module)
+            elif statement.module.split(".")[0] in PACKAGES:
+                self.bindings[name] = Binding(("def", statement.module, alias.name))
+                self.imports.append(statement.module)
+            else:
+                self.bindings[name] = Binding(("from", statement.module, alias.name))
+
+
+def is_docstring(statement: ast.stmt) -> bool:
+    return isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Constant) \
+        and isinstance(statement.value.value, str)
+
+
+def is_main_guard(statement: ast.stmt) -> bool:
+    return isinstance(statement, ast.If) and isinstance(statement.test, ast.Compare) \
+        and isinstance(statement.test.left, ast.Name) and statement.test.left.id == "__name__"
+
+
+def is_typing(node: ast.expr, names: Set[str]) -> bool:
+    """Whether a class base is Generic[...] or Protocol, which only matter to type checkers."""
+    if isinstance(node, ast.Subscript):
+        node = node.value
+    if isinstance(node, ast.Attribute):
+        return node.attr in ("Generic", "Protocol")
+    return isinstance(node, ast.Name) and node.id in names and node.id in ("Generic", "Protocol")
+
+
+class TypingStripper(ast.NodeTransformer):
+    """Drop annotations and the class bases that only type checkers look at."""
+
+    def __init__(self, names: Set[str]):
+        self.names = names
+
+    def visit_arg(self, node: ast.arg) -> ast.arg:
+        node.annotation = None
+        return node
+
+    def visit_FunctionDef(self, node):
+        node.returns = None
+        self.generic_visit(node)
+        return node
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> ast.ClassDef:
+        node.bases = [base for base in node.bases if not is_typing(base, self.names)]
+        self.generic_visit(node)
+        return node
+
+    def visit_AnnAssign(self, node: ast.AnnAssign):
+        if node.value is None:
+            return None
+        return ast.copy_location(ast.Assign(targets=[node.target], value=self.visit(node.value)), node)
+
+    def generic_visit(self, node):
+        super().generic_visit(node)
+        # 注釈だけの本体が空になったら pass を置く
+        if isinstance(getattr(node, "body", None), list) and not node.body:
+            node.body = [ast.Pass()]
+        return node
+
+
+def strip_typing(tree: ast.Module):
+    names = set()
+    for statement in tree.body:
+        if isinstance(statement, ast.ImportFrom) and statement.module in TYPING:
+            names.update(alias.asname or alias.name for alias in statement.names)
+    TypingStripper(names).visit(tree)
+    ast.fix_missing_locations(tree)
+
+
+def defined_names(statement: ast.stmt) -> Set[str]:
+    """Names a top-level statement binds in the module namespace."""
+    if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return {statement.name}
+    return set(local_names(statement))
+
+
+FUNCTIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+
+def local_names(node: ast.AST) -> Iterable[str]:
+    """Names bound directly in the scope `node` belongs to, without looking into nested scopes."""
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        yield node.name
+        return
+    if isinstance(node, (ast.Lambda,) + COMPREHENSIONS):
+        return
+    if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+        yield node.id
+    elif isinstance(node, (ast.Import, ast.ImportFrom)):
+        for alias in node.names:
+            yield alias.asname or alias.name.split(".")[0]
+    elif isinstance(node, ast.ExceptHandler) and node.name:
+        yield node.name
+    elif isinstance(node, ast.NamedExpr):
+        yield node.target.id
+    for child in ast.iter_child_nodes(node):
+        yield from local_names(child)
+
+
+def scope_locals(node: ast.AST) -> Set[str]:
+    """Local names of a function, lambda or comprehension scope."""
+    names: Set[str] = set()
+    if isinstance(node, FUNCTIONS):
+        arguments = node.args
+        for arg in arguments.posonlyargs + arguments.args + arguments.kwonlyargs:
+            names.add(arg.arg)
+        for arg in (arguments.vararg, arguments.kwarg):
+            if arg is not None:
+                names.add(arg.arg)
+        body = node.body if isinstance(node.body, list) else [node.body]
+    else:
+        body = [generator.target for generator in node.generators]
+    declared: Set[str] = set()
+    for statement in body:
+        names.update(local_names(statement))
+        for child in ast.walk(statement):
+            if isinstance(child, (ast.Global, ast.Nonlocal)):
+                declared.update(child.names)
+    return names - declared
+
+
+class Scoped(ast.NodeTransformer):
+    """Visit every name that refers to the module namespace.
+
+    Function, lambda and comprehension scopes hide their locals from the
+    module, a class body hides the names it binds from its own body only.
+    Subclasses decide what to do with a global name in `global_name`.
+    """
+
+    def __init__(self):
+        # (locals, is_class)
+        self.scopes: List[Tuple[Set[str], bool]] = []
+
+    def is_global(self, name: str) -> bool:
+        for i, (names, is_class) in enumerate(reversed(self.scopes)):
+            if is_class and i > 0:
+                continue
+            if name in names:
+                return False
+        return True
+
+    def global_name(self, node: ast.AST, name: str) -> Optional[str]:
+        return None
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if self.is_global(node.id):
+            renamed = self.global_name(node, node.id)
+            if renamed is not None:
+                return ast.copy_location(ast.Name(id=renamed, ctx=node.ctx), node)
+        return node
+
+    def visit_Global(self, node: ast.Global) -> ast.Global:
+        node.names = [self.global_name(node, name) or name for name in node.names]
+        return node
+
+    def enclosing(self, nodes: List[Optional[ast.AST]]) -> List[Optional[ast.AST]]:
+        return [None if child is None else self.visit(child) for child in nodes]
+
+    def define(self, node):
+        """Rename a def or class statement the module itself binds."""
+        if not self.scopes:
+            node.name = self.global_name(node, node.name) or node.name
+
+    def visit_FunctionDef(self, node):
+        self.define(node)
+        node.decorator_list = self.enclosing(node.decorator_list)
+        node.args.defaults = self.enclosing(node.args.defaults)
+        node.args.kw_defaults = self.enclosing(node.args.kw_defaults)
+        self.scopes.append((scope_locals(node), False))
+        node.body = [self.visit(statement) for statement in node.body]
+        self.scopes.pop()
+        return node
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node: ast.Lambda) -> ast.Lambda:
+        node.args.defaults = self.enclosing(node.args.defaults)
+        node.args.kw_defaults = self.enclosing(node.args.kw_defaults)
+        self.scopes.append((scope_locals(node), False))
+        node.body = self.visit(node.body)
+        self.scopes.pop()
+        return node
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> ast.ClassDef:
+        self.define(node)
+        node.decorator_list = self.enclosing(node.decorator_list)
+        node.bases = self.enclosing(node.bases)
+        node.keywords = self.enclosing(node.keywords)
+        names: Set[str] = set()
+        for statement in node.body:
+            names.update(local_names(statement))
+        self.scopes.append((names, True))
+        node.body = [self.visit(statement) for statement in node.body]
+        self.scopes.pop()
+        return node
+
+    def visit_comprehension_scope(self, node):
+        # 最初の iter だけは外側のスコープで評価される
+        first = node.generators[0]
+        first.iter = self.visit(first.iter)
+        self.scopes.append((scope_locals(node), False))
+        for i, generator in enumerate(node.generators):
+            generator.target = self.visit(generator.target)
+            if i:
+                generator.iter = self.visit(generator.iter)
+            generator.ifs = [self.visit(condition) for condition in generator.ifs]
+        for field in ("elt", "key", "value"):
+            if hasattr(node, field):
+                setattr(node, field, self.visit(getattr(node, field)))
+        self.scopes.pop()
+        return node
+
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = visit_comprehension_scope
+
+
+class Uses(Scoped):
+    """Collect the module-level names a statement reads or writes, and `module.attr` of package modules."""
+
+    def __init__(self, bindings: Dict[str, Binding]):
+        super().__init__()
+        self.bindings = bindings
+        self.names: Set[str] = set()
+
+    def global_name(self, node, name):
+        self.names.add(name)
+        return None
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        if isinstance(node.value, ast.Name) and self.is_global(node.value.id):
+            binding = self.bindings.get(node.value.id)
+            if binding is not None and binding.module is not None:
+                self.names.add(f"{node.value.id}.{node.attr}")
+                return node
+        self.generic_visit(node)
+        return node
+
+
+def global_uses(statement: ast.stmt, bindings: Dict[str, Binding]) -> Set[str]:
+    uses = Uses(bindings)
+    uses.visit(statement)
+    return uses.names
+
+
+class Renamer(Scoped):
+    """Point every global name of a module at its name in the bundle."""
+
+    def __init__(self, module: Module, resolve, names: Dict[Key, str]):
+        super().__init__()
+        self.module = module
+        self.resolve = resolve
+        self.names = names
+
+    def renamed(self, node: ast.AST, key: Key) -> str:
+        name = self.names[key]
+        if not self.is_global(name):
+            raise NameError(f"{self.module.path}:{node.lineno}: '{name}' is shadowed by a local name")
+        return name
+
+    def global_name(self, node, name):
+        binding = self.module.bindings.get(name)
+        if binding is None or binding.key is None:
+            return None
+        return self.renamed(node, self.resolve(binding.key))
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        if isinstance(node.value, ast.Name) and self.is_global(node.value.id):
+            binding = self.module.bindings.get(node.value.id)
+            if binding is not None and binding.module is not None:
+                if not isinstance(node.ctx, ast.Load) and self.scopes:
+                    # 1 つの名前空間にすると関数内の代入はローカル変数になってしまう
+                    raise SyntaxError(f"{self.module.path}:{node.lineno}: cannot assign to a package module attribute")
+                name = self.renamed(node, self.resolve(("def", binding.module, node.attr)))
+                return ast.copy_location(ast.Name(id=name, ctx=node.ctx), node)
+        self.generic_visit(node)
+        return node
+
+
+class Bundle:
+    def __init__(self, entry: str):
+        self.root = os.path.dirname(os.path.abspath(entry))
+        self.modules: Dict[str, Module] = {}
+        # import の実行順、依存先が先
+        self.order: List[str] = []
+        self.load(ENTRY, os.path.abspath(entry), [])
+
+    def load(self, name: str, path: str, stack: List[str]):
+        if name in stack:
+            raise ImportError(f"circular import: {' -> '.join(stack + [name])}")
+        if name in self.modules:
+            return
+        module = self.modules[name] = Module(name, path)
+        for imported in module.imports:
+            self.load(imported, self.locate(imported), stack + [name])
+        self.order.append(name)
+
+    def locate(self, name: str) -> str:
+        """Path of a package module, the package next to the entry or the nearest one above it."""
+        parts = name.split(".")
+        directory = self.root
+        while not os.path.isfile(os.path.join(directory, parts[0], "__init__.py")):
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                raise ImportError(f"no package '{parts[0]}' next to or above {self.root}")
+            directory = parent
+        return os.path.join(directory, *parts) + ".py"
+
+    def resolve(self, key: Key) -> Key:
+        """Follow `from core.x import y` re-exports to where y is defined."""
+        seen = set()
+        while key[0] == "def" and key[1] in self.modules:
+            binding = self.modules[key[1]].bindings.get(key[2])
+            if binding is None:
+                raise ImportError(f"cannot import name '{key[2]}' from '{key[1]}'")
+            if binding.key is None or binding.key == key or key in seen:
+                return key
+            seen.add(key)
+            key = binding.key
+        return key
+
+    def reachable(self) -> Tuple[Dict[str, Set[int]], List[Key]]:
+        """Statements of each module the entry needs and the outside imports they use."""
+        used: Dict[str, Set[int]] = {name: set() for name in self.modules}
+        externals: List[Key] = []
+        pending = [(ENTRY, i) for i in range(len(self.modules[ENTRY].statements))]
+        # 副作用のある文はモジュールを使うなら必ず残す
+        touched: Set[str] = {ENTRY}
+        while pending:
+            name, i = pending.pop()
+            if i in used[name]:
+                continue
+            used[name].add(i)
+            module = self.modules[name]
+            for use in module.uses[i]:
+                if "." in use:
+                    alias, attr = use.split(".", 1)
+                    key = self.resolve(("def", module.bindings[alias].module, attr))
+                else:
+                    binding = module.bindings.get(use)
+                    if binding is None or binding.key is None:
+                        if binding is not None and binding.typing:
+                            raise NameError(f"{module.path}: '{use}' from typing is used at run time")
+                        continue
+                    key = self.resolve(binding.key)
+                if key[0] != "def":
+                    if key not in externals:
+                        externals.append(key)
+                    continue
+                owner = self.modules[key[1]]
+                if key[1] not in touched:
+                    touched.add(key[1])
+                    pending.extend((key[1], j) for j, statement in enumerate(owner.statements)
+                                   if not defined_names(statement))
+                pending.extend((key[1], j) for j, statement in enumerate(owner.statements)
+                               if key[2] in defined_names(statement))
+        return used, externals
+
+    def names(self, used: Dict[str, Set[int]], externals: List[Key]) -> Dict[Key, str]:
+        """Name of every kept definition and outside import in the bundle; the entry keeps its own names."""
+        names: Dict[Key, str] = {}
+        taken: Set[str] = set()
+
+        def claim(key: Key, name: str, prefix: str):
+            if key in names:
+                return
+            candidate = name
+            while candidate in taken:
+                candidate = f"{prefix}_{candidate}"
+            names[key] = candidate
+            taken.add(candidate)
+
+        for module_name in [ENTRY] + self.order:
+            module = self.modules[module_name]
+            prefix = module_name.rsplit(".", 1)[-1].strip("_")
+            for local, binding in module.bindings.items():
+                if binding.key is None:
+                    continue
+                key = self.resolve(binding.key)
+                if key in externals:
+                    claim(key, local, prefix)
+                elif key[0] == "def" and key[1] == module_name and any(
+                        local in defined_names(module.statements[i]) for i in used[module_name]):
+                    claim(key, local, prefix)
+        return names
+
+    def source(self, header: str) -> str:
+        used, externals = self.reachable()
+        names = self.names(used, externals)
+        lines = [header]
+        grouped: Dict[str, List[str]] = {}
+        for key in externals:
+            name = names[key]
+            if key[0] == "import":
+                lines.append(f"import {key[1]}" if name == key[1] else f"import {key[1]} as {name}")
+            else:
+                grouped.setdefault(key[1], []).append(key[2] if name == key[2] else f"{key[2]} as {name}")
+        for module_name, imported in grouped.items():
+            lines.append(f"from {module_name} import {', '.join(imported)}")
+        for module_name in self.order:
+            module = self.modules[module_name]
+            statements = [module.statements[i] for i in sorted(used[module_name])]
+            if not statements:
+                continue
+            renamer = Renamer(module, self.resolve, names)
+            body = ast.Module(body=[renamer.visit(statement) for statement in statements], type_ignores=[])
+            lines.append("")
+            if module_name != ENTRY:
+                lines.append(f"# {module_name}")
+            lines.append(ast.unparse(ast.fix_missing_locations(body)))
+        return "\n".join(lines) + "\n"
+
+
+def bundle(entry: str) -> str:
+    source = Bundle(entry).source(
+        f"# Generated by bundle.py from {os.path.relpath(entry)}; edit the sources instead.")
+    # 出力が Python として読めることを確かめておく
+    compile(source, entry, "exec")
+    return source
+
+
+def run(path: str, stdin: bytes) -> bytes:
+    path = os.path.abspath(path)
+    return subprocess.run([sys.executable, path], input=stdin, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                          cwd=os.path.dirname(path)).stdout
+
+
+def startup(path: str) -> float:
+    """Median seconds for the bot to start and exit on empty input."""
+    times = []
+    for _ in range(STARTUP_RUNS):
+        start = perf_counter()
+        run(path, b"")
+        times.append(perf_counter() - start)
+    return median(times)
+
+
+def check(entry: str, output: str, transcripts: List[str]) -> bool:
+    """Play the transcripts through both and compare what they print."""
+    same = True
+    for transcript in transcripts:
+        with open(transcript, "rb") as f:
+            stdin = f.read()
+        if run(entry, stdin) != run(output, stdin):
+            print(f"{transcript}: outputs differ", file=sys.stderr)
+            same = False
+    print(f"{len(transcripts)} transcripts {'identical' if same else 'DIFFER'}; startup "
+          f"{startup(entry) * 1000:.1f}ms -> {startup(output) * 1000:.1f}ms", file=sys.stderr)
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("entry", help="bot to bundle, next to its core package and below common")
+    parser.add_argument("-o", "--output", help="file to write, stdout if omitted")
+    parser.add_argument("--check", nargs="+", metavar="TRANSCRIPT",
+                        help="also run source and bundle on these inputs and compare")
+    args = parser.parse_args()
+    source = bundle(args.entry)
+    if args.output is None and not args.check:
+        sys.stdout.write(source)
+        return
+    output = args.output or tempfile.mkstemp(suffix=".py")[1]
+    with open(output, "w") as f:
+        f.write(source)
+    try:
+        if args.check and not check(args.entry, output, args.check):
+            sys.exit(1)
+    finally:
+        if args.output is None:
+            os.remove(output)
+
+
+if __name__ == "__main__":
+    main()
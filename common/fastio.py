@@ -0,0 +1,80 @@
+import os
+import sys
+from array import array
+from typing import List, Optional, Tuple
+
+from common.recorder import open_recorder
+
+CHUNK: int = 1 << 16
+WHITESPACE: bytes = b" \t\r\n"
+
+
+class IntReader:
+    """Whitespace-separated integers read from stdin in bulk.
+
+    Every `os.read` takes whatever the referee has already written, so a
+    whole turn usually arrives in one call and is parsed into a single
+    array. Only integer input is supported; don't mix with `input()`, the
+    bytes consumed here never reach `sys.stdin`.
+
+    With BOT_RECORD set, everything read and printed is also recorded to
+    that file (see common/recorder.py).
+    """
+
+    def __init__(self, fd: Optional[int] = None):
+        self.fd = sys.stdin.fileno() if fd is None else fd
+        self.values = array("q")
+        self.pos = 0
+        self.tail = b""
+        self.recorder = open_recorder()
+
+    def feed(self, data: bytes):
+        data = self.tail + data
+        cut = len(data)
+        while cut and data[cut - 1] not in WHITESPACE:
+            cut -= 1
+        self.tail = data[cut:]
+        if self.pos:
+            del self.values[:self.pos]
+            self.pos = 0
+        self.values.extend(map(int, data[:cut].split()))
+
+    def read(self) -> bytes:
+        return os.read(self.fd, CHUNK)
+
+    def fill(self, n: int):
+        while len(self.values) - self.pos < n:
+            data = self.read()
+            if not data:
+                if self.tail:
+                    data, self.tail = self.tail + b"\n", b""
+                    self.feed(data)
+                    continue
+                raise EOFError("EOF when reading integers")
+            self.feed(data)
+
+    def int(self) -> int:
+        self.fill(1)
+        self.pos += 1
+        value = self.values[self.pos - 1]
+        if self.recorder is not None:
+            self.recorder.ints([value])
+        return value
+
+    def take(self, n: int) -> List[int]:
+        self.fill(n)
+        self.pos += n
+        return self.values[self.pos - n:self.pos].tolist()
+
+    def ints(self, n: int) -> List[int]:
+        values = self.take(n)
+        if self.recorder is not None:
+            self.recorder.ints(values)
+        return values
+
+    def rows(self, count: int, width: int) -> List[Tuple[int, ...]]:
+        values = iter(self.take(count * width))
+        rows = list(zip(*[values] * width))
+        if self.recorder is not None:
+            self.recorder.rows(rows, width)
+        return rows
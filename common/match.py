@@ -0,0 +1,111 @@
+import os
+import select
+import subprocess
+import sys
+from typing import List, Optional
+
+FIRST_TURN_TIMEOUT: float = 5.0
+TURN_TIMEOUT: float = 1.0
+# 標準入力を閉じてから終了を待つ時間
+CLOSE_TIMEOUT: float = 1.0
+
+
+class BotProcess:
+    """A bot running as a subprocess for the whole match.
+
+    Every match starts its bots afresh instead of keeping one process per
+    worker and resetting it. The bots are the files submitted to the game:
+    they read the initial input once and keep module and class state, such
+    as hero ids, registries and memory, until EOF, so a reset would be a
+    protocol the real game never exercises. A match lost on a timeout also
+    leaves the bot mid-turn with output pending, and the recording,
+    profiling and tuned parameters are read from the environment at start.
+    """
+
+    def __init__(self, command: List[str], env: Optional[dict] = None, stderr: bool = False):
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=None if stderr else subprocess.DEVNULL,
+            env=None if env is None else {**os.environ, **env},
+        )
+        self.buffer = b""
+
+    def send(self, lines: List[str]):
+        self.process.stdin.write(("\n".join(lines) + "\n").encode())
+        self.process.stdin.flush()
+
+    def receive(self, count: int, timeout: float) -> List[str]:
+        fd = self.process.stdout.fileno()
+        lines = []
+        while len(lines) < count:
+            while b"\n" not in self.buffer:
+                if not select.select([fd], [], [], timeout)[0]:
+                    raise TimeoutError
+                chunk = os.read(fd, 1 << 16)
+                if not chunk:
+                    raise EOFError
+                self.buffer += chunk
+            line, _, self.buffer = self.buffer.partition(b"\n")
+            lines.append(line.decode().strip())
+        return lines
+
+    def close(self):
+        # EOF を渡して、計測や記録のレポートを書き出す時間を与えてから止める
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(CLOSE_TIMEOUT)
+            except (BrokenPipeError, subprocess.TimeoutExpired):
+                self.process.kill()
+        self.process.wait()
+
+
+class Result:
+    """How a match ended, with the totals the referee's `summary()` reports."""
+
+    def __init__(self, referee, winner: int, reason: str):
+        self.winner = winner
+        self.reason = reason
+        self.turns = referee.turn
+        self.summary = referee.summary()
+        self.errors = referee.errors
+
+    def __str__(self):
+        totals = " ".join(f"{name}={value}" for name, value in self.summary.items())
+        return f"winner={self.winner} reason={self.reason} turns={self.turns} {totals}"
+
+
+def bot_command(path: str) -> List[str]:
+    return [sys.executable, "-u", path]
+
+
+def play_match(referee, bot1: str, bot2: str, envs: Optional[List[Optional[dict]]] = None,
+               stderr: bool = False) -> Result:
+    """Play a match of two bot files under a challenge's referee.
+
+    The referee gives each player's `initial_input` and `turn_input`,
+    takes `ACTION_LINES` output lines per player and turn in `play_turn`,
+    and tells `is_over`, `winner` and its `summary` totals. A player that
+    crashes or times out loses.
+    """
+    envs = envs or [None, None]
+    bots = [BotProcess(bot_command(path), env, stderr) for path, env in zip((bot1, bot2), envs)]
+    try:
+        for player, bot in enumerate(bots):
+            bot.send(referee.initial_input(player))
+        while not referee.is_over():
+            actions = []
+            timeout = FIRST_TURN_TIMEOUT if referee.turn == 0 else TURN_TIMEOUT
+            for player, bot in enumerate(bots):
+                try:
+                    bot.send(referee.turn_input(player))
+                    actions.append(bot.receive(referee.ACTION_LINES, timeout))
+                except (EOFError, TimeoutError, BrokenPipeError) as e:
+                    return Result(referee, 1 - player, f"player {player} {type(e).__name__}")
+            referee.play_turn(actions)
+        return Result(referee, referee.winner(), "end")
+    finally:
+        for bot in bots:
+            bot.close()
@@ -0,0 +1,147 @@
+import atexit
+import os
+import sys
+from collections import Counter
+from typing import Iterable, Optional, Tuple
+
+ENV_VAR: str = "BOT_PROFILE"
+TOP: int = 25
+
+
+def lookup(owner, name: str):
+    # モジュールの関数は globals() を渡してもらう、sys.modules から引くと replay.py で読み込んだときに見つからない
+    return owner[name] if isinstance(owner, dict) else getattr(owner, name)
+
+
+def rebind(owner, name: str, value):
+    if isinstance(owner, dict):
+        owner[name] = value
+    else:
+        setattr(owner, name, value)
+
+
+class Profiler:
+    """cProfile over every `every`-th turn plus counts of the actions taken.
+
+    `count` wraps action methods such as `move` or `push_back` so each call
+    is tallied by the function and line it was called from. That tells
+    "move to center" from "move to next_point" without touching the
+    decision code. Nothing is wrapped unless profiling is switched on.
+    """
+
+    def __init__(self, every: int, path: Optional[str] = None):
+        # 読み込みに時間がかかるので、プロファイルするときだけ import する
+        import cProfile
+        self.every = max(1, every)
+        self.path = path
+        self.profile = cProfile.Profile()
+        self.turn = 0
+        self.sampled = 0
+        self.branches: Counter = Counter()
+        self.reported = False
+
+    def start_turn(self):
+        if self.turn % self.every == 0:
+            self.sampled += 1
+            self.profile.enable()
+
+    def end_turn(self):
+        if self.turn % self.every == 0:
+            self.profile.disable()
+        self.turn += 1
+
+    def hook(self, timer):
+        """Profile the span between the timer's start_turn and end_turn."""
+        start_turn, end_turn = timer.start_turn, timer.end_turn
+
+        def started():
+            start_turn()
+            self.start_turn()
+
+        def ended():
+            self.end_turn()
+            end_turn()
+
+        timer.start_turn, timer.end_turn = started, ended
+
+    def sample(self, owner, name: str):
+        """Profile every `every`-th call of `owner.name` as one turn."""
+        function = lookup(owner, name)
+
+        def sampled(*args, **kwargs):
+            self.start_turn()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.end_turn()
+
+        rebind(owner, name, sampled)
+
+    def count(self, owner, names: Iterable[str]):
+        for name in names:
+            rebind(owner, name, self.counted(lookup(owner, name), name))
+
+    def counted(self, function, name: str):
+        branches = self.branches
+
+        def counted(*args, **kwargs):
+            frame = sys._getframe(1)
+            code = frame.f_code
+            branches[getattr(code, "co_qualname", code.co_name), code.co_filename, frame.f_lineno, name] += 1
+            return function(*args, **kwargs)
+
+        return counted
+
+    def format(self) -> str:
+        import io
+        import linecache
+        import pstats
+        out = io.StringIO()
+        out.write(f"profiled {self.sampled} of {self.turn} turns\n")
+        if self.sampled:
+            stats = pstats.Stats(self.profile, stream=out)
+            stats.sort_stats("cumulative").print_stats(TOP)
+        if self.branches:
+            out.write("branches:\n")
+            for (caller, filename, line, name), count in self.branches.most_common():
+                source = linecache.getline(filename, line).strip()
+                out.write(f"{count:8d}  {caller}:{line} {name}  {source}\n")
+        return out.getvalue()
+
+    def report(self):
+        if self.reported:
+            return
+        self.reported = True
+        if self.path is None:
+            print(self.format(), file=sys.stderr, flush=True)
+        else:
+            with open(self.path, "w") as f:
+                f.write(self.format())
+
+
+def from_env(variable: str = ENV_VAR) -> Optional[Profiler]:
+    """`N` profiles every N-th turn to stderr, `N:path` writes to path ({pid} expanded)."""
+    value = os.environ.get(variable)
+    if not value:
+        return None
+    every, _, path = value.partition(":")
+    return Profiler(int(every), path.format(pid=os.getpid()) if path else None)
+
+
+def install(timer=None, functions: Iterable[Tuple[object, str]] = (),
+            branches: Iterable[Tuple[object, Iterable[str]]] = ()) -> Optional[Profiler]:
+    """Switch profiling on if the environment asks for it, otherwise do nothing.
+
+    Owners are classes, or a bot's `globals()` for its own module-level functions.
+    """
+    profiler = from_env()
+    if profiler is None:
+        return None
+    if timer is not None:
+        profiler.hook(timer)
+    for owner, name in functions:
+        profiler.sample(owner, name)
+    for owner, names in branches:
+        profiler.count(owner, names)
+    atexit.register(profiler.report)
+    return profiler
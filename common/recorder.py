@@ -0,0 +1,237 @@
+import atexit
+import os
+import sys
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+ENV_VAR: str = "BOT_RECORD"
+MAGIC: bytes = b"RPL1"
+
+# レコードの種類
+INTS: int = 0
+ROWS: int = 1
+OUTPUT: int = 2
+
+Row = Tuple[int, ...]
+Read = Union[List[int], Tuple[int, List[Row]]]
+
+
+def zigzag(n: int) -> int:
+    return n << 1 if n >= 0 else (-n << 1) - 1
+
+
+def unzigzag(z: int) -> int:
+    return z >> 1 if z & 1 == 0 else -((z + 1) >> 1)
+
+
+def put(out: bytearray, n: int):
+    while n >= 0x80:
+        out.append(n & 0x7f | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def keyed(rows: Sequence[Row], reference: Sequence[Row]) -> bool:
+    # 先頭の列がどちらのターンでも重複しなければ ID とみなして行を対応付ける
+    return bool(reference) and len({row[0] for row in rows}) == len(rows) \
+        and len({row[0] for row in reference}) == len(reference)
+
+
+def reference_rows(rows: Sequence[Row], reference: Sequence[Row], width: int) -> List[Row]:
+    zero = (0,) * width
+    if keyed(rows, reference):
+        by_key = {row[0]: row for row in reference}
+        return [by_key.get(row[0], zero) for row in rows]
+    return [reference[i] if i < len(reference) else zero for i in range(len(rows))]
+
+
+class Recorder:
+    """Writes what a bot reads and prints as delta-encoded frames.
+
+    A frame is every read since the previous frame followed by the lines
+    printed, so it normally holds one turn. Each read is stored as zigzag
+    varint differences from the read at the same position of the previous
+    frame; rows are matched by their first column when it is unique, so
+    entity rows line up by id however the referee orders them. Frames are
+    flushed through zlib one by one, so a killed bot still leaves a
+    readable file up to its last complete turn.
+    """
+
+    def __init__(self, path: str):
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.compressor = zlib.compressobj(9)
+        self.previous: List[Read] = []
+        self.current: List[Read] = []
+        self.buffer = bytearray()
+        self.lines: List[str] = []
+        self.partial = ""
+        atexit.register(self.close)
+
+    def reference(self) -> Optional[Read]:
+        i = len(self.current)
+        return self.previous[i] if i < len(self.previous) else None
+
+    def ints(self, values: List[int]):
+        if self.lines:
+            self.end_frame()
+        reference = self.reference()
+        if not isinstance(reference, list) or len(reference) != len(values):
+            reference = [0] * len(values)
+        put(self.buffer, INTS)
+        put(self.buffer, len(values))
+        for value, base in zip(values, reference):
+            put(self.buffer, zigzag(value - base))
+        self.current.append(values)
+
+    def rows(self, rows: List[Row], width: int):
+        if self.lines:
+            self.end_frame()
+        reference = self.reference()
+        reference = reference[1] if isinstance(reference, tuple) and reference[0] == width else []
+        put(self.buffer, ROWS)
+        put(self.buffer, len(rows))
+        put(self.buffer, width)
+        for i, row in enumerate(rows):
+            put(self.buffer, zigzag(row[0] - (reference[i][0] if i < len(reference) else 0)))
+        for row, base in zip(rows, reference_rows(rows, reference, width)):
+            for value, b in zip(row[1:], base[1:]):
+                put(self.buffer, zigzag(value - b))
+        self.current.append((width, rows))
+
+    def write(self, text: str):
+        lines = (self.partial + text).split("\n")
+        self.partial = lines.pop()
+        self.lines.extend(lines)
+
+    def end_frame(self):
+        put(self.buffer, OUTPUT)
+        put(self.buffer, len(self.lines))
+        for line in self.lines:
+            data = line.encode()
+            put(self.buffer, len(data))
+            self.buffer.extend(data)
+        self.file.write(self.compressor.compress(bytes(self.buffer)))
+        self.file.write(self.compressor.flush(zlib.Z_SYNC_FLUSH))
+        self.file.flush()
+        self.buffer.clear()
+        self.lines = []
+        self.previous, self.current = self.current, []
+
+    def close(self):
+        if self.file.closed:
+            return
+        if self.current or self.lines:
+            self.end_frame()
+        self.file.write(self.compressor.flush())
+        self.file.close()
+
+
+class Tee:
+    """Stands in for sys.stdout and hands every write to the recorder too."""
+
+    def __init__(self, stream, recorder: Recorder):
+        self.stream = stream
+        self.recorder = recorder
+
+    def write(self, text: str) -> int:
+        self.recorder.write(text)
+        return self.stream.write(text)
+
+    def __getattr__(self, name: str):
+        return getattr(self.stream, name)
+
+
+def open_recorder(variable: str = ENV_VAR) -> Optional[Recorder]:
+    """A recorder on the path in the environment, `{pid}` expanded, if set."""
+    path = os.environ.get(variable)
+    if not path:
+        return None
+    recorder = Recorder(path.format(pid=os.getpid()))
+    sys.stdout = Tee(sys.stdout, recorder)
+    return recorder
+
+
+class Frame:
+    def __init__(self, reads: List[Read], output: List[str]):
+        self.reads = reads
+        self.output = output
+
+    def text(self) -> str:
+        lines = []
+        for read in self.reads:
+            if isinstance(read, list):
+                lines.append(" ".join(map(str, read)))
+            else:
+                lines.extend(" ".join(map(str, row)) for row in read[1])
+        return "\n".join(lines) + "\n"
+
+
+class Decoder:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def get(self) -> int:
+        n, shift = 0, 0
+        while True:
+            byte = self.data[self.pos]
+            self.pos += 1
+            n |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return n
+            shift += 7
+
+    def signed(self) -> int:
+        return unzigzag(self.get())
+
+
+def load(path: str) -> List[Frame]:
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path}: not a replay file")
+    # 強制終了で末尾が欠けていても、そこまでのフレームは読める
+    decoder = Decoder(zlib.decompressobj().decompress(data[len(MAGIC):]))
+    frames = []
+    previous: List[Read] = []
+    current: List[Read] = []
+    try:
+        while decoder.pos < len(decoder.data):
+            kind = decoder.get()
+            i = len(current)
+            reference = previous[i] if i < len(previous) else None
+            if kind == INTS:
+                n = decoder.get()
+                if not isinstance(reference, list) or len(reference) != n:
+                    reference = [0] * n
+                current.append([base + decoder.signed() for base in reference])
+            elif kind == ROWS:
+                count, width = decoder.get(), decoder.get()
+                reference = reference[1] if isinstance(reference, tuple) and reference[0] == width else []
+                keys = [(reference[j][0] if j < len(reference) else 0) + decoder.signed() for j in range(count)]
+                bases = reference_rows([(key,) for key in keys], reference, width)
+                rows = [(key, *(b + decoder.signed() for b in base[1:])) for key, base in zip(keys, bases)]
+                current.append((width, rows))
+            elif kind == OUTPUT:
+                output = []
+                for _ in range(decoder.get()):
+                    n = decoder.get()
+                    output.append(decoder.data[decoder.pos:decoder.pos + n].decode())
+                    decoder.pos += n
+                frames.append(Frame(current, output))
+                previous, current = current, []
+            else:
+                raise ValueError(f"{path}: unknown record {kind}")
+    except IndexError:
+        pass
+    return frames
+
+
+def stats(frames: Sequence[Frame]) -> Dict[str, int]:
+    return {
+        "frames": len(frames),
+        "values": sum(len(read) if isinstance(read, list) else len(read[1]) * read[0]
+                      for frame in frames for read in frame.reads),
+        "lines": sum(len(frame.output) for frame in frames),
+    }
@@ -0,0 +1,93 @@
+import argparse
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+from time import perf_counter
+from typing import List, Optional, Sequence
+
+from common.recorder import ENV_VAR, Frame, load, stats
+
+MODULE: str = "replayed_bot"
+
+
+def fresh_module(path: str):
+    # Hero._count などモジュールの状態を持ち越さないよう、毎回読み込み直す
+    for name in [name for name in sys.modules if name == "core" or name.startswith("core.")]:
+        del sys.modules[name]
+    # core はボットの隣にあるものを読む
+    directory = os.path.dirname(os.path.abspath(path))
+    if sys.path[0] != directory:
+        sys.path.insert(0, directory)
+    spec = importlib.util.spec_from_file_location(MODULE, path)
+    module = importlib.util.module_from_spec(spec)
+    # 普通の import と同じく、実行中のモジュールも sys.modules から引けるようにしておく
+    sys.modules[MODULE] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def drive(path: str, frames: Sequence[Frame]) -> List[str]:
+    """Run the bot's main() in-process on the recorded input; returns its output lines."""
+    os.environ.pop(ENV_VAR, None)
+    module = fresh_module(path)
+    with tempfile.TemporaryFile() as f:
+        f.write("".join(frame.text() for frame in frames).encode())
+        f.seek(0)
+        stdin, stdout = os.dup(0), sys.stdout
+        os.dup2(f.fileno(), 0)
+        sys.stdout = io.StringIO()
+        try:
+            module.main()
+        except EOFError:
+            pass
+        finally:
+            output = sys.stdout.getvalue()
+            sys.stdout = stdout
+            os.dup2(stdin, 0)
+            os.close(stdin)
+    return output.splitlines()
+
+
+def first_mismatch(frames: Sequence[Frame], output: List[str]) -> Optional[int]:
+    pos = 0
+    for turn, frame in enumerate(frames):
+        if output[pos:pos + len(frame.output)] != frame.output:
+            return turn
+        pos += len(frame.output)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m common.replay",
+                                     description="Replay a recorded game through a bot as fast as it can go.")
+    parser.add_argument("recording", help=f"file written by a bot run with {ENV_VAR}=path")
+    parser.add_argument("bot")
+    parser.add_argument("-t", "--turns", type=int, help="replay only the first turns")
+    parser.add_argument("-r", "--repeat", type=int, default=1)
+    args = parser.parse_args()
+    frames = load(args.recording)[:args.turns]
+    print(" ".join(f"{key}={value}" for key, value in stats(frames).items()), file=sys.stderr)
+    times = []
+    output = []
+    for _ in range(args.repeat):
+        started = perf_counter()
+        output = drive(args.bot, frames)
+        times.append(perf_counter() - started)
+    best = min(times)
+    print(f"best of {len(times)}: {best * 1000:.1f}ms, {best / max(1, len(frames)) * 1000:.3f}ms/turn",
+          file=sys.stderr)
+    turn = first_mismatch(frames, output)
+    if turn is None:
+        print("output matches the recording", file=sys.stderr)
+        return
+    print(f"output differs from turn {turn}:", file=sys.stderr)
+    start = sum(len(frame.output) for frame in frames[:turn])
+    for expected, actual in zip(frames[turn].output, output[start:]):
+        print(f"  recorded {expected!r} replayed {actual!r}", file=sys.stderr)
+    sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+import atexit
+import sys
+from collections import deque
+from time import perf_counter
+from typing import Callable, List
+
+# 既定値は 2022 の制限 (1 ターン 50ms、初回 1000ms、220 ターン) に合わせてある
+TURN_BUDGET: float = 0.045
+FIRST_TURN_BUDGET: float = 0.9
+MAX_TURNS: int = 220
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summary(name: str, values: List[float]) -> str:
+    return (f"{name} n={len(values)} p50={percentile(values, 0.5) * 1000:.2f}ms "
+            f"p95={percentile(values, 0.95) * 1000:.2f}ms max={max(values, default=0) * 1000:.2f}ms")
+
+
+def histogram(values: List[float]) -> str:
+    # 0.5ms, 1ms, 2ms, ... と倍々の区間で数える
+    bounds = [0.0005 * 2 ** i for i in range(8)]
+    counts = [0] * (len(bounds) + 1)
+    for value in values:
+        i = 0
+        while i < len(bounds) and value >= bounds[i]:
+            i += 1
+        counts[i] += 1
+    labels = [f"<{b * 1000:g}" for b in bounds] + [f">={bounds[-1] * 1000:g}"]
+    return " ".join(f"{label}:{count}" for label, count in zip(labels, counts) if count)
+
+
+class TurnTimer:
+    """Wall-clock bookkeeping for the per-turn time limit.
+
+    `decide` runs one decision (a hero's action, say) unless the time
+    already spent this turn plus the slowest recent decision would overrun
+    the budget, in which case it returns the precomputed fallback instead.
+    """
+
+    def __init__(self, budget: float = TURN_BUDGET, first_budget: float = FIRST_TURN_BUDGET,
+                 last_turn: int = MAX_TURNS):
+        self.budget = budget
+        self.first_budget = first_budget
+        self.last_turn = last_turn
+        self.turn = 0
+        self.started = 0.0
+        self.turns: List[float] = []
+        self.decisions: List[float] = []
+        self.recent = deque(maxlen=16)
+        self.fallbacks = 0
+        self.reported = False
+        atexit.register(self.report)
+
+    def start_turn(self):
+        self.started = perf_counter()
+
+    def remaining(self) -> float:
+        budget = self.first_budget if self.turn == 0 else self.budget
+        return budget - (perf_counter() - self.started)
+
+    def decide(self, decide: Callable[[], str], fallback: Callable[[], str]) -> str:
+        if self.recent and max(self.recent) > self.remaining():
+            self.fallbacks += 1
+            return fallback()
+        started = perf_counter()
+        action = decide()
+        elapsed = perf_counter() - started
+        self.decisions.append(elapsed)
+        self.recent.append(elapsed)
+        return action
+
+    def end_turn(self):
+        self.turns.append(perf_counter() - self.started)
+        self.turn += 1
+        if self.turn >= self.last_turn:
+            self.report()
+
+    def report(self):
+        if self.reported or not self.turns:
+            return
+        self.reported = True
+        print(summary("turn", self.turns), histogram(self.turns), file=sys.stderr, flush=True)
+        if self.decisions:
+            print(summary("decision", self.decisions), f"fallbacks={self.fallbacks}", file=sys.stderr, flush=True)
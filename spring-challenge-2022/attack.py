@@ -1,29 +1,14 @@
-from math import sqrt, pi, cos, sin, atan2
+from math import pi, cos, sin
 from operator import attrgetter
 from typing import List, Union
 
-Number = Union[int, float]
-
-WIDTH: int = 17630
-HEIGHT: int = 9000
-BASE_RADIUS = 6000
-SEARCH_RADIUS = 2200
-WIND_RADIUS = 1280
-
-
-def distance(x1: int, y1: int, x2: int, y2: int) -> float:
-    return sqrt((x1 - x2)**2 + (y1 - y2)**2)
-
-
-class Point:
-    def __init__(self, x: Number, y: Number):
-        self.x = max(0, min(round(x), WIDTH))
-        self.y = max(0, min(round(y), HEIGHT))
-        self.distance = distance(self.x, self.y, 0, 0)
-
-    def __str__(self):
-        return f"({self.x}, {self.y})"
-
+from common import profiling
+from common.fastio import IntReader
+from common.timing import TurnTimer
+from core import commands, model
+from core.constants import BASE_RADIUS, HEIGHT, SEARCH_RADIUS, WIDTH, WIND_RADIUS
+from core.model import Base, Enemy, Monster, Point, distance
+from core.registry import Registry
 
 POSITION = [
     Point(WIDTH - BASE_RADIUS * cos(pi / 4), HEIGHT - BASE_RADIUS * sin(pi / 4)),
@@ -32,59 +17,6 @@ POSITION = [
 ]
 
 
-class Base:
-    def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
-        self.side = [0, 1][self.y > 4500]
-        self.health = 0
-        self.mana = 0
-
-    def update(self, health: int, mana: int):
-        self.health = health
-        self.mana = mana
-
-    def spell(self):
-        self.mana -= 10
-
-    def has_mana(self):
-        return self.mana >= 10
-
-
-class Monster:
-    def __init__(
-            self,
-            entity_id: int,
-            x: int,
-            y: int,
-            shield: int,
-            is_controlled,
-            health: int,
-            vx: int,
-            vy: int,
-            base: Base
-    ):
-        self.id = entity_id
-        self.x = x if base.side == 0 else WIDTH - x
-        self.y = y if base.side == 0 else HEIGHT - y
-        self.shield = shield
-        self.is_controlled = is_controlled == 1
-        self.health = health
-        self.vx = vx if base.side == 0 else -vx
-        self.vy = vy if base.side == 0 else -vy
-        self.distance = distance(self.x, self.y, WIDTH, HEIGHT)
-        self.next_point = Point(self.x + self.vx, self.y + self.vy)
-
-
-class Enemy:
-    def __init__(self, entity_id: int, x: int, y: int, shield, is_controlled, base: Base):
-        self.id = entity_id
-        self.x = x if base.side == 0 else WIDTH - x
-        self.y = y if base.side == 0 else HEIGHT - y
-        self.shield = shield
-        self.is_controlled = is_controlled == 1
-
-
 class Command:
     def __init__(self, hero, base: Base):
         self.hero = hero
@@ -94,24 +26,15 @@ class Command:
         pass
 
     def move(self, target: Point) -> str:
-        if self.base.side == 0:
-            return f"MOVE {target.x} {target.y}"
-        else:
-            return f"MOVE {WIDTH - target.x} {HEIGHT - target.y}"
+        return commands.move(self.base.side, target.x, target.y)
 
     def wind(self) -> str:
         self.base.spell()
-        if self.base.side == 0:
-            return f"SPELL WIND {WIDTH} {HEIGHT}"
-        else:
-            return f"SPELL WIND 0 0"
+        return commands.wind(self.base.side, WIDTH, HEIGHT)
 
     def control(self, target: Union[Monster, Enemy]) -> str:
         self.base.spell()
-        if self.base.side == 0:
-            return f"SPELL CONTROL {target.id} {WIDTH} {HEIGHT}"
-        else:
-            return f"SPELL CONTROL {target.id} 0 0"
+        return commands.control(self.base.side, target.id, WIDTH, HEIGHT)
 
 
 class AttackerCommand(Command):
@@ -134,50 +57,52 @@ class AttackerCommand(Command):
         )
         return self.move(center)
 
+    def fallback(self) -> str:
+        return self.move(self.dest)
 
-class Hero:
-    _count: int = 0
-
-    def __init__(self, x: int, y: int, base: Base):
-        self.id = Hero._count
-        self.x = x if base.side == 0 else WIDTH - x
-        self.y = y if base.side == 0 else HEIGHT - y
-        self.base = base
-        Hero._count += 1
-
-    def update(self, x: int, y: int):
-        self.x = x if self.base.side == 0 else WIDTH - x
-        self.y = y if self.base.side == 0 else HEIGHT - y
 
+class Hero(model.Hero):
     def get_action(self, monsters: List[Monster]) -> str:
         return AttackerCommand(self, self.base).next_action(monsters)
 
+    def fallback(self) -> str:
+        return AttackerCommand(self, self.base).fallback()
+
 
 def main():
-    base_x, base_y = map(int, input().split())
+    reader = IntReader()
+    base_x, base_y = reader.ints(2)
     base = Base(base_x, base_y)
-    _ = int(input())
+    _ = reader.int()
     heroes = {}
+    timer = TurnTimer()
+    profiling.install(timer, branches=[(Command, ("move", "wind", "control"))])
+    monster_registry = Registry(lambda entity_id, *fields: Monster(entity_id, *fields, base))
+    enemy_registry = Registry(lambda entity_id, *fields: Enemy(entity_id, *fields, base))
     while True:
-        my_health, my_mana = map(int, input().split())
+        monster_registry.next_turn()
+        enemy_registry.next_turn()
+        my_health, my_mana = reader.ints(2)
+        timer.start_turn()
         base.update(my_health, my_mana)
-        _ = map(int, input().split())
-        entity_count = int(input())
+        _ = reader.ints(2)
+        entity_count = reader.int()
         monsters = []
         enemies = []
-        for _ in range(entity_count):
-            entity_id, entity_type, x, y, shield_life, is_controlled, health, vx, vy, near_base, _ = map(int, input().split())
+        for entity_id, entity_type, x, y, shield_life, is_controlled, health, vx, vy, near_base, _ in reader.rows(
+                entity_count, 11):
             if entity_type == 0:
-                monsters.append(Monster(entity_id, x, y, shield_life, is_controlled, health, vx, vy, base))
+                monsters.append(monster_registry.update(entity_id, x, y, shield_life, is_controlled, health, vx, vy, near_base))
             elif entity_type == 1:
                 if entity_id not in heroes:
                     heroes[entity_id] = Hero(x, y, base)
                 else:
                     heroes[entity_id].update(x, y)
             elif entity_type == 2:
-                enemies.append(Enemy(entity_id, x, y, shield_life, is_controlled, base))
+                enemies.append(enemy_registry.update(entity_id, x, y, shield_life, is_controlled))
         for hero in sorted(heroes.values(), key=attrgetter('id')):
-            print(hero.get_action(monsters))
+            print(timer.decide(lambda: hero.get_action(monsters), hero.fallback))
+        timer.end_turn()
 
 
 if __name__ == '__main__':
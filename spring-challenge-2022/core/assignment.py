@@ -0,0 +1,87 @@
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+INF: float = float("inf")
+
+
+def hungarian(cost: Sequence[Sequence[float]]) -> List[int]:
+    """Minimum total cost matching of rows to distinct columns.
+
+    Returns the column of each row, -1 for rows left over when there are
+    more rows than columns. O(n^2 m) for n rows and m columns, n <= m.
+    """
+    n = len(cost)
+    m = len(cost[0]) if n else 0
+    if n > m:
+        # 行の方が多ければ転置して解き、余った行は -1
+        rows = [-1] * n
+        for j, i in enumerate(hungarian([[cost[i][j] for i in range(n)] for j in range(m)])):
+            rows[i] = j
+        return rows
+    # 1 始まりのポテンシャル付き最短増加路法、column[0] は追加中の行の仮置き場
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    column = [0] * (m + 1)
+    for i in range(1, n + 1):
+        column[0] = i
+        j0 = 0
+        slack = [INF] * (m + 1)
+        way = [0] * (m + 1)
+        used = [False] * (m + 1)
+        while column[j0]:
+            used[j0] = True
+            i0 = column[j0]
+            delta, j1 = INF, 0
+            row = cost[i0 - 1]
+            for j in range(1, m + 1):
+                if not used[j]:
+                    reduced = row[j - 1] - u[i0] - v[j]
+                    if reduced < slack[j]:
+                        slack[j] = reduced
+                        way[j] = j0
+                    if slack[j] < delta:
+                        delta, j1 = slack[j], j
+            for j in range(m + 1):
+                if used[j]:
+                    u[column[j]] += delta
+                    v[j] -= delta
+                else:
+                    slack[j] -= delta
+            j0 = j1
+        while j0:
+            j1 = way[j0]
+            column[j0] = column[j1]
+            j0 = j1
+    rows = [-1] * n
+    for j in range(1, m + 1):
+        if column[j]:
+            rows[column[j] - 1] = j - 1
+    return rows
+
+
+class Assignment:
+    """A matching of rows to columns kept from turn to turn.
+
+    `solve` builds the cost matrix and runs the Hungarian method only when
+    the row or column keys differ from the last call; otherwise the last
+    matching is returned as is. Keeping it while the same threats are
+    around also stops heroes from swapping targets back and forth.
+    """
+
+    def __init__(self):
+        self.key: Optional[Tuple[Tuple[Hashable, ...], frozenset]] = None
+        self.matching: Dict[Hashable, Hashable] = {}
+        self.solved = 0
+
+    def solve(self, rows: Sequence[Hashable], columns: Sequence[Hashable],
+              cost: Callable[[], Sequence[Sequence[float]]]) -> Dict[Hashable, Hashable]:
+        """Column assigned to each row that got one; `cost()` is indexed like rows and columns."""
+        key = (tuple(rows), frozenset(columns))
+        if key == self.key:
+            return self.matching
+        self.key = key
+        self.solved += 1
+        self.matching = {row: columns[j] for row, j in zip(rows, hungarian(cost())) if j >= 0}
+        return self.matching
+
+    def reset(self):
+        self.key = None
@@ -0,0 +1,30 @@
+from typing import Tuple
+
+from core.constants import HEIGHT, WIDTH
+from core.model import Number
+
+
+def mirror(side: int, x: Number, y: Number) -> Tuple[Number, Number]:
+    """Turn a point between our frame, with our base at (0, 0), and the referee's."""
+    if side == 0:
+        return x, y
+    return WIDTH - x, HEIGHT - y
+
+
+def move(side: int, x: Number, y: Number) -> str:
+    x, y = mirror(side, x, y)
+    return f"MOVE {x} {y}"
+
+
+def wind(side: int, x: Number, y: Number) -> str:
+    x, y = mirror(side, x, y)
+    return f"SPELL WIND {x} {y}"
+
+
+def control(side: int, entity_id: int, x: Number, y: Number) -> str:
+    x, y = mirror(side, x, y)
+    return f"SPELL CONTROL {entity_id} {x} {y}"
+
+
+def shield(entity_id: int) -> str:
+    return f"SPELL SHIELD {entity_id}"
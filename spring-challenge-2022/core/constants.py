@@ -0,0 +1,6 @@
+WIDTH: int = 17630
+HEIGHT: int = 9000
+BASE_RADIUS: int = 6000
+MONSTER_RADIUS: int = 5000
+SEARCH_RADIUS: int = 2200
+WIND_RADIUS: int = 1280
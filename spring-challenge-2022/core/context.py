@@ -0,0 +1,108 @@
+from operator import attrgetter
+from typing import Callable, Dict, List, Optional, Sequence, Set, TypeVar
+
+from core.model import Enemy, Monster, distance
+from core.physics import Spells
+from core.spatial import SpatialGrid
+from core.trajectory import OUR_BASE
+
+T = TypeVar("T")
+
+
+class TurnContext:
+    """What every hero's decision derives from this turn's entities.
+
+    Values are computed on first use and shared by the heroes deciding
+    after it, until `invalidate()`. Spells cast through `wind`, `control`
+    and `shield` update the entities as the referee would and invalidate,
+    so later heroes see the predicted state. Queries go through the
+    EntityTable when one is given and through the spatial grids otherwise.
+    `hidden` are the monsters out of sight that a Memory still predicts.
+    """
+
+    def __init__(self, monsters: List[Monster], enemies: List[Enemy], table=None, heroes: Sequence = (),
+                 hidden: Sequence[Monster] = ()):
+        self.monsters = monsters
+        self.enemies = enemies
+        self.table = table
+        self.heroes = heroes
+        self.hidden = hidden
+        self.monster_grid: SpatialGrid[Monster] = SpatialGrid(monsters)
+        self.enemy_grid: SpatialGrid[Enemy] = SpatialGrid(enemies)
+        self.spells = Spells(monsters, enemies)
+        self.cache: Dict[object, object] = {}
+
+    def memo(self, key, compute: Callable[[], T]) -> T:
+        if key not in self.cache:
+            self.cache[key] = compute()
+        return self.cache[key]
+
+    def invalidate(self):
+        self.cache.clear()
+
+    def moved(self, entity):
+        """Re-index an entity after a spell changed its position or velocity."""
+        if entity.id in self.spells.heroes:
+            self.enemy_grid.update(entity)
+            if self.table is not None:
+                self.table.move_enemy(entity)
+        else:
+            self.monster_grid.update(entity)
+            if self.table is not None:
+                self.table.move(entity)
+
+    def wind(self, hero, x: int, y: int):
+        for entity in self.spells.wind(hero.x, hero.y, x, y):
+            self.moved(entity)
+        self.invalidate()
+
+    def control(self, hero, target, x: int, y: int):
+        if self.spells.control(hero.x, hero.y, target, x, y) and target.id not in self.spells.heroes:
+            self.moved(target)
+        self.invalidate()
+
+    def shield(self, hero, target):
+        self.spells.shield(hero.x, hero.y, target)
+        self.invalidate()
+
+    def enemy_near(self, monster: Monster, radius: int) -> bool:
+        """Whether an enemy hero is closer than `radius` to the monster."""
+        if self.table is not None:
+            near = self.memo(("enemy_within", radius), lambda: self.table.enemy_within(radius))
+            return bool(near[self.table.row[monster.id]])
+        near = self.memo(("enemy_near", radius), dict)
+        if monster.id not in near:
+            near[monster.id] = self.enemy_grid.any_within(monster.x, monster.y, radius)
+        return near[monster.id]
+
+    def hero_distances(self, hero) -> List[float]:
+        """Distance from the hero to each monster, in `monsters` order."""
+        def compute() -> List[float]:
+            if self.table is not None:
+                return self.table.hero_monster[self.table.hero_row[hero.id]].tolist()
+            return [distance(hero.x, hero.y, monster.x, monster.y) for monster in self.monsters]
+        return self.memo(("hero_distances", hero.id, hero.x, hero.y), compute)
+
+    def enemies_near(self, hero, radius: int) -> List[Enemy]:
+        if self.table is not None:
+            d = self.table.hero_enemy[self.table.hero_row[hero.id]].tolist()
+            return [enemy for enemy, de in zip(self.enemies, d) if de < radius]
+        return self.enemy_grid.within(hero.x, hero.y, radius)
+
+    def lurking(self, horizon: int) -> Optional[Monster]:
+        """The hidden monster that reaches our base first, if within `horizon` turns."""
+        def compute() -> Optional[Monster]:
+            coming = [
+                monster for monster in self.hidden if monster.impact == OUR_BASE and monster.impact_turns <= horizon
+            ]
+            return min(coming, key=attrgetter("impact_turns")) if coming else None
+        return self.memo(("lurking", horizon), compute)
+
+    def within(self, monsters: List[Monster], x: int, y: int, radius: int) -> Set[int]:
+        """Ids of the given monsters within `radius` of (x, y)."""
+        if self.table is not None:
+            d = self.table.from_point(x, y)
+            return {monster.id for monster in monsters if d[self.table.row[monster.id]] < radius}
+        near = {monster.id for monster in self.monster_grid.within(x, y, radius)}
+        return {monster.id for monster in monsters if monster.id in near}
+
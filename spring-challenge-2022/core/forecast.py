@@ -0,0 +1,109 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from core.constants import HEIGHT, MONSTER_RADIUS, WIDTH
+from core.physics import MONSTER_SPEED
+
+HERO_DAMAGE: int = 2
+DAMAGE_RADIUS: int = 300
+NEVER: float = np.inf
+OFFSETS: np.ndarray = np.arange(4)
+# 自陣と敵陣をまとめて解くための中心
+CENTERS_X: np.ndarray = np.array([0, WIDTH])[:, None]
+CENTERS_Y: np.ndarray = np.array([0, HEIGHT])[:, None]
+
+
+def enter_circle(x: np.ndarray, y: np.ndarray, vx: np.ndarray, vy: np.ndarray, cx, cy, r: int) -> np.ndarray:
+    """Per row, the first whole step k >= 0 inside the circle, NEVER if none; trajectory.enter_circle at once."""
+    dx, dy = x - cx, y - cy
+    a = vx * vx + vy * vy
+    b = dx * vx + dy * vy
+    c = dx * dx + dy * dy - r * r
+    disc = b * b - a * c
+    root = (-b - np.sqrt(np.maximum(disc, 0))) / np.maximum(a, 1)
+    # 浮動小数点の誤差は前後の整数を整数演算で確かめて吸収する
+    steps = np.maximum(0, np.ceil(root).astype(np.int64) - 1)[:, None] + OFFSETS
+    inside = a[:, None] * steps * steps + 2 * b[:, None] * steps + c[:, None] <= 0
+    k = np.where(inside.any(axis=1), steps[np.arange(len(steps)), inside.argmax(axis=1)], NEVER)
+    k[(a == 0) | (disc < 0)] = NEVER
+    k[c <= 0] = 0
+    return k
+
+
+def leave_range(p: np.ndarray, v: np.ndarray, high: int) -> np.ndarray:
+    """Per row, the first whole step k >= 0 outside [0, high], NEVER if it stays."""
+    k = np.where(v > 0, (high - p) // np.maximum(v, 1) + 1, np.where(v < 0, p // np.maximum(-v, 1) + 1, NEVER))
+    k[(p < 0) | (high < p)] = 0
+    return k
+
+
+def approach(d: np.ndarray) -> np.ndarray:
+    """Turns for a monster heading straight in from `d` to get within DAMAGE_RADIUS."""
+    return np.ceil(np.maximum(0, d - DAMAGE_RADIUS) / MONSTER_SPEED)
+
+
+class Forecast:
+    """Turns until every monster hits a base, for all of them at once.
+
+    Monsters drift in a straight line until they enter a base's
+    MONSTER_RADIUS, as in `trajectory`, then walk straight at it. `ours`
+    and `theirs` are the turns until the hit, NEVER if the monster leaves
+    the map or reaches the other base first, and `entering` the turns
+    until a monster headed for our base is inside its MONSTER_RADIUS.
+    `kill` is how many hero-turns of damage it takes and `damage` the
+    health it still has on hitting our base with one hero on it from now.
+    `ranked` orders the monsters that hit our base into a threat table.
+    Rows follow the monsters passed in.
+    """
+
+    def __init__(self, monsters: Sequence):
+        self.monsters = monsters
+        self.index: Dict[int, int] = {monster.id: i for i, monster in enumerate(monsters)}
+        n = len(monsters)
+        fields = np.array([(monster.x, monster.y, monster.vx, monster.vy, monster.health) for monster in monsters],
+                          dtype=np.int64).reshape(n, 5)
+        x, y, vx, vy, self.health = fields.T
+        # 行 0..n-1 が自陣、n..2n-1 が敵陣
+        enter = enter_circle(np.tile(x, 2), np.tile(y, 2), np.tile(vx, 2), np.tile(vy, 2),
+                             CENTERS_X.repeat(n, axis=1).ravel(), CENTERS_Y.repeat(n, axis=1).ravel(), MONSTER_RADIUS)
+        enter_ours, enter_theirs = enter[:n], enter[n:]
+        leave = np.minimum(leave_range(x, vx, WIDTH), leave_range(y, vy, HEIGHT))
+        # 同じステップなら自陣、敵陣、場外の順に決まる
+        ours = (enter_ours < NEVER) & (enter_ours <= enter_theirs) & (enter_ours <= leave)
+        theirs = ~ours & (enter_theirs < NEVER) & (enter_theirs <= leave)
+        k = np.where(ours, enter_ours, np.where(theirs, enter_theirs, 0)).astype(np.int64)
+        px, py = x + k * vx, y + k * vy
+        self.entering = np.where(ours, k, NEVER)
+        self.ours = np.where(ours, k + approach(np.sqrt(px * px + py * py)), NEVER)
+        self.theirs = np.where(theirs, k + approach(np.sqrt((WIDTH - px) ** 2 + (HEIGHT - py) ** 2)), NEVER)
+        # WIND で送り込んだ場合の見積もりに使う、敵陣までまっすぐ歩いたときのターン数
+        self.straight = approach(np.sqrt((WIDTH - x) ** 2 + (HEIGHT - y) ** 2))
+        self.kill = np.ceil(self.health / HERO_DAMAGE)
+        self.damage = self.left(self.ours)
+
+    def __len__(self) -> int:
+        return len(self.monsters)
+
+    def left(self, turns: np.ndarray) -> np.ndarray:
+        """Health left after `turns` turns of one hero's hits, 0 for monsters that never come."""
+        return np.maximum(0, self.health - HERO_DAMAGE * turns)
+
+    def ranked(self, turns: Optional[np.ndarray] = None) -> List[int]:
+        """Rows of the monsters that hit our base, the most urgent first.
+
+        Ordered by turns to our base, then by more hero-turns to kill,
+        then by more damage left on arrival, then by row. `turns` replaces
+        `ours` when the caller knows a monster can come in sooner.
+        """
+        turns = self.ours if turns is None else turns
+        damage = self.damage if turns is self.ours else self.left(turns)
+        # lexsort は最後のキーが最優先
+        order = np.lexsort((np.arange(len(turns)), -damage, -self.kill, turns))
+        return [i for i in order.tolist() if turns[i] < NEVER]
+
+    def enemy_damage(self, monster) -> int:
+        """Damage one enemy hero can deal before the monster hits their base, going straight if not on course."""
+        i = self.index[monster.id]
+        turns = self.theirs[i] if self.theirs[i] < NEVER else self.straight[i]
+        return int(turns) * HERO_DAMAGE
@@ -0,0 +1,102 @@
+from typing import Dict, List, Sequence
+
+from core.constants import HEIGHT, MONSTER_RADIUS, WIDTH
+from core.model import Monster
+from core.physics import BASE_DAMAGE_RADIUS, BASE_VIEW_RADIUS, HERO_VIEW_RADIUS, MONSTER_SPEED, reaches, toward
+
+# 自陣が (0, 0) になる向きでの両陣地
+BASES = ((0, 0), (WIDTH, HEIGHT))
+
+
+def drift(monster: Monster, free: bool) -> bool:
+    """Move a monster one turn as the referee does; False if it hits a base on the way.
+
+    A `free` monster is pulled toward a base it is within MONSTER_RADIUS
+    of, a controlled one keeps the velocity it was given.
+    """
+    x, y, vx, vy, near_base = monster.x, monster.y, monster.vx, monster.vy, monster.near_base
+    if free:
+        near_base = False
+        for bx, by in BASES:
+            if reaches(x, y, bx, by, MONSTER_RADIUS):
+                near_base = True
+                vx, vy = toward(x, y, bx, by, MONSTER_SPEED)
+                break
+    x += vx
+    y += vy
+    if near_base and (reaches(x, y, 0, 0, BASE_DAMAGE_RADIUS) or reaches(x, y, WIDTH, HEIGHT, BASE_DAMAGE_RADIUS)):
+        return False
+    monster.place(x, y, max(0, monster.shield - 1), False, monster.health, vx, vy, near_base)
+    return True
+
+
+def inside(monster: Monster) -> bool:
+    return 0 <= monster.x <= WIDTH and 0 <= monster.y <= HEIGHT
+
+
+class Memory:
+    """Monsters seen before, moved on while they are out of sight.
+
+    `observe` takes this turn's visible monsters once a turn. Each
+    remembered monster missing from them drifts one turn from where the
+    last turn left it, including our own predicted spells, and is
+    forgotten once it hits a base, leaves the map after entering it,
+    should be in sight but is not (the opponent killed or moved it), or
+    has gone `ttl` turns unseen. Only the `capacity` monsters seen last
+    are kept, so a turn costs O(remembered monsters).
+    """
+
+    def __init__(self, ttl: int = 15, capacity: int = 40):
+        self.ttl = ttl
+        self.capacity = capacity
+        self.turn = 0
+        self.monsters: Dict[int, Monster] = {}
+        self.last_seen: Dict[int, int] = {}
+        # 最後に見たときの is_controlled、これと違えば自分の CONTROL が予測に入っている
+        self.controlled: Dict[int, bool] = {}
+        self.entered: Dict[int, bool] = {}
+        self.hidden: List[Monster] = []
+
+    def observe(self, visible: Sequence[Monster], heroes: Sequence) -> List[Monster]:
+        """Update with this turn's visible monsters and our heroes; returns the monsters out of sight."""
+        self.turn += 1
+        seen = {monster.id for monster in visible}
+        hidden = []
+        for monster_id, monster in list(self.monsters.items()):
+            if monster_id in seen:
+                continue
+            free = not monster.is_controlled or self.controlled[monster_id]
+            self.controlled[monster_id] = False
+            if self.turn - self.last_seen[monster_id] > self.ttl or not drift(monster, free) \
+                    or self.entered[monster_id] and not inside(monster) or self.in_sight(monster, heroes):
+                self.forget(monster_id)
+                continue
+            self.entered[monster_id] = self.entered[monster_id] or inside(monster)
+            hidden.append(monster)
+        for monster in visible:
+            self.monsters[monster.id] = monster
+            self.last_seen[monster.id] = self.turn
+            self.controlled[monster.id] = monster.is_controlled
+            self.entered[monster.id] = self.entered.get(monster.id, False) or inside(monster)
+        if len(self.monsters) > self.capacity:
+            oldest = sorted(self.monsters, key=self.last_seen.__getitem__)
+            for monster_id in oldest[:len(self.monsters) - self.capacity]:
+                self.forget(monster_id)
+            hidden = [monster for monster in hidden if monster.id in self.monsters]
+        self.hidden = hidden
+        return hidden
+
+    @staticmethod
+    def in_sight(monster: Monster, heroes: Sequence) -> bool:
+        if reaches(monster.x, monster.y, 0, 0, BASE_VIEW_RADIUS):
+            return True
+        return any(reaches(monster.x, monster.y, hero.x, hero.y, HERO_VIEW_RADIUS) for hero in heroes)
+
+    def forget(self, monster_id: int):
+        del self.monsters[monster_id]
+        del self.last_seen[monster_id]
+        del self.controlled[monster_id]
+        del self.entered[monster_id]
+
+    def __len__(self) -> int:
+        return len(self.monsters)
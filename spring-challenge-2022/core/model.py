@@ -0,0 +1,229 @@
+from math import sqrt, cos, sin, atan2
+from operator import itemgetter
+from typing import Optional, Tuple, Union
+
+from core.constants import HEIGHT, WIDTH
+from core.trajectory import ENEMY_BASE, OUR_BASE, OUTSIDE, trajectory
+
+Number = Union[int, float]
+
+
+def distance(x1: Number, y1: Number, x2: Number, y2: Number) -> float:
+    return sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
+
+
+class Point(tuple):
+    """Immutable (x, y) rounded and clamped to the map."""
+
+    __slots__ = ()
+
+    def __new__(cls, x: Number, y: Number):
+        return tuple.__new__(cls, (max(0, min(round(x), WIDTH)), max(0, min(round(y), HEIGHT))))
+
+    x = property(itemgetter(0))
+    y = property(itemgetter(1))
+
+    @property
+    def distance(self) -> float:
+        return distance(self[0], self[1], 0, 0)
+
+
+class Base:
+    __slots__ = ("x", "y", "side", "health", "mana")
+
+    def __init__(self, x: int, y: int):
+        self.x = x
+        self.y = y
+        self.side = [0, 1][self.y > 4500]
+        self.health = 0
+        self.mana = 0
+
+    def update(self, health: int, mana: int):
+        self.health = health
+        self.mana = mana
+
+    def spell(self) -> bool:
+        """Pay for a spell; False if there wasn't enough mana, so the referee will ignore it."""
+        cast = self.has_mana()
+        self.mana -= 10
+        return cast
+
+    def has_mana(self) -> bool:
+        return self.mana >= 10
+
+    def has_more_mana(self, amount: int = 20) -> bool:
+        return self.mana >= amount
+
+
+class Monster:
+    """A monster in our base's frame, where our base sits at (0, 0).
+
+    Distances, the argument, the next point and the impact are computed on
+    first access from `track`, the position and velocity read this turn or
+    set by `refresh` after a predicted spell moved or turned the monster.
+    """
+
+    __slots__ = (
+        "id", "base", "x", "y", "shield", "is_controlled", "health", "vx", "vy", "near_base", "is_controlling",
+        "track", "_impact", "_distance", "_distance2", "_argument", "_next_point",
+    )
+
+    def __init__(self, entity_id: int, x: int, y: int, shield: int, is_controlled, health: int, vx: int, vy: int,
+                 near_base: int, base: Base):
+        self.id = entity_id
+        self.base = base
+        self.track = None
+        self._impact = None
+        self.update(x, y, shield, is_controlled, health, vx, vy, near_base)
+
+    def update(self, x: int, y: int, shield: int, is_controlled, health: int, vx: int, vy: int, near_base: int):
+        if self.base.side == 0:
+            self.place(x, y, shield, is_controlled == 1, health, vx, vy, near_base == 1)
+        else:
+            self.place(WIDTH - x, HEIGHT - y, shield, is_controlled == 1, health, -vx, -vy, near_base == 1)
+
+    def place(self, x: int, y: int, shield: int, is_controlled: bool, health: int, vx: int, vy: int, near_base: bool):
+        """Set the state in our frame, as read from the input or predicted."""
+        self.x = x
+        self.y = y
+        self.shield = shield
+        self.is_controlled = is_controlled
+        self.health = health
+        self.vx = vx
+        self.vy = vy
+        self.near_base = near_base
+        self.is_controlling = self.is_controlled and not self.targeting
+        self._distance = self._distance2 = self._argument = self._next_point = None
+        # 前のターンから同じ速度でまっすぐ進んだだけなら行き先は変わらない
+        previous, self.track = self.track, (self.x, self.y, self.vx, self.vy)
+        if self._impact is not None and self._impact[1] and previous == (
+                self.x - self.vx, self.y - self.vy, self.vx, self.vy):
+            impact, turns, point = self._impact
+            self._impact = (impact, turns - 1, point)
+        else:
+            self._impact = None
+
+    def refresh(self):
+        """Derive the values again from `x`, `y`, `vx` and `vy` after a prediction changed them."""
+        self.track = (self.x, self.y, self.vx, self.vy)
+        self._impact = self._distance = self._distance2 = self._argument = self._next_point = None
+
+    def trajectory(self) -> Tuple[int, Optional[int], Optional[Tuple[int, int]]]:
+        if self._impact is None:
+            self._impact = trajectory(*self.track)
+        return self._impact
+
+    # impact: どこに行き着くか、impact_turns: 何ターン後か、impact_point: その地点
+    @property
+    def impact(self) -> int:
+        return self.trajectory()[0]
+
+    @property
+    def impact_turns(self) -> Optional[int]:
+        return self.trajectory()[1]
+
+    @property
+    def impact_point(self) -> Optional[Tuple[int, int]]:
+        return self.trajectory()[2]
+
+    @property
+    def distance(self) -> float:
+        if self._distance is None:
+            self._distance = distance(self.track[0], self.track[1], 0, 0)
+        return self._distance
+
+    @property
+    def distance2(self) -> float:
+        if self._distance2 is None:
+            self._distance2 = distance(self.track[0], self.track[1], WIDTH, HEIGHT)
+        return self._distance2
+
+    @property
+    def argument(self) -> float:
+        if self._argument is None:
+            self._argument = atan2(self.track[1], self.track[0])
+        return self._argument
+
+    @property
+    def next_point(self) -> Point:
+        if self._next_point is None:
+            x, y, vx, vy = self.track
+            self._next_point = Point(x + vx, y + vy)
+        return self._next_point
+
+    @property
+    def in_base(self) -> bool:
+        return self.distance < 6000
+
+    @property
+    def is_threat(self) -> bool:
+        return self.distance < 3000
+
+    @property
+    def targeting(self) -> bool:
+        return self.vx < 0 and self.vy < 0
+
+    @property
+    def effective(self) -> bool:
+        return self.impact not in (ENEMY_BASE, OUTSIDE)
+
+    @property
+    def effective2(self) -> bool:
+        return self.impact not in (OUR_BASE, OUTSIDE)
+
+    def behind_point(self) -> Point:
+        arg = atan2(HEIGHT - self.next_point.y, WIDTH - self.next_point.x)
+        r = distance(self.next_point.x, self.next_point.y, WIDTH, HEIGHT) + 1040
+        return Point(WIDTH - r * cos(arg), HEIGHT - r * sin(arg))
+
+
+class Enemy:
+    __slots__ = ("id", "base", "x", "y", "shield", "is_controlled", "is_controlling", "_distance", "_distance2")
+
+    def __init__(self, entity_id: int, x: int, y: int, shield, is_controlled, base: Base):
+        self.id = entity_id
+        self.base = base
+        self.update(x, y, shield, is_controlled)
+
+    def update(self, x: int, y: int, shield, is_controlled):
+        self.x = x if self.base.side == 0 else WIDTH - x
+        self.y = y if self.base.side == 0 else HEIGHT - y
+        self.shield = shield
+        self.is_controlled = is_controlled == 1
+        self.is_controlling = False
+        self._distance = self._distance2 = None
+
+    def refresh(self):
+        """Forget the distances after a prediction moved the hero."""
+        self._distance = self._distance2 = None
+
+    @property
+    def distance(self) -> float:
+        if self._distance is None:
+            self._distance = distance(self.x, self.y, 0, 0)
+        return self._distance
+
+    @property
+    def distance2(self) -> float:
+        if self._distance2 is None:
+            self._distance2 = distance(self.x, self.y, WIDTH, HEIGHT)
+        return self._distance2
+
+
+class Hero:
+    """One of our heroes; the bots subclass it with their own strategy."""
+
+    __slots__ = ("id", "x", "y", "base")
+    _count: int = 0
+
+    def __init__(self, x: int, y: int, base: Base):
+        self.id = Hero._count
+        self.base = base
+        self.x = x if base.side == 0 else WIDTH - x
+        self.y = y if base.side == 0 else HEIGHT - y
+        Hero._count += 1
+
+    def update(self, x: int, y: int):
+        self.x = x if self.base.side == 0 else WIDTH - x
+        self.y = y if self.base.side == 0 else HEIGHT - y
+
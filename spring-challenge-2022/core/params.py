@@ -0,0 +1,44 @@
+import json
+import os
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+ENV_VAR: str = "BOT_PARAMS"
+
+# name: (default, low, high)
+Space = Mapping[str, Tuple[float, float, float]]
+
+
+class Params:
+    """A point in a parameter space, read as attributes.
+
+    Parameters whose default is an int stay ints, so a bot run with the
+    defaults computes exactly what it did with the literals.
+    """
+
+    def __init__(self, space: Space, values: Optional[Mapping[str, float]] = None):
+        values = values or {}
+        unknown = set(values) - set(space)
+        if unknown:
+            raise KeyError(f"unknown parameters: {', '.join(sorted(unknown))}")
+        self.space = space
+        for name, (default, low, high) in space.items():
+            value = values.get(name, default)
+            setattr(self, name, round(value) if isinstance(default, int) else float(value))
+
+    def vector(self) -> List[float]:
+        return [getattr(self, name) for name in self.space]
+
+    def as_dict(self) -> Dict[str, float]:
+        return {name: getattr(self, name) for name in self.space}
+
+    @classmethod
+    def from_vector(cls, space: Space, vector: Sequence[float]) -> "Params":
+        return cls(space, {
+            name: max(low, min(value, high)) for (name, (_, low, high)), value in zip(space.items(), vector)
+        })
+
+
+def load(space: Space, variable: str = ENV_VAR) -> Params:
+    """Defaults overridden by a JSON object in the environment, if any."""
+    text = os.environ.get(variable)
+    return Params(space, json.loads(text) if text else None)
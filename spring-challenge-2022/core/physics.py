@@ -0,0 +1,109 @@
+from itertools import chain
+from math import sqrt
+from typing import Dict, Iterable, List, Set, Tuple
+
+from core.constants import HEIGHT, WIDTH, WIND_RADIUS
+
+HERO_SPEED: int = 800
+MONSTER_SPEED: int = 400
+WIND_DISTANCE: int = 2200
+SPELL_RADIUS: int = 2200
+SPELL_COST: int = 10
+SHIELD_DURATION: int = 12
+BASE_VIEW_RADIUS: int = 6000
+HERO_VIEW_RADIUS: int = 2200
+BASE_DAMAGE_RADIUS: int = 300
+# 呪文をかけた直後の値、ターンの終わりに 1 減って次の入力では SHIELD_DURATION になる
+SHIELDED: int = SHIELD_DURATION + 1
+
+# (id, x, y, shield)
+Body = Tuple[int, int, int, int]
+
+
+def toward(x1: int, y1: int, x2: int, y2: int, length: int) -> Tuple[int, int]:
+    """Vector of `length` from (x1, y1) toward (x2, y2), truncated like the referee."""
+    dx, dy = x2 - x1, y2 - y1
+    d = sqrt(dx * dx + dy * dy)
+    if d == 0:
+        return 0, 0
+    return int(dx * length / d), int(dy * length / d)
+
+
+def reaches(x1: int, y1: int, x2: int, y2: int, radius: int) -> bool:
+    return (x1 - x2) ** 2 + (y1 - y2) ** 2 <= radius * radius
+
+
+def wind(hx: int, hy: int, x: int, y: int, bodies: Iterable[Body]) -> Tuple[Tuple[int, int], List[int]]:
+    """Push of a WIND cast from (hx, hy) toward (x, y) and the ids of the bodies it moves."""
+    r2 = WIND_RADIUS * WIND_RADIUS
+    return toward(hx, hy, x, y, WIND_DISTANCE), [
+        entity_id for entity_id, bx, by, shield in bodies if shield == 0 and (bx - hx) ** 2 + (by - hy) ** 2 <= r2
+    ]
+
+
+def control(x: int, y: int, tx: int, ty: int) -> Tuple[int, int]:
+    """Velocity of a monster at (x, y) controlled toward (tx, ty)."""
+    return toward(x, y, tx, ty, MONSTER_SPEED)
+
+
+class Spells:
+    """Our spells of one turn resolved on the parsed entities like the referee does.
+
+    Every WIND acts on the positions the turn started from and the pushes
+    on an entity add up; a pushed enemy hero is clamped to the map. CONTROL
+    and SHIELD are checked against the positions after the WINDs cast so
+    far, and a shield raised this turn does not stop this turn's WINDs.
+    Several CONTROLs on one monster aim at the floored mean of their
+    points. Moved or turned entities are refreshed, so their distances and
+    next point follow the prediction. Mana is the caller's business.
+    Cast in the referee's order, WINDs first, the result is the referee's.
+    """
+
+    def __init__(self, monsters: Iterable, enemies: Iterable = ()):
+        self.entities = {entity.id: entity for entity in chain(monsters, enemies)}
+        self.heroes: Set[int] = {enemy.id for enemy in enemies}
+        self.start: Dict[int, Body] = {
+            entity.id: (entity.id, entity.x, entity.y, entity.shield) for entity in self.entities.values()
+        }
+        self.pushes: Dict[int, Tuple[int, int]] = {}
+        self.points: Dict[int, List[Tuple[int, int]]] = {}
+
+    def wind(self, hx: int, hy: int, x: int, y: int) -> List:
+        """Apply a WIND and return the entities it moved."""
+        (dx, dy), ids = wind(hx, hy, x, y, self.start.values())
+        moved = []
+        for entity_id in ids:
+            px, py = self.pushes.get(entity_id, (0, 0))
+            px, py = self.pushes[entity_id] = (px + dx, py + dy)
+            _, sx, sy, _ = self.start[entity_id]
+            entity = self.entities[entity_id]
+            entity.x, entity.y = sx + px, sy + py
+            if entity_id in self.heroes:
+                entity.x = max(0, min(entity.x, WIDTH))
+                entity.y = max(0, min(entity.y, HEIGHT))
+            entity.refresh()
+            moved.append(entity)
+        return moved
+
+    def castable(self, hx: int, hy: int, target) -> bool:
+        return self.start[target.id][3] == 0 and reaches(target.x, target.y, hx, hy, SPELL_RADIUS)
+
+    def control(self, hx: int, hy: int, target, x: int, y: int) -> bool:
+        """Apply a CONTROL toward (x, y); a monster turns at once, a hero is only marked."""
+        if not self.castable(hx, hy, target):
+            return False
+        target.is_controlled = True
+        if target.id not in self.heroes:
+            points = self.points.setdefault(target.id, [])
+            points.append((x, y))
+            x, y = sum(p[0] for p in points) // len(points), sum(p[1] for p in points) // len(points)
+            target.vx, target.vy = control(target.x, target.y, x, y)
+            target.near_base = False
+            target.refresh()
+        return True
+
+    def shield(self, hx: int, hy: int, target) -> bool:
+        if not self.castable(hx, hy, target):
+            return False
+        target.shield = SHIELDED
+        return True
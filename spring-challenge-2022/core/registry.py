@@ -0,0 +1,47 @@
+from typing import Callable, Dict, Generic, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Registry(Generic[T]):
+    """Entities kept alive across turns, keyed by entity id.
+
+    `factory(entity_id, *fields)` builds an entity the first time its id is
+    seen; afterwards the same object gets `update(*fields)`. Entities not
+    seen for more than `ttl` turns are dropped.
+    """
+
+    def __init__(self, factory: Callable[..., T], ttl: int = 3):
+        self.factory = factory
+        self.ttl = ttl
+        self.turn = 0
+        self.entities: Dict[int, T] = {}
+        self.last_seen: Dict[int, int] = {}
+
+    def next_turn(self):
+        self.turn += 1
+        stale = [entity_id for entity_id, seen in self.last_seen.items() if self.turn - seen > self.ttl]
+        for entity_id in stale:
+            del self.entities[entity_id]
+            del self.last_seen[entity_id]
+
+    def update(self, entity_id: int, *fields) -> T:
+        entity = self.entities.get(entity_id)
+        if entity is None:
+            entity = self.entities[entity_id] = self.factory(entity_id, *fields)
+        else:
+            entity.update(*fields)
+        self.last_seen[entity_id] = self.turn
+        return entity
+
+    def get(self, entity_id: int) -> Optional[T]:
+        return self.entities.get(entity_id)
+
+    def __contains__(self, entity_id: int) -> bool:
+        return entity_id in self.entities
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.entities.values())
@@ -0,0 +1,265 @@
+from itertools import product
+from math import sqrt
+from time import perf_counter
+from typing import List, Optional, Sequence, Tuple
+
+from core import commands
+from core.constants import HEIGHT, WIDTH, WIND_RADIUS
+from core.physics import HERO_SPEED, MONSTER_SPEED, SHIELDED, SPELL_COST, SPELL_RADIUS, control, reaches, toward, wind
+
+HERO_ATTACK_RADIUS: int = 800
+HERO_DAMAGE: int = 2
+ATTRACTION_RADIUS: int = 5000
+DAMAGE_RADIUS: int = 300
+# 脅威として評価する自陣からの距離
+THREAT_RADIUS: int = 8200
+
+BEAM_WIDTH: int = 8
+MAX_DEPTH: int = 8
+# 1 ターンに展開するノードの上限、時間ではなくこれで止めれば同じ局面からは同じ手になる
+MAX_NODES: int = 400
+DISCOUNT: float = 0.9
+# ヒューリスティックの手から乗り換えるのに必要な評価値の差
+SWITCH_MARGIN: float = 50.0
+BASE_HIT: float = 1000.0
+ENEMY_BASE_HIT: float = 300.0
+MANA_VALUE: float = 3.0
+THREAT_WEIGHT: float = 40.0
+COVER_WEIGHT: float = 0.01
+PRESSURE_WEIGHT: float = 5.0
+
+MOVE: int = 0
+WIND: int = 1
+CONTROL: int = 2
+SHIELD: int = 3
+
+# (kind, x, y, target id); 座標は自陣が (0, 0) になる向き
+Action = Tuple[int, int, int, int]
+# (id, x, y, vx, vy, health, shield)
+MonsterState = Tuple[int, int, int, int, int, int, int]
+HeroState = Tuple[int, int]
+
+
+def parse_action(text: str, side: int) -> Action:
+    """An action as printed by a command, mirrored into our frame."""
+    words = text.split()
+
+    def mirror(x: str, y: str) -> Tuple[int, int]:
+        return (int(x), int(y)) if side == 0 else (WIDTH - int(x), HEIGHT - int(y))
+
+    if words[0] == "MOVE":
+        return (MOVE, *mirror(words[1], words[2]), -1)
+    if words[1] == "WIND":
+        return (WIND, *mirror(words[2], words[3]), -1)
+    if words[1] == "CONTROL":
+        return (CONTROL, *mirror(words[3], words[4]), int(words[2]))
+    return SHIELD, 0, 0, int(words[2])
+
+
+def format_action(action: Action, side: int) -> str:
+    kind, x, y, target = action
+    if kind == MOVE:
+        return commands.move(side, x, y)
+    if kind == WIND:
+        return commands.wind(side, x, y)
+    if kind == CONTROL:
+        return commands.control(side, target, x, y)
+    return commands.shield(target)
+
+
+def snapshot(monsters: Sequence) -> Tuple[MonsterState, ...]:
+    return tuple((m.id, m.x, m.y, m.vx, m.vy, m.health, m.shield) for m in monsters)
+
+
+def step(heroes: Tuple[HeroState, ...], monsters: Tuple[MonsterState, ...], mana: int,
+         actions: Sequence[Action]) -> Tuple[Tuple[HeroState, ...], Tuple[MonsterState, ...], int, int, int]:
+    """One turn of a simplified referee with only our heroes acting.
+
+    Returns (heroes, monsters, mana, our base hits, enemy base hits). Enemy
+    heroes and spawns are ignored.
+    """
+    moved = list(heroes)
+    pushes = {}
+    spells = {}
+    for i, ((hx, hy), action) in enumerate(zip(heroes, actions)):
+        kind, x, y, target = action
+        if kind == MOVE:
+            if (x - hx) ** 2 + (y - hy) ** 2 > HERO_SPEED * HERO_SPEED:
+                dx, dy = toward(hx, hy, x, y, HERO_SPEED)
+                x, y = hx + dx, hy + dy
+            moved[i] = (max(0, min(x, WIDTH)), max(0, min(y, HEIGHT)))
+            continue
+        if mana < SPELL_COST:
+            continue
+        mana -= SPELL_COST
+        if kind == WIND:
+            (dx, dy), ids = wind(hx, hy, x, y, ((m[0], m[1], m[2], m[6]) for m in monsters))
+            for entity_id in ids:
+                px, py = pushes.get(entity_id, (0, 0))
+                pushes[entity_id] = (px + dx, py + dy)
+        else:
+            # CONTROL と SHIELD は WIND で動いた後の位置で判定する
+            spells[target] = (hx, hy, action)
+    alive = []
+    ours = theirs = 0
+    r2 = HERO_ATTACK_RADIUS * HERO_ATTACK_RADIUS
+    for entity_id, x, y, vx, vy, health, shield in monsters:
+        if entity_id in pushes:
+            px, py = pushes[entity_id]
+            x += px
+            y += py
+        controlled = False
+        if entity_id in spells and shield == 0:
+            hx, hy, (kind, tx, ty, _) = spells[entity_id]
+            if reaches(x, y, hx, hy, SPELL_RADIUS):
+                if kind == CONTROL:
+                    vx, vy = control(x, y, tx, ty)
+                    controlled = True
+                else:
+                    shield = SHIELDED
+        for hx, hy in moved:
+            if (x - hx) ** 2 + (y - hy) ** 2 <= r2:
+                health -= HERO_DAMAGE
+                mana += 1
+        if health <= 0:
+            continue
+        inside = 0 <= x <= WIDTH and 0 <= y <= HEIGHT
+        if not controlled:
+            if x * x + y * y <= ATTRACTION_RADIUS * ATTRACTION_RADIUS:
+                vx, vy = toward(x, y, 0, 0, MONSTER_SPEED)
+            elif (WIDTH - x) ** 2 + (HEIGHT - y) ** 2 <= ATTRACTION_RADIUS * ATTRACTION_RADIUS:
+                vx, vy = toward(x, y, WIDTH, HEIGHT, MONSTER_SPEED)
+        x += vx
+        y += vy
+        if x * x + y * y <= DAMAGE_RADIUS * DAMAGE_RADIUS:
+            ours += 1
+        elif (WIDTH - x) ** 2 + (HEIGHT - y) ** 2 <= DAMAGE_RADIUS * DAMAGE_RADIUS:
+            theirs += 1
+        elif not inside or 0 <= x <= WIDTH and 0 <= y <= HEIGHT:
+            alive.append((entity_id, x, y, vx, vy, health, shield - 1 if shield else 0))
+    return tuple(moved), tuple(alive), mana, ours, theirs
+
+
+def evaluate(heroes: Tuple[HeroState, ...], monsters: Tuple[MonsterState, ...], mana: int) -> float:
+    """Static value of a position, higher is better for us."""
+    value = mana * MANA_VALUE
+    for _, x, y, vx, vy, health, shield in monsters:
+        d = sqrt(x * x + y * y)
+        if d < THREAT_RADIUS:
+            # 自陣に着くまでのターン数が短く、体力が多いほど危ない
+            turns = max(0.0, d - DAMAGE_RADIUS) / MONSTER_SPEED
+            value -= THREAT_WEIGHT * health / (1 + turns)
+            reach = min((x - hx) ** 2 + (y - hy) ** 2 for hx, hy in heroes)
+            value -= COVER_WEIGHT * health * sqrt(reach)
+        else:
+            d2 = sqrt((WIDTH - x) ** 2 + (HEIGHT - y) ** 2)
+            if d2 < ATTRACTION_RADIUS:
+                value += PRESSURE_WEIGHT * (health + shield) * (ATTRACTION_RADIUS - d2) / ATTRACTION_RADIUS
+    return value
+
+
+def candidates(hero: HeroState, monsters: Tuple[MonsterState, ...], mana: int) -> List[Action]:
+    """Plain moves for one hero: chase the closest threat to our base or
+    the closest monster to the hero, or WIND everything near it away."""
+    hx, hy = hero
+    actions = []
+    threats = [m for m in monsters if m[1] * m[1] + m[2] * m[2] < THREAT_RADIUS * THREAT_RADIUS]
+    if threats:
+        m = min(threats, key=lambda m: m[1] * m[1] + m[2] * m[2])
+        actions.append((MOVE, m[1] + m[3], m[2] + m[4], -1))
+        m = min(threats, key=lambda m: (m[1] - hx) ** 2 + (m[2] - hy) ** 2)
+        action = (MOVE, m[1] + m[3], m[2] + m[4], -1)
+        if action not in actions:
+            actions.append(action)
+    if mana >= SPELL_COST and any(
+            m[6] == 0 and (m[1] - hx) ** 2 + (m[2] - hy) ** 2 <= WIND_RADIUS * WIND_RADIUS for m in monsters):
+        actions.append((WIND, WIDTH, HEIGHT, -1))
+    if not actions:
+        actions.append((MOVE, hx, hy, -1))
+    return actions
+
+
+class Node:
+    __slots__ = ("heroes", "monsters", "mana", "score", "value", "root")
+
+    def __init__(self, heroes: Tuple[HeroState, ...], monsters: Tuple[MonsterState, ...], mana: int, score: float,
+                 root: int):
+        self.heroes = heroes
+        self.monsters = monsters
+        self.mana = mana
+        self.score = score
+        self.root = root
+        self.value = score
+
+
+class BeamSearch:
+    """Beam search over joint actions of our three heroes.
+
+    The first layer expands every combination of the given root candidates;
+    deeper layers expand `candidates` for each hero and keep the `width`
+    best nodes. The search deepens one layer at a time up to MAX_DEPTH
+    layers or `max_nodes` expanded nodes, and answers with the root move of
+    the best node of the deepest layer it finished. Those limits alone
+    decide where it stops, so a position always gets the same answer;
+    `deadline` is only a safety cap, past which it answers early, or None
+    if not even the first layer fit.
+
+    The first candidate of every hero is taken to be the heuristic's action.
+    The best line starting with all of them always survives pruning, and
+    the search only switches away from it for a gain of at least `margin`.
+    """
+
+    def __init__(self, width: int = BEAM_WIDTH, discount: float = DISCOUNT, margin: float = SWITCH_MARGIN,
+                 max_nodes: int = MAX_NODES):
+        self.width = width
+        self.max_nodes = max_nodes
+        self.discount = discount
+        self.margin = margin
+        self.nodes = 0
+        self.depth = 0
+
+    def search(self, heroes: Sequence[HeroState], monsters: Tuple[MonsterState, ...], mana: int,
+               roots: Sequence[Sequence[Action]], deadline: float) -> Optional[Tuple[int, ...]]:
+        self.nodes = 0
+        self.depth = 0
+        joints = list(product(*[range(len(choices)) for choices in roots]))
+        beam = []
+        for i, joint in enumerate(joints):
+            if perf_counter() > deadline:
+                return None
+            actions = [choices[k] for choices, k in zip(roots, joint)]
+            beam.append(self.expand(Node(tuple(heroes), monsters, mana, 0.0, i), actions, 1.0))
+        best = self.select(beam)
+        self.depth = 1
+        weight = self.discount
+        while beam and self.depth < MAX_DEPTH and perf_counter() < deadline:
+            children = []
+            for node in beam:
+                if self.nodes >= self.max_nodes or perf_counter() > deadline:
+                    return joints[best]
+                choices = [candidates(hero, node.monsters, node.mana) for hero in node.heroes]
+                for actions in product(*choices):
+                    children.append(self.expand(node, actions, weight))
+            beam = children
+            best = self.select(beam)
+            self.depth += 1
+            weight *= self.discount
+        return joints[best]
+
+    def expand(self, node: Node, actions: Sequence[Action], weight: float) -> Node:
+        self.nodes += 1
+        heroes, monsters, mana, ours, theirs = step(node.heroes, node.monsters, node.mana, actions)
+        score = node.score + weight * (ENEMY_BASE_HIT * theirs - BASE_HIT * ours)
+        child = Node(heroes, monsters, mana, score, node.root)
+        child.value = score + weight * evaluate(heroes, monsters, mana)
+        return child
+
+    def select(self, beam: List[Node]) -> int:
+        beam.sort(key=lambda node: -node.value)
+        baseline = next((node for node in beam if node.root == 0), None)
+        del beam[self.width:]
+        if baseline is None:
+            return beam[0].root
+        if baseline not in beam:
+            beam.append(baseline)
+        return beam[0].root if beam[0].value - baseline.value >= self.margin else 0
@@ -0,0 +1,111 @@
+from typing import Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+CELL: int = 1000
+
+
+class SpatialGrid(Generic[T]):
+    """Uniform grid over objects with `x` and `y` attributes.
+
+    Queries return objects in insertion order, so filters written against
+    the grid pick the same element on ties as the list comprehensions they
+    replace. Call `update(item)` after moving an object.
+    """
+
+    def __init__(self, items: Iterable[T] = (), cell: int = CELL):
+        self.cell = cell
+        self.cells: Dict[Tuple[int, int], List[Tuple[int, T]]] = {}
+        self.keys: Dict[int, Tuple[int, int]] = {}
+        self.order: Dict[int, int] = {}
+        for item in items:
+            self.insert(item)
+
+    def key(self, x: float, y: float) -> Tuple[int, int]:
+        return int(x // self.cell), int(y // self.cell)
+
+    def insert(self, item: T):
+        key = self.key(item.x, item.y)
+        order = self.order.setdefault(id(item), len(self.order))
+        self.cells.setdefault(key, []).append((order, item))
+        self.keys[id(item)] = key
+
+    def update(self, item: T):
+        key = self.key(item.x, item.y)
+        old = self.keys[id(item)]
+        if key == old:
+            return
+        bucket = self.cells[old]
+        bucket[:] = [entry for entry in bucket if entry[1] is not item]
+        self.cells.setdefault(key, []).append((self.order[id(item)], item))
+        self.keys[id(item)] = key
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def within(self, x: float, y: float, r: float, inclusive: bool = False) -> List[T]:
+        """Objects closer than `r` to (x, y), or at most `r` with `inclusive`."""
+        r2 = r * r
+        x0, y0 = self.key(x - r, y - r)
+        x1, y1 = self.key(x + r, y + r)
+        found = []
+        for i in range(x0, x1 + 1):
+            for j in range(y0, y1 + 1):
+                for order, item in self.cells.get((i, j), ()):
+                    d2 = (item.x - x) ** 2 + (item.y - y) ** 2
+                    if d2 < r2 or inclusive and d2 == r2:
+                        found.append((order, item))
+        found.sort(key=lambda entry: entry[0])
+        return [item for _, item in found]
+
+    def any_within(self, x: float, y: float, r: float) -> bool:
+        r2 = r * r
+        x0, y0 = self.key(x - r, y - r)
+        x1, y1 = self.key(x + r, y + r)
+        for i in range(x0, x1 + 1):
+            for j in range(y0, y1 + 1):
+                for _, item in self.cells.get((i, j), ()):
+                    if (item.x - x) ** 2 + (item.y - y) ** 2 < r2:
+                        return True
+        return False
+
+    def nearest(self, x: float, y: float) -> Optional[T]:
+        """The closest object to (x, y), the earliest inserted on ties; None on an empty grid.
+
+        Rings of cells are scanned outward from (x, y), walking only the
+        part of each ring's border inside the occupied extent, until the
+        best distance found is shorter than anything further out can be.
+        Once the rings have cost more cells than there are occupied ones,
+        the occupied cells are scanned directly instead, so a sparse grid
+        never costs more than a pass over its contents.
+        """
+        occupied = [key for key, bucket in self.cells.items() if bucket]
+        if not occupied:
+            return None
+        cx, cy = self.key(x, y)
+        x0, x1 = min(key[0] for key in occupied), max(key[0] for key in occupied)
+        y0, y1 = min(key[1] for key in occupied), max(key[1] for key in occupied)
+        # 占有範囲までの周は空なので飛ばす
+        start = max(0, x0 - cx, cx - x1, y0 - cy, cy - y1)
+        reach = max(cx - x0, x1 - cx, cy - y0, y1 - cy)
+        best, best_key = None, None
+        visited = 0
+        for k in range(start, reach + 1):
+            ring = [(i, j) for j in {cy - k, cy + k} if y0 <= j <= y1
+                    for i in range(max(cx - k, x0), min(cx + k, x1) + 1)]
+            ring += [(i, j) for i in {cx - k, cx + k} if x0 <= i <= x1
+                     for j in range(max(cy - k + 1, y0), min(cy + k - 1, y1) + 1)]
+            visited += len(ring)
+            if visited > len(occupied):
+                ring = occupied
+            for i, j in ring:
+                for order, item in self.cells.get((i, j), ()):
+                    key = ((item.x - x) ** 2 + (item.y - y) ** 2, order)
+                    if best_key is None or key < best_key:
+                        best, best_key = item, key
+            if ring is occupied:
+                break
+            # k + 1 周目より外は少なくとも k * cell 離れている、ちょうどその距離なら挿入順で前のものがありうる
+            if best_key is not None and best_key[0] < (k * self.cell) ** 2:
+                break
+        return best
@@ -0,0 +1,95 @@
+from typing import List
+
+import numpy as np
+
+from core.constants import HEIGHT, WIDTH
+
+CONTROLLED: int = 1
+NEAR_BASE: int = 2
+TARGETING: int = 4
+
+
+def norm(dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+    # hypot では丸めが math.sqrt とずれることがあるので同じ式で計算する
+    return np.sqrt(dx * dx + dy * dy)
+
+
+def pairwise(ax: np.ndarray, ay: np.ndarray, bx: np.ndarray, by: np.ndarray) -> np.ndarray:
+    return norm(ax[:, None] - bx[None, :], ay[:, None] - by[None, :])
+
+
+class EntityTable:
+    """Struct-of-arrays view of one turn's entities.
+
+    Rows follow the order of the lists passed in; coordinates are the
+    mirrored ones stored on the objects, so our base is always at (0, 0).
+    """
+
+    def __init__(self, heroes: List, monsters: List, enemies: List):
+        self.ids = np.array([monster.id for monster in monsters], dtype=np.int64)
+        self.x = np.array([monster.x for monster in monsters], dtype=np.float64)
+        self.y = np.array([monster.y for monster in monsters], dtype=np.float64)
+        self.vx = np.array([monster.vx for monster in monsters], dtype=np.float64)
+        self.vy = np.array([monster.vy for monster in monsters], dtype=np.float64)
+        self.shield = np.array([monster.shield for monster in monsters], dtype=np.int64)
+        self.health = np.array([monster.health for monster in monsters], dtype=np.int64)
+        self.flags = np.array([
+            CONTROLLED * monster.is_controlled + NEAR_BASE * monster.near_base + TARGETING * monster.targeting
+            for monster in monsters
+        ], dtype=np.int64)
+        self.hx = np.array([hero.x for hero in heroes], dtype=np.float64)
+        self.hy = np.array([hero.y for hero in heroes], dtype=np.float64)
+        self.ex = np.array([enemy.x for enemy in enemies], dtype=np.float64)
+        self.ey = np.array([enemy.y for enemy in enemies], dtype=np.float64)
+        self.row = {entity_id: i for i, entity_id in enumerate(self.ids.tolist())}
+        self.hero_row = {hero.id: i for i, hero in enumerate(heroes)}
+        self.enemy_row = {enemy.id: i for i, enemy in enumerate(enemies)}
+
+        self.next_x = np.clip(np.round(self.x + self.vx), 0, WIDTH)
+        self.next_y = np.clip(np.round(self.y + self.vy), 0, HEIGHT)
+        self.base = norm(self.x, self.y)
+        self.base2 = norm(WIDTH - self.x, HEIGHT - self.y)
+        self.next_base = norm(self.next_x, self.next_y)
+        self.hero_monster = pairwise(self.hx, self.hy, self.x, self.y)
+        self.hero_enemy = pairwise(self.hx, self.hy, self.ex, self.ey)
+        self.monster_enemy = pairwise(self.x, self.y, self.ex, self.ey)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def inside(self) -> np.ndarray:
+        return (0 < self.x) & (self.x < WIDTH) & (0 < self.y) & (self.y < HEIGHT)
+
+    def enemy_within(self, radius: float) -> np.ndarray:
+        """Per monster, whether any enemy hero is closer than `radius`."""
+        return (self.monster_enemy < radius).any(axis=1)
+
+    def from_point(self, x: float, y: float) -> np.ndarray:
+        return norm(self.x - x, self.y - y)
+
+    def move(self, monster):
+        """Follow a monster moved or turned by our own prediction."""
+        i = self.row[monster.id]
+        x, y = monster.x, monster.y
+        self.x[i] = x
+        self.y[i] = y
+        self.vx[i] = monster.vx
+        self.vy[i] = monster.vy
+        self.flags[i] = (CONTROLLED * monster.is_controlled + NEAR_BASE * monster.near_base
+                         + TARGETING * monster.targeting)
+        self.next_x[i] = min(max(x + monster.vx, 0), WIDTH)
+        self.next_y[i] = min(max(y + monster.vy, 0), HEIGHT)
+        self.base[i] = norm(x, y)
+        self.base2[i] = norm(WIDTH - x, HEIGHT - y)
+        self.next_base[i] = norm(self.next_x[i], self.next_y[i])
+        self.hero_monster[:, i] = norm(self.hx - x, self.hy - y)
+        self.monster_enemy[i] = norm(self.ex - x, self.ey - y)
+
+    def move_enemy(self, enemy):
+        """Follow an enemy hero pushed by our own prediction."""
+        i = self.enemy_row[enemy.id]
+        x, y = enemy.x, enemy.y
+        self.ex[i] = x
+        self.ey[i] = y
+        self.hero_enemy[:, i] = norm(self.hx - x, self.hy - y)
+        self.monster_enemy[:, i] = norm(self.x - x, self.y - y)
@@ -0,0 +1,68 @@
+from math import ceil, isqrt
+from typing import Optional, Tuple
+
+from core.constants import HEIGHT, MONSTER_RADIUS, WIDTH
+
+OUR_BASE: int = 0
+ENEMY_BASE: int = 1
+OUTSIDE: int = 2
+# 速度 0 で何にも届かない
+NOWHERE: int = 3
+
+
+def enter_circle(x: int, y: int, vx: int, vy: int, cx: int, cy: int, r: int) -> Optional[int]:
+    """First integer step k >= 0 with |(x, y) + k (vx, vy) - (cx, cy)| <= r."""
+    dx, dy = x - cx, y - cy
+    a = vx * vx + vy * vy
+    b = dx * vx + dy * vy
+    c = dx * dx + dy * dy - r * r
+    if c <= 0:
+        return 0
+    if a == 0:
+        return None
+    disc = b * b - a * c
+    if disc < 0:
+        return None
+    # 整数演算で根を挟み込み、浮動小数点の誤差で 1 ずれないようにする
+    k = max(0, ceil((-b - isqrt(disc) - 1) / a))
+    while k > 0 and a * (k - 1) * (k - 1) + 2 * b * (k - 1) + c <= 0:
+        k -= 1
+    for k in (k, k + 1, k + 2):
+        if a * k * k + 2 * b * k + c <= 0:
+            return k
+    return None
+
+
+def leave_range(p: int, v: int, high: int) -> Optional[int]:
+    """First integer step k >= 0 with p + k v outside [0, high]."""
+    if p < 0 or high < p:
+        return 0
+    if v > 0:
+        return (high - p) // v + 1
+    if v < 0:
+        return p // -v + 1
+    return None
+
+
+def trajectory(x: int, y: int, vx: int, vy: int) -> Tuple[int, Optional[int], Optional[Tuple[int, int]]]:
+    """Where a monster drifting in a straight line ends up.
+
+    Returns (outcome, turns, point): the first of our base's and the enemy
+    base's MONSTER_RADIUS circles or the map border reached at a whole
+    step, how many steps that takes and where the monster is then. Ties at
+    the same step resolve in that order. A monster that never reaches any
+    of them yields (NOWHERE, None, None).
+    """
+    events = []
+    for outcome, k in (
+        (OUR_BASE, enter_circle(x, y, vx, vy, 0, 0, MONSTER_RADIUS)),
+        (ENEMY_BASE, enter_circle(x, y, vx, vy, WIDTH, HEIGHT, MONSTER_RADIUS)),
+        (OUTSIDE, leave_range(x, vx, WIDTH)),
+        (OUTSIDE, leave_range(y, vy, HEIGHT)),
+    ):
+        if k is not None:
+            events.append((k, outcome))
+    if not events:
+        return NOWHERE, None, None
+    k, outcome = min(events)
+    return outcome, k, (x + k * vx, y + k * vy)
@@ -1,11 +1,16 @@
-from math import atan2, pi, sqrt
+from math import pi, sqrt
 from operator import attrgetter
 from typing import List, Optional, Union
 
-Number = Union[int, float]
+from common import profiling
+from common.fastio import IntReader
+from common.timing import TurnTimer
+from core import commands, model
+from core.constants import HEIGHT, WIDTH
+from core.model import Base, Enemy, Monster, Number, Point
+from core.registry import Registry
+from core.spatial import SpatialGrid
 
-WIDTH: int = 17630
-HEIGHT: int = 9000
 POSITION = [
     [6710, 2200],
     [5555, 5555],
@@ -13,83 +18,12 @@ POSITION = [
 ]
 
 
-class Point:
-    def __init__(self, x: Number, y: Number):
-        self.x = max(0, min(round(x), WIDTH))
-        self.y = max(0, min(round(y), HEIGHT))
-
-    def __str__(self):
-        return f"({self.x}, {self.y})"
-
-
-class Base:
-    def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
-        self.side = [0, 1][self.y > 4500]
-        self.health = 0
-        self.mana = 0
-        self.has_mana = self.mana >= 10
-        self.has_more_mana = self.mana >= 50
-
-    def update(self, health: int, mana: int):
-        self.health = health
-        self.mana = mana
-        self.has_mana = self.mana >= 10
-        self.has_more_mana = self.mana >= 50
-
-    def spell(self):
-        self.mana -= 10
-        self.has_mana = self.mana >= 10
-        self.has_more_mana = self.mana >= 50
-
-
-class Monster:
-    def __init__(self, entity_id: int, x: int, y: int, shield: int, is_controlled, health: int, vx: int, vy: int, near_base: int, base: Base):
-        self.id = entity_id
-        self.x = x if base.side == 0 else WIDTH - x
-        self.y = y if base.side == 0 else HEIGHT - y
-        self.shield = shield
-        self.is_controlled = is_controlled == 1
-        self.health = health
-        self.vx = vx if base.side == 0 else -vx
-        self.vy = vy if base.side == 0 else -vy
-        self.near_base = near_base == 1
-        self.distance = sqrt(self.x ** 2 + self.y ** 2)
-        self.argument = atan2(self.y, self.x)
-        self.next_point = Point(self.x + self.vx, self.y + self.vy)
-        self.in_base = self.distance < 6000
-        self.is_threat = self.distance < 3000
-        self.targeting = self.vx < 0 and self.vy < 0
-        self.is_controlling = self.is_controlled and not self.targeting
-
-
-class Enemy:
-    def __init__(self, entity_id: int, x: int, y: int, shield, is_controlled, base: Base):
-        self.id = entity_id
-        self.x = x if base.side == 0 else WIDTH - x
-        self.y = y if base.side == 0 else HEIGHT - y
-        self.shield = shield
-        self.is_controlled = is_controlled == 1
-        self.base = base
-        self.distance = sqrt(self.x ** 2 + self.y ** 2)
-
-
-class Hero:
-    _count: int = 0
-
+class Hero(model.Hero):
     def __init__(self, x: int, y: int, base: Base):
-        self.id = Hero._count
-        self.x = x if base.side == 0 else WIDTH - x
-        self.y = y if base.side == 0 else HEIGHT - y
-        self.base = base
+        super().__init__(x, y, base)
         self.px = POSITION[self.id][0]
         self.py = POSITION[self.id][1]
-        Hero._count += 1
-
-    def update(self, x: int, y: int):
-        self.x = x if self.base.side == 0 else WIDTH - x
-        self.y = y if self.base.side == 0 else HEIGHT - y
+        self.monster_grid: SpatialGrid[Monster] = SpatialGrid()
 
     def distance(self, x: Optional[Number], y: Optional[Number]) -> float:
         if x is None:
@@ -124,7 +58,7 @@ class Hero:
 
         if not targets:
             # 対応すべきモンスターがいない場合
-            if enemy and self.base.has_more_mana:
+            if enemy and self.base.has_more_mana(50):
                 # 対応すべき相手チームヒーローがいて、マナに余裕がある場合は相手チームヒーローを相手陣地に戻す
                 return self.control(enemy)
             # そうでない場合は定位置に戻る
@@ -136,10 +70,10 @@ class Hero:
         if target.in_base and target.shield > 0:
             return self.move(target.next_point)
         # ターゲットが自陣近くまで迫っていて、WIND 圏内にいる場合は WIND する
-        if self.base.has_mana and target.is_threat and self.within_range(target):
+        if self.base.has_mana() and target.is_threat and self.within_range(target):
             return self.wind()
         # マナに余裕がなければ通常攻撃
-        if not self.base.has_more_mana:
+        if not self.base.has_more_mana(50):
             return self.move(target.next_point)
         # 近くに相手チームヒーローがいれば相手陣地に戻す
         if enemy:
@@ -148,60 +82,66 @@ class Hero:
         if target.shield > 0:
             return self.move(target.next_point)
         # ターゲットが自陣内にいなくて、WIND 圏内に他のモンスターがいない場合は相手陣地に送る
-        if not target.in_base and len([t for t in targets if self.within_range(t)]) < 2:
+        ids = {t.id for t in targets}
+        if not target.in_base and len([t for t in self.monster_grid.within(self.x, self.y, 1000) if t.id in ids]) < 2:
             return self.control(target)
         # ターゲットが WIND 圏内にいれば WIND
         if self.within_range(target):
             return self.wind()
         return self.move(target.next_point)
 
+    def fallback(self) -> str:
+        return self.move(Point(self.px, self.py))
+
     def move(self, target: Point) -> str:
-        if self.base.side == 0:
-            return f"MOVE {target.x} {target.y}"
-        else:
-            return f"MOVE {WIDTH - target.x} {HEIGHT - target.y}"
+        return commands.move(self.base.side, target.x, target.y)
 
     def wind(self) -> str:
         self.base.spell()
-        if self.base.side == 0:
-            return f"SPELL WIND {WIDTH} {HEIGHT}"
-        else:
-            return f"SPELL WIND 0 0"
+        return commands.wind(self.base.side, WIDTH, HEIGHT)
 
     def control(self, target: Union[Monster, Enemy]) -> str:
         self.base.spell()
         target.is_controlling = True
-        if self.base.side == 0:
-            return f"SPELL CONTROL {target.id} {WIDTH} {HEIGHT}"
-        else:
-            return f"SPELL CONTROL {target.id} 0 0"
+        return commands.control(self.base.side, target.id, WIDTH, HEIGHT)
 
 
 def main():
-    base_x, base_y = map(int, input().split())
+    reader = IntReader()
+    base_x, base_y = reader.ints(2)
     base = Base(base_x, base_y)
-    _ = int(input())
+    _ = reader.int()
     heroes = {}
+    timer = TurnTimer()
+    profiling.install(timer, branches=[(Hero, ("move", "wind", "control"))])
+    monster_registry = Registry(lambda entity_id, *fields: Monster(entity_id, *fields, base))
+    enemy_registry = Registry(lambda entity_id, *fields: Enemy(entity_id, *fields, base))
     while True:
-        my_health, my_mana = map(int, input().split())
+        monster_registry.next_turn()
+        enemy_registry.next_turn()
+        my_health, my_mana = reader.ints(2)
+        timer.start_turn()
         base.update(my_health, my_mana)
-        _ = map(int, input().split())
-        entity_count = int(input())
+        _ = reader.ints(2)
+        entity_count = reader.int()
         monsters = []
         enemies = []
-        for _ in range(entity_count):
-            entity_id, entity_type, x, y, shield_life, is_controlled, health, vx, vy, near_base, _ = map(int, input().split())
+        for entity_id, entity_type, x, y, shield_life, is_controlled, health, vx, vy, near_base, _ in reader.rows(
+                entity_count, 11):
             if entity_type == 0:
-                monsters.append(Monster(entity_id, x, y, shield_life, is_controlled, health, vx, vy, near_base, base))
+                monsters.append(monster_registry.update(entity_id, x, y, shield_life, is_controlled, health, vx, vy, near_base))
             elif entity_type == 1:
                 if entity_id not in heroes:
                     heroes[entity_id] = Hero(x, y, base)
                 else:
                     heroes[entity_id].update(x, y)
             elif entity_type == 2:
-                enemies.append(Enemy(entity_id, x, y, shield_life, is_controlled, base))
+                enemies.append(enemy_registry.update(entity_id, x, y, shield_life, is_controlled))
+        monster_grid = SpatialGrid(monsters)
         for hero in sorted(heroes.values(), key=attrgetter('id')):
-            print(hero.get_action(monsters, enemies))
+            hero.monster_grid = monster_grid
+            print(timer.decide(lambda: hero.get_action(monsters, enemies), hero.fallback))
+        timer.end_turn()
 
 
 if __name__ == '__main__':
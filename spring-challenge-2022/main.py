@@ -1,125 +1,28 @@
-from math import sqrt, pi, cos, sin, atan2
+from math import pi, cos, sin
 from operator import attrgetter, itemgetter
-from typing import List, Union
+from typing import List, Optional, Set, Tuple, Union
 
-Number = Union[int, float]
+from common import profiling
+from common.fastio import IntReader
+from common.timing import TurnTimer
+from core import commands, model
+from core.context import TurnContext
+from core.constants import BASE_RADIUS, HEIGHT, SEARCH_RADIUS, WIDTH, WIND_RADIUS
+from core.model import Base, Enemy, Monster, Point, distance
+from core.registry import Registry
 
-WIDTH: int = 17630
-HEIGHT: int = 9000
-BASE_RADIUS: int = 6000
-MONSTER_RADIUS: int = 5000
-SEARCH_RADIUS: int = 2200
-WIND_RADIUS: int = 1280
-
-
-def distance(x1: int, y1: int, x2: int, y2: int) -> float:
-    return sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
-
-
-class Point:
-    def __init__(self, x: Number, y: Number):
-        self.x = max(0, min(round(x), WIDTH))
-        self.y = max(0, min(round(y), HEIGHT))
-        self.distance = distance(self.x, self.y, 0, 0)
-
-
-class Base:
-    def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
-        self.side = [0, 1][self.y > 4500]
-        self.health = 0
-        self.mana = 0
-
-    def update(self, health: int, mana: int):
-        self.health = health
-        self.mana = mana
-
-    def spell(self):
-        self.mana -= 10
-
-    def has_mana(self):
-        return self.mana >= 10
-
-    def has_more_mana(self, monsters: List):
-        if monsters and min(map(attrgetter("distance"), monsters)) < BASE_RADIUS // 2:
-            return self.mana >= 20
-        else:
-            return self.mana >= 20
-
-
-class Monster:
-    def __init__(self, entity_id: int, x: int, y: int, shield: int, is_controlled, health: int, vx: int, vy: int,
-                 near_base: int, base: Base):
-        self.id = entity_id
-        self.x = x if base.side == 0 else WIDTH - x
-        self.y = y if base.side == 0 else HEIGHT - y
-        self.shield = shield
-        self.is_controlled = is_controlled == 1
-        self.health = health
-        self.vx = vx if base.side == 0 else -vx
-        self.vy = vy if base.side == 0 else -vy
-        self.near_base = near_base == 1
-        self.distance = distance(self.x, self.y, 0, 0)
-        self.distance2 = distance(self.x, self.y, WIDTH, HEIGHT)
-        self.argument = atan2(self.y, self.x)
-        self.next_point = Point(self.x + self.vx, self.y + self.vy)
-        self.in_base = self.distance < 6000
-        self.is_threat = self.distance < 3000
-        self.targeting = self.vx < 0 and self.vy < 0
-        self.is_controlling = self.is_controlled and not self.targeting
-        self.effective = True
-        self.effective2 = True
-        x, y = self.x, self.y
-        while True:
-            if distance(x, y, 0, 0) <= MONSTER_RADIUS:
-                self.effective2 = False
-                break
-            if distance(x, y, WIDTH, HEIGHT) <= MONSTER_RADIUS:
-                self.effective = False
-                break
-            if x < 0 or WIDTH < x or y < 0 or HEIGHT < y:
-                self.effective = False
-                self.effective2 = False
-                break
-            x += self.vx
-            y += self.vy
-
-    def behind_point(self) -> Point:
-        arg = atan2(HEIGHT - self.next_point.y, WIDTH - self.next_point.x)
-        r = distance(self.next_point.x, self.next_point.y, WIDTH, HEIGHT) + 1040
-        return Point(WIDTH - r * cos(arg), HEIGHT - r * sin(arg))
-
-
-class Enemy:
-    def __init__(self, entity_id: int, x: int, y: int, shield, is_controlled, base: Base):
-        self.id = entity_id
-        self.x = x if base.side == 0 else WIDTH - x
-        self.y = y if base.side == 0 else HEIGHT - y
-        self.shield = shield
-        self.is_controlled = is_controlled == 1
-        self.base = base
-        self.distance = distance(self.x, self.y, 0, 0)
-        self.distance2 = distance(self.x, self.y, WIDTH, HEIGHT)
-
-
-class Hero:
-    _count: int = 0
 
+class Hero(model.Hero):
     def __init__(self, x: int, y: int, base: Base):
-        self.id = Hero._count
-        self.x = x if base.side == 0 else WIDTH - x
-        self.y = y if base.side == 0 else HEIGHT - y
-        self.base = base
+        super().__init__(x, y, base)
         self.arg = pi / 4
         self.dest = Point(BASE_RADIUS * cos(self.arg), BASE_RADIUS * sin(self.arg))
         self.direction = 1
         self.turn = 0
-        Hero._count += 1
+        self.context = TurnContext([], [])
 
     def update(self, x: int, y: int):
-        self.x = x if self.base.side == 0 else WIDTH - x
-        self.y = y if self.base.side == 0 else HEIGHT - y
+        super().update(x, y)
         self.turn += 1
 
     def defence_action(self, monsters: List[Monster], enemies: List[Enemy]) -> str:
@@ -131,17 +34,42 @@ class Hero:
             if self.arg > 9 * pi / 20:
                 self.direction = -1
         self.turn += 1
+        # 同じヒーローが同じ位置から何度呼ばれても、呪文で盤面が変わるまでは計算し直さない
+        monsters, target, center, cluster = self.context.memo(("defence", self.id, self.x, self.y),
+                                                              lambda: self.threats(monsters))
+        if not monsters:
+            return self.move(self.dest)
+        if not self.base.has_mana() or distance(self.x, self.y, target.x, target.y) > WIND_RADIUS:
+            if target.id in cluster:
+                return self.move(center)
+            else:
+                return self.move(target.next_point)
+        if self.context.enemy_near(target, WIND_RADIUS):
+            if target.shield == 0 and target.distance < SEARCH_RADIUS + WIND_RADIUS:
+                return self.push_back(target)
+        else:
+            if target.shield == 0 and target.distance < WIND_RADIUS and target.health > 4:
+                return self.push_back(target)
+        if target.id not in cluster:
+            return self.move(target.next_point)
+        enemies = self.context.enemies_near(self, SEARCH_RADIUS)
+        if enemies:
+            return self.control(min(enemies, key=attrgetter("distance")), WIDTH, HEIGHT)
+        return self.move(center)
+
+    def threats(self, monsters: List[Monster]) -> Tuple[List[Monster], Optional[Monster], Optional[Point], Set[int]]:
+        """The monsters to defend against, the most urgent one, and the cluster around their weighted center."""
         monsters = [monster for monster in monsters if monster.next_point.distance < BASE_RADIUS + SEARCH_RADIUS]
+        if not monsters:
+            return monsters, None, None, set()
         level = [monster.next_point.distance for monster in monsters]
         for i, monster in enumerate(monsters):
-            if [enemy for enemy in enemies if distance(monster.x, monster.y, enemy.x, enemy.y) < WIND_RADIUS]:
+            if self.context.enemy_near(monster, WIND_RADIUS):
                 level[i] = min(level[i], monster.distance - 2200)
             level[i] **= 2
             level[i] += distance(self.x, self.y, monster.x, monster.y)
             level[i] -= monster.health * 5
             level[i] -= monster.shield * 20
-        if not monsters:
-            return self.move(self.dest)
         target = min([(lv, monster) for monster, lv in zip(monsters, level)], key=itemgetter(0))[1]
         g, gx, gy = 0, 0, 0
         for monster, lv in zip(monsters, level):
@@ -149,31 +77,7 @@ class Hero:
             gx += monster.next_point.x / lv
             gy += monster.next_point.y / lv
         center = Point(gx / g, gy / g)
-        if not self.base.has_mana() or distance(self.x, self.y, target.x, target.y) > WIND_RADIUS:
-            if target.id in [monster.id for monster in monsters if
-                             distance(center.x, center.y, monster.x, monster.y) < 800]:
-                return self.move(center)
-            else:
-                return self.move(target.next_point)
-        if [enemy for enemy in enemies if distance(enemy.x, enemy.y, target.x, target.y) < WIND_RADIUS]:
-            if target.shield == 0 and target.distance < SEARCH_RADIUS + WIND_RADIUS:
-                return self.push_back(target, monsters)
-        else:
-            if target.shield == 0 and target.distance < WIND_RADIUS and target.health > 4:
-                return self.push_back(target, monsters)
-        if target.id not in [monster.id for monster in monsters
-                             if distance(center.x, center.y, monster.x, monster.y) < 800]:
-            return self.move(target.next_point)
-        enemies = [enemy for enemy in enemies if distance(self.x, self.y, enemy.x, enemy.y) < SEARCH_RADIUS]
-        if enemies and len([
-            monster.id for monster in monsters
-            if distance(center.x, center.y, monster.x, monster.y) < 800
-        ]) <= len([
-            monster.id for monster in monsters
-            if distance(center.x, center.y, monster.x, monster.y) < 800
-        ]):
-            return self.control(min(enemies, key=attrgetter("distance")), WIDTH, HEIGHT)
-        return self.move(center)
+        return monsters, target, center, self.context.within(monsters, center.x, center.y, 800)
 
     def attack_action(self, monsters: List[Monster], enemies: List[Enemy]) -> str:
         # 敵拠点から 6000 付近を徘徊
@@ -186,68 +90,75 @@ class Hero:
         else:
             return self.attack_action(monsters, enemies)
 
+    def fallback(self) -> str:
+        return self.move(self.dest)
+
     def move(self, target: Point) -> str:
-        if self.base.side == 0:
-            return f"MOVE {target.x} {target.y}"
-        else:
-            return f"MOVE {WIDTH - target.x} {HEIGHT - target.y}"
+        return commands.move(self.base.side, target.x, target.y)
 
-    def push_back(self, target: Monster, monsters: List[Monster]) -> str:
-        self.base.spell()
-        for i, monster in enumerate(monsters):
-            if monster.shield == 0 and distance(self.x, self.y, monster.x, monster.y) <= WIND_RADIUS:
-                monsters[i].x += target.x
-                monsters[i].y += target.y
-        return f"SPELL WIND {self.x + target.x} {self.y + target.y}"
+    def push_back(self, target: Monster) -> str:
+        x, y = self.x + target.x, self.y + target.y
+        # 座標を反転せずに出すので、自陣が右下のときは敵陣の方へ飛ばすことになる
+        aim = commands.mirror(self.base.side, x, y)
+        if self.base.spell():
+            self.context.wind(self, *aim)
+        return commands.wind(0, x, y)
 
     def wind(self) -> str:
-        self.base.spell()
-        if self.base.side == 0:
-            return f"SPELL WIND {WIDTH} {HEIGHT}"
-        else:
-            return f"SPELL WIND 0 0"
+        if self.base.spell():
+            self.context.wind(self, WIDTH, HEIGHT)
+        return commands.wind(self.base.side, WIDTH, HEIGHT)
 
     def shield(self, target: Monster) -> str:
-        self.base.spell()
-        target.shield = 11
-        return f"SPELL SHIELD {target.id}"
+        if self.base.spell():
+            self.context.shield(self, target)
+        return commands.shield(target.id)
 
     def control(self, target: Union[Monster, Enemy], x: int, y: int) -> str:
-        self.base.spell()
-        target.is_controlled = True
+        if self.base.spell():
+            self.context.control(self, target, x, y)
         target.is_controlling = True
-        if self.base.side == 0:
-            return f"SPELL CONTROL {target.id} {x} {y}"
-        else:
-            return f"SPELL CONTROL {target.id} {WIDTH - x} {HEIGHT - y}"
+        return commands.control(self.base.side, target.id, x, y)
 
 
 def main():
-    base_x, base_y = map(int, input().split())
+    reader = IntReader()
+    base_x, base_y = reader.ints(2)
     base = Base(base_x, base_y)
-    _ = int(input())
+    _ = reader.int()
     heroes = {}
+    timer = TurnTimer()
+    profiling.install(timer, branches=[(Hero, ("move", "push_back", "wind", "shield", "control"))])
+    monster_registry = Registry(lambda entity_id, *fields: Monster(entity_id, *fields, base))
+    enemy_registry = Registry(lambda entity_id, *fields: Enemy(entity_id, *fields, base))
     while True:
-        my_health, my_mana = map(int, input().split())
+        monster_registry.next_turn()
+        enemy_registry.next_turn()
+        my_health, my_mana = reader.ints(2)
+        timer.start_turn()
         base.update(my_health, my_mana)
-        _ = map(int, input().split())
-        entity_count = int(input())
+        _ = reader.ints(2)
+        entity_count = reader.int()
         monsters = []
         enemies = []
-        for _ in range(entity_count):
-            entity_id, entity_type, x, y, shield_life, is_controlled, health, vx, vy, near_base, _ = map(int,
-                                                                                                         input().split())
+        for entity_id, entity_type, x, y, shield_life, is_controlled, health, vx, vy, near_base, _ in reader.rows(
+                entity_count, 11):
             if entity_type == 0:
-                monsters.append(Monster(entity_id, x, y, shield_life, is_controlled, health, vx, vy, near_base, base))
+                monsters.append(
+                    monster_registry.update(entity_id, x, y, shield_life, is_controlled, health, vx, vy, near_base))
             elif entity_type == 1:
                 if entity_id not in heroes:
                     heroes[entity_id] = Hero(x, y, base)
                 else:
                     heroes[entity_id].update(x, y)
             elif entity_type == 2:
-                enemies.append(Enemy(entity_id, x, y, shield_life, is_controlled, base))
+                enemies.append(enemy_registry.update(entity_id, x, y, shield_life, is_controlled))
+        context = TurnContext(monsters, enemies)
+        for hero in heroes.values():
+            hero.context = context
         for _ in range(3):
-            print(heroes[0].get_action(monsters, enemies))
+            print(timer.decide(lambda: heroes[0].get_action(monsters, enemies), heroes[0].fallback))
+        timer.end_turn()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,351 @@
+import argparse
+import random
+from math import pi, cos, sin
+from typing import Dict, List, Optional, Tuple
+
+from common import match
+from common.match import Result
+from core.physics import toward
+
+WIDTH: int = 17630
+HEIGHT: int = 9000
+MAX_TURNS: int = 220
+HEROES_PER_PLAYER: int = 3
+BASE_HEALTH: int = 3
+BASE_VIEW_RADIUS: int = 6000
+BASE_ATTRACTION_RADIUS: int = 5000
+BASE_DAMAGE_RADIUS: int = 300
+HERO_VIEW_RADIUS: int = 2200
+HERO_SPEED: int = 800
+HERO_ATTACK_RADIUS: int = 800
+HERO_DAMAGE: int = 2
+MONSTER_SPEED: int = 400
+MONSTER_HEALTH: int = 10
+MONSTER_HEALTH_GROWTH: float = 0.5
+MONSTER_SPAWN_INTERVAL: int = 3
+MONSTER_SPAWN_POINTS: List[Tuple[int, int]] = [(WIDTH // 2, -400), (WIDTH // 2 - 4000, -400), (WIDTH // 2 + 4000, -400)]
+SPELL_COST: int = 10
+WIND_RADIUS: int = 1280
+WIND_DISTANCE: int = 2200
+CONTROL_RADIUS: int = 2200
+SHIELD_RADIUS: int = 2200
+SHIELD_DURATION: int = 12
+BASES: List[Tuple[int, int]] = [(0, 0), (WIDTH, HEIGHT)]
+HERO_POSITIONS: List[Tuple[int, int]] = [(1414, 849), (1131, 1131), (849, 1414)]
+
+MONSTER: int = 0
+HERO: int = 1
+
+
+def distance2(x1: int, y1: int, x2: int, y2: int) -> int:
+    return (x1 - x2) ** 2 + (y1 - y2) ** 2
+
+
+class Entity:
+    def __init__(self, entity_id: int, entity_type: int, x: int, y: int, owner: int = -1):
+        self.id = entity_id
+        self.type = entity_type
+        self.owner = owner
+        self.x = x
+        self.y = y
+        self.vx = 0
+        self.vy = 0
+        self.health = -1
+        self.shield = 0
+        self.is_controlled = False
+        self.controlled_to: Optional[Tuple[int, int]] = None
+        self.near_base = False
+        self.target_base = -1
+        self.entered = False
+        self.dirty = True
+
+    def is_inside(self) -> bool:
+        return 0 <= self.x <= WIDTH and 0 <= self.y <= HEIGHT
+
+    def threat(self) -> int:
+        """Index of the base this monster is heading for, or -1."""
+        if self.near_base:
+            return self.target_base
+        if self.dirty:
+            self.dirty = False
+            self.target_base = -1
+            x, y = self.x, self.y
+            if self.vx == 0 and self.vy == 0:
+                return -1
+            for _ in range(2 * (WIDTH + HEIGHT) // MONSTER_SPEED):
+                for b, (bx, by) in enumerate(BASES):
+                    if distance2(x, y, bx, by) <= BASE_ATTRACTION_RADIUS ** 2:
+                        self.target_base = b
+                        return b
+                if (x < 0 or WIDTH < x or y < 0 or HEIGHT < y) and (self.entered or x < -1000 or WIDTH + 1000 < x):
+                    break
+                x += self.vx
+                y += self.vy
+        return self.target_base
+
+    def row(self, player: int) -> str:
+        if self.type == MONSTER:
+            threat = self.threat()
+            threat_for = 0 if threat == -1 else 1 if threat == player else 2
+            return (f"{self.id} 0 {self.x} {self.y} {self.shield} {int(self.is_controlled)} {self.health} "
+                    f"{self.vx} {self.vy} {int(self.near_base)} {threat_for}")
+        entity_type = 1 if self.owner == player else 2
+        return f"{self.id} {entity_type} {self.x} {self.y} {self.shield} {int(self.is_controlled)} -1 -1 -1 -1 -1"
+
+
+class Referee:
+    """Headless implementation of the Spring Challenge 2022 rules.
+
+    A turn resolves in this order: spells (WIND, then CONTROL, then SHIELD),
+    hero movement, hero attacks, monster movement and base damage, shield
+    countdown and finally monster spawning.
+    """
+
+    # 1 ターンに読む行数、ヒーロー 1 体に 1 行
+    ACTION_LINES: int = HEROES_PER_PLAYER
+
+    def __init__(self, seed: int = 0):
+        self.random = random.Random(seed)
+        self.turn = 0
+        self.health = [BASE_HEALTH, BASE_HEALTH]
+        self.mana = [0, 0]
+        self.wild_mana = [0, 0]
+        self.heroes: List[Entity] = []
+        self.monsters: List[Entity] = []
+        self.next_id = 0
+        for player, (bx, by) in enumerate(BASES):
+            for hx, hy in HERO_POSITIONS:
+                x, y = (hx, hy) if player == 0 else (WIDTH - hx, HEIGHT - hy)
+                self.heroes.append(Entity(self.next_id, HERO, x, y, player))
+                self.next_id += 1
+        self.errors: List[List[str]] = [[], []]
+
+    def initial_input(self, player: int) -> List[str]:
+        bx, by = BASES[player]
+        return [f"{bx} {by}", str(HEROES_PER_PLAYER)]
+
+    def is_visible(self, entity: Entity, player: int) -> bool:
+        bx, by = BASES[player]
+        if distance2(entity.x, entity.y, bx, by) <= BASE_VIEW_RADIUS ** 2:
+            return True
+        for hero in self.heroes:
+            if hero.owner == player and distance2(entity.x, entity.y, hero.x, hero.y) <= HERO_VIEW_RADIUS ** 2:
+                return True
+        return False
+
+    def turn_input(self, player: int) -> List[str]:
+        rows = [hero.row(player) for hero in self.heroes if hero.owner == player or self.is_visible(hero, player)]
+        rows += [monster.row(player) for monster in self.monsters if self.is_visible(monster, player)]
+        return [
+            f"{self.health[player]} {self.mana[player]}",
+            f"{self.health[1 - player]} {self.mana[1 - player]}",
+            str(len(rows)),
+            *rows,
+        ]
+
+    def is_over(self) -> bool:
+        return self.turn >= MAX_TURNS or min(self.health) <= 0
+
+    def summary(self) -> Dict[str, List[int]]:
+        return {"health": list(self.health), "wild_mana": list(self.wild_mana)}
+
+    def winner(self) -> int:
+        """0 or 1 for the winning player, -1 for a draw."""
+        if self.health[0] != self.health[1]:
+            return 0 if self.health[0] > self.health[1] else 1
+        if self.wild_mana[0] != self.wild_mana[1]:
+            return 0 if self.wild_mana[0] > self.wild_mana[1] else 1
+        return -1
+
+    def _find(self, entity_id: int) -> Optional[Entity]:
+        for entity in self.heroes:
+            if entity.id == entity_id:
+                return entity
+        for entity in self.monsters:
+            if entity.id == entity_id:
+                return entity
+        return None
+
+    def _parse(self, player: int, actions: List[str]) -> List[Tuple[Entity, List[str]]]:
+        heroes = [hero for hero in self.heroes if hero.owner == player]
+        parsed = []
+        for hero, action in zip(heroes, actions + ["WAIT"] * (len(heroes) - len(actions))):
+            words = action.split()
+            if not words or words[0] not in ("WAIT", "MOVE", "SPELL"):
+                self.errors[player].append(f"turn {self.turn}: invalid action {action!r}")
+                words = ["WAIT"]
+            parsed.append((hero, words))
+        return parsed
+
+    def play_turn(self, actions: List[List[str]]):
+        orders = self._parse(0, actions[0]) + self._parse(1, actions[1])
+        moves = {}
+        winds, controls, shields = [], [], []
+        for hero, words in orders:
+            try:
+                if hero.controlled_to is not None:
+                    moves[hero.id] = hero.controlled_to
+                elif words[0] == "MOVE":
+                    moves[hero.id] = (int(words[1]), int(words[2]))
+                elif words[0] == "SPELL":
+                    if self.mana[hero.owner] < SPELL_COST:
+                        continue
+                    if words[1] == "WIND":
+                        winds.append((hero, int(words[2]), int(words[3])))
+                    elif words[1] == "CONTROL":
+                        controls.append((hero, self._find(int(words[2])), int(words[3]), int(words[4])))
+                    elif words[1] == "SHIELD":
+                        shields.append((hero, self._find(int(words[2]))))
+                    else:
+                        raise ValueError(words[1])
+                    self.mana[hero.owner] -= SPELL_COST
+            except (IndexError, ValueError):
+                self.errors[hero.owner].append(f"turn {self.turn}: invalid action {' '.join(words)!r}")
+        for hero in self.heroes:
+            hero.controlled_to = None
+            hero.is_controlled = False
+        for monster in self.monsters:
+            monster.is_controlled = False
+
+        self._apply_winds(winds)
+        self._apply_controls(controls)
+        self._apply_shields(shields)
+        self._move_heroes(moves)
+        self._attack()
+        self._move_monsters()
+        for entity in self.heroes + self.monsters:
+            if entity.shield > 0:
+                entity.shield -= 1
+        self.turn += 1
+        if self.turn % MONSTER_SPAWN_INTERVAL == 1:
+            self._spawn()
+
+    def _apply_winds(self, winds: List[Tuple[Entity, int, int]]):
+        pushes = {}
+        for hero, x, y in winds:
+            dx, dy = toward(hero.x, hero.y, x, y, WIND_DISTANCE)
+            for entity in self.heroes + self.monsters:
+                if entity.owner == hero.owner or entity.shield > 0:
+                    continue
+                if distance2(entity.x, entity.y, hero.x, hero.y) <= WIND_RADIUS ** 2:
+                    px, py = pushes.get(entity.id, (0, 0))
+                    pushes[entity.id] = (px + dx, py + dy)
+        for entity in self.heroes + self.monsters:
+            if entity.id in pushes:
+                px, py = pushes[entity.id]
+                entity.x += px
+                entity.y += py
+                entity.dirty = True
+                if entity.type == HERO:
+                    entity.x = max(0, min(entity.x, WIDTH))
+                    entity.y = max(0, min(entity.y, HEIGHT))
+
+    def _apply_controls(self, controls: List[Tuple[Entity, Optional[Entity], int, int]]):
+        destinations = {}
+        for hero, target, x, y in controls:
+            if target is None or target.owner == hero.owner or target.shield > 0:
+                continue
+            if distance2(target.x, target.y, hero.x, hero.y) > CONTROL_RADIUS ** 2:
+                continue
+            destinations.setdefault(target.id, (target, []))[1].append((x, y))
+        for target, points in destinations.values():
+            x = sum(p[0] for p in points) // len(points)
+            y = sum(p[1] for p in points) // len(points)
+            target.is_controlled = True
+            if target.type == HERO:
+                target.controlled_to = (x, y)
+            else:
+                target.vx, target.vy = toward(target.x, target.y, x, y, MONSTER_SPEED)
+                target.near_base = False
+                target.dirty = True
+
+    def _apply_shields(self, shields: List[Tuple[Entity, Optional[Entity]]]):
+        for hero, target in shields:
+            if target is None or target.shield > 0:
+                continue
+            if distance2(target.x, target.y, hero.x, hero.y) <= SHIELD_RADIUS ** 2:
+                target.shield = SHIELD_DURATION + 1
+
+    def _move_heroes(self, moves):
+        for hero in self.heroes:
+            if hero.id not in moves:
+                continue
+            x, y = moves[hero.id]
+            if distance2(hero.x, hero.y, x, y) <= HERO_SPEED ** 2:
+                hero.x, hero.y = x, y
+            else:
+                dx, dy = toward(hero.x, hero.y, x, y, HERO_SPEED)
+                hero.x += dx
+                hero.y += dy
+            hero.x = max(0, min(hero.x, WIDTH))
+            hero.y = max(0, min(hero.y, HEIGHT))
+
+    def _attack(self):
+        for hero in self.heroes:
+            bx, by = BASES[hero.owner]
+            for monster in self.monsters:
+                if monster.health > 0 and distance2(monster.x, monster.y, hero.x, hero.y) <= HERO_ATTACK_RADIUS ** 2:
+                    monster.health -= HERO_DAMAGE
+                    self.mana[hero.owner] += 1
+                    if distance2(monster.x, monster.y, bx, by) > BASE_ATTRACTION_RADIUS ** 2:
+                        self.wild_mana[hero.owner] += 1
+        self.monsters = [monster for monster in self.monsters if monster.health > 0]
+
+    def _move_monsters(self):
+        alive = []
+        for monster in self.monsters:
+            if not monster.is_controlled:
+                for b, (bx, by) in enumerate(BASES):
+                    if distance2(monster.x, monster.y, bx, by) <= BASE_ATTRACTION_RADIUS ** 2:
+                        monster.near_base = True
+                        monster.target_base = b
+                        monster.vx, monster.vy = toward(monster.x, monster.y, bx, by, MONSTER_SPEED)
+                        break
+                else:
+                    if monster.near_base:
+                        monster.near_base = False
+                        monster.dirty = True
+            monster.x += monster.vx
+            monster.y += monster.vy
+            if monster.near_base:
+                bx, by = BASES[monster.target_base]
+                if distance2(monster.x, monster.y, bx, by) <= BASE_DAMAGE_RADIUS ** 2:
+                    self.health[monster.target_base] -= 1
+                    continue
+            if monster.is_inside():
+                monster.entered = True
+            elif monster.entered:
+                continue
+            alive.append(monster)
+        self.monsters = alive
+
+    def _spawn(self):
+        x, y = MONSTER_SPAWN_POINTS[self.turn // MONSTER_SPAWN_INTERVAL % len(MONSTER_SPAWN_POINTS)]
+        arg = self.random.uniform(pi / 6, 5 * pi / 6)
+        vx, vy = int(MONSTER_SPEED * cos(arg)), int(MONSTER_SPEED * sin(arg))
+        health = MONSTER_HEALTH + int(self.turn * MONSTER_HEALTH_GROWTH)
+        for sx, sy, svx, svy in ((x, y, vx, vy), (WIDTH - x, HEIGHT - y, -vx, -vy)):
+            monster = Entity(self.next_id, MONSTER, sx, sy)
+            monster.vx, monster.vy = svx, svy
+            monster.health = health
+            self.monsters.append(monster)
+            self.next_id += 1
+
+
+def play_match(bot1: str, bot2: str, seed: int = 0, envs: Optional[List[Optional[dict]]] = None,
+               stderr: bool = False) -> Result:
+    return match.play_match(Referee(seed), bot1, bot2, envs, stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a Spring Challenge 2022 match locally.")
+    parser.add_argument("bot1")
+    parser.add_argument("bot2")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stderr", action="store_true", help="show the bots' stderr")
+    args = parser.parse_args()
+    print(play_match(args.bot1, args.bot2, args.seed, stderr=args.stderr))
+
+
+if __name__ == '__main__':
+    main()
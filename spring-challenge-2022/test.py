@@ -0,0 +1,218 @@
+import argparse
+import gc
+import json
+import platform
+import random
+import subprocess
+import sys
+from math import atan2, cos, pi, sin
+from statistics import median
+from time import perf_counter, time
+from typing import Callable, Dict, List, Tuple
+
+import attack
+import defence
+import main
+import wind
+from core import model
+from core.constants import HEIGHT, WIDTH
+from core.context import TurnContext
+from core.forecast import Forecast
+from core.memory import Memory
+from core.model import Base, Enemy, Monster
+from core.spatial import SpatialGrid
+
+SIZES: List[int] = [0, 5, 15, 30, 60, 90]
+REPEAT: int = 200
+NOISE_US: float = 2.0
+HERO_POSITIONS: List[Tuple[int, int]] = [(4000, 2500), (2500, 4000), (5500, 1500)]
+
+
+class Turn:
+    """Raw entity fields of one synthetic turn, seen from our base at (0, 0).
+
+    Decisions mutate the objects they're given (WIND moves monsters, spells
+    spend mana), so every timed call gets objects freshly built from here.
+    """
+
+    def __init__(self, monsters: int, seed: int):
+        rng = random.Random(seed)
+        self.monsters = []
+        for i in range(monsters):
+            # 半分は自陣に向かってくる
+            x, y = rng.randint(0, WIDTH * 2 // 3), rng.randint(0, HEIGHT)
+            arg = atan2(-y, -x) if rng.random() < 0.5 else rng.uniform(-pi, pi)
+            vx, vy = round(400 * cos(arg)), round(400 * sin(arg))
+            shield = rng.choice([0, 0, 0, rng.randint(1, 12)])
+            near_base = int(x * x + y * y < 5000 ** 2)
+            self.monsters.append((100 + i, x, y, shield, 0, rng.randint(10, 30), vx, vy, near_base))
+        self.enemies = [(10 + i, rng.randint(0, WIDTH // 2), rng.randint(0, HEIGHT), 0, 0) for i in range(3)]
+
+    def build(self) -> Tuple[Base, List[Monster], List[Enemy]]:
+        base = Base(0, 0)
+        base.update(3, 100)
+        model.Hero._count = 0
+        return (base, [Monster(*fields, base) for fields in self.monsters],
+                [Enemy(*fields, base) for fields in self.enemies])
+
+
+def bench_monster_init(turn: Turn) -> Callable[[], object]:
+    base = Base(0, 0)
+    return lambda: [Monster(*fields, base) for fields in turn.monsters]
+
+
+def bench_forecast(turn: Turn) -> Callable[[], object]:
+    _, monsters, _ = turn.build()
+    return lambda: Forecast(monsters)
+
+
+def bench_memory(turn: Turn) -> Callable[[], object]:
+    _, monsters, _ = turn.build()
+    states = [(m.x, m.y, m.shield, m.is_controlled, m.health, m.vx, m.vy, m.near_base) for m in monsters]
+
+    def run() -> object:
+        # 前回の予測で動いた分を戻し、全部を見失ったターンを測る
+        for monster, state in zip(monsters, states):
+            monster.place(*state)
+        memory = Memory()
+        memory.observe(monsters, ())
+        return memory.observe((), ())
+
+    return run
+
+
+def wind_heroes(turn: Turn) -> Tuple[List[wind.Hero], List[Enemy]]:
+    base, monsters, enemies = turn.build()
+    heroes = [wind.Hero(x, y, base, monsters) for x, y in HERO_POSITIONS]
+    context = TurnContext(monsters, enemies, heroes=heroes)
+    for hero in heroes:
+        hero.command.context = context
+    return heroes, enemies
+
+
+def bench_wind(index: int) -> Callable[[Turn], Callable[[], object]]:
+    def setup(turn: Turn) -> Callable[[], object]:
+        heroes, enemies = wind_heroes(turn)
+        return lambda: heroes[index].command.next_action(enemies)
+    return setup
+
+
+def bench_wind_turn(turn: Turn) -> Callable[[], object]:
+    # 守備 2 人は同じ TurnContext を引く
+    heroes, enemies = wind_heroes(turn)
+    return lambda: [hero.command.next_action(enemies) for hero in heroes]
+
+
+def bench_main_defence(turn: Turn) -> Callable[[], object]:
+    base, monsters, enemies = turn.build()
+    hero = main.Hero(*HERO_POSITIONS[0], base)
+    hero.context = TurnContext(monsters, enemies)
+    return lambda: hero.defence_action(monsters, enemies)
+
+
+def bench_defence(turn: Turn) -> Callable[[], object]:
+    base, monsters, enemies = turn.build()
+    heroes = [defence.Hero(x, y, base) for x, y in HERO_POSITIONS]
+    heroes[1].monster_grid = SpatialGrid(monsters)
+    return lambda: heroes[1].get_action(monsters, enemies)
+
+
+def bench_attack(turn: Turn) -> Callable[[], object]:
+    base, monsters, enemies = turn.build()
+    heroes = [attack.Hero(x, y, base) for x, y in HERO_POSITIONS]
+    return lambda: heroes[1].get_action(monsters)
+
+
+BENCHMARKS: Dict[str, Callable[[Turn], Callable[[], object]]] = {
+    "Monster.__init__": bench_monster_init,
+    "Forecast": bench_forecast,
+    "Memory.observe": bench_memory,
+    "wind.DefenderCommand.next_action": bench_wind(1),
+    "wind.AttackerCommand.next_action": bench_wind(0),
+    "wind.turn": bench_wind_turn,
+    "main.Hero.defence_action": bench_main_defence,
+    "defence.Hero.get_action": bench_defence,
+    "attack.Hero.get_action": bench_attack,
+}
+
+
+def measure(setup: Callable[[Turn], Callable[[], object]], turn: Turn, repeat: int) -> List[float]:
+    times = []
+    # timeit と同じく GC を止めて測る
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            call = setup(turn)
+            started = perf_counter()
+            call()
+            times.append(perf_counter() - started)
+    finally:
+        gc.enable()
+    return times
+
+
+def commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def run(names: List[str], sizes: List[int], repeat: int) -> List[Dict]:
+    results = []
+    for name in names:
+        for size in sizes:
+            times = sorted(measure(BENCHMARKS[name], Turn(size, seed=size), repeat))
+            results.append({
+                "name": name,
+                "monsters": size,
+                "repeat": repeat,
+                "min_us": times[0] * 1e6,
+                "median_us": median(times) * 1e6,
+                "p95_us": times[min(len(times) - 1, int(0.95 * len(times)))] * 1e6,
+            })
+            print(f"{name:36} {size:3d} monsters  median {results[-1]['median_us']:9.1f}us  "
+                  f"p95 {results[-1]['p95_us']:9.1f}us", flush=True)
+    return results
+
+
+def compare(results: List[Dict], path: str, threshold: float) -> bool:
+    # 中央値は揺れるので最速値で比べ、数 us の差は誤差とみなす
+    with open(path) as f:
+        previous = {(r["name"], r["monsters"]): r for r in json.load(f)["results"]}
+    ok = True
+    for result in results:
+        old = previous.get((result["name"], result["monsters"]))
+        if old is None or result["min_us"] - old["min_us"] < NOISE_US:
+            continue
+        ratio = result["min_us"] / old["min_us"]
+        if ratio > threshold:
+            ok = False
+            print(f"REGRESSION {result['name']} {result['monsters']} monsters: "
+                  f"{old['min_us']:.1f}us -> {result['min_us']:.1f}us (x{ratio:.2f})")
+    return ok
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the 2022 decision hot paths on synthetic turns.")
+    parser.add_argument("names", nargs="*", default=list(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("-s", "--sizes", type=int, nargs="+", default=SIZES, help="monster counts")
+    parser.add_argument("-r", "--repeat", type=int, default=REPEAT)
+    parser.add_argument("-o", "--out", default="bench_2022.json")
+    parser.add_argument("--compare", help="earlier output to check against")
+    parser.add_argument("--threshold", type=float, default=1.3, help="slowdown counted as a regression")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    results = run(args.names, args.sizes, args.repeat)
+    with open(args.out, "w") as f:
+        json.dump({
+            "commit": commit(),
+            "python": platform.python_version(),
+            "time": time(),
+            "results": results,
+        }, f, indent=1)
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
@@ -0,0 +1,42 @@
+import random
+from itertools import permutations
+
+import pytest
+
+from core.assignment import Assignment, hungarian
+
+
+def brute_force(cost) -> int:
+    """Smallest total cost over every way of matching min(rows, columns) pairs."""
+    n, m = len(cost), len(cost[0])
+    if n <= m:
+        return min(sum(cost[i][j] for i, j in enumerate(columns)) for columns in permutations(range(m), n))
+    return min(sum(cost[i][j] for j, i in enumerate(rows)) for rows in permutations(range(n), m))
+
+
+@pytest.mark.parametrize("n, m", [(1, 1), (2, 2), (3, 3), (4, 4), (5, 5), (2, 4), (3, 5), (4, 2), (5, 3), (1, 4)])
+def test_hungarian_matches_brute_force(n, m):
+    rng = random.Random(n * 10 + m)
+    for _ in range(30):
+        # 同じ値が出やすい狭い範囲にして、同点の扱いも確かめる
+        cost = [[rng.randint(0, 9) for _ in range(m)] for _ in range(n)]
+        rows = hungarian(cost)
+        assigned = [j for j in rows if j >= 0]
+        assert len(assigned) == min(n, m)
+        assert len(set(assigned)) == len(assigned)
+        assert sum(cost[i][j] for i, j in enumerate(rows) if j >= 0) == brute_force(cost)
+
+
+def test_hungarian_empty():
+    assert hungarian([]) == []
+
+
+def test_assignment_reuses_matching_for_same_keys():
+    assignment = Assignment()
+    cost = [[1, 5], [5, 1]]
+    assert assignment.solve(["a", "b"], ["x", "y"], lambda: cost) == {"a": "x", "b": "y"}
+    # 行と列が同じなら費用を見直さず前の組み合わせを返す
+    assert assignment.solve(["a", "b"], ["y", "x"], lambda: [[5, 1], [1, 5]]) == {"a": "x", "b": "y"}
+    assert assignment.solved == 1
+    assert assignment.solve(["b", "a"], ["x", "y"], lambda: [[5, 1], [1, 5]]) == {"b": "y", "a": "x"}
+    assert assignment.solved == 2
@@ -0,0 +1,49 @@
+import numpy as np
+
+from core.forecast import NEVER, Forecast
+
+
+class Monster:
+    def __init__(self, entity_id: int, x: int, y: int, vx: int, vy: int, health: int):
+        self.id = entity_id
+        self.x, self.y = x, y
+        self.vx, self.vy = vx, vy
+        self.health = health
+
+
+# 自陣 (0, 0) へ向かう x 軸上のモンスター、ours は MONSTER_RADIUS に入るまでと、そこから 300 以内まで歩くターン
+MONSTERS = [
+    Monster(10, 1500, 0, -400, 0, 10),    # ours 3, kill 5, damage 4
+    Monster(11, 1500, 0, -400, 0, 14),    # ours 3, kill 7: 同じターンなら倒しにくい方が先
+    Monster(12, 1300, 0, -400, 0, 9),     # ours 3, kill 5, damage 3: 残る体力の少ない方が後
+    Monster(13, 1700, 0, -400, 0, 30),    # ours 4
+    Monster(14, 8000, 4000, 400, 200, 20),  # 敵陣の方へ流れていく
+    Monster(15, 5700, 0, -400, 0, 10),    # 2 ターンで 5000 に入り、そこから 12 ターン
+    Monster(16, 1500, 0, -400, 0, 10),    # 10 と同じ、行の順
+]
+
+
+def test_turns_and_threat_table():
+    forecast = Forecast(MONSTERS)
+    assert forecast.ours.tolist() == [3, 3, 3, 4, NEVER, 14, 3]
+    assert forecast.entering.tolist() == [0, 0, 0, 0, NEVER, 2, 0]
+    assert forecast.kill.tolist() == [5, 7, 5, 15, 10, 5, 5]
+    assert forecast.damage.tolist() == [4, 8, 3, 22, 0, 0, 4]
+    assert forecast.ranked() == [1, 0, 6, 2, 3, 5]
+
+
+def test_ranked_with_sooner_turns():
+    forecast = Forecast(MONSTERS)
+    turns = forecast.ours.copy()
+    # 相手に押し込まれるとみなすと、遠くのモンスターも先頭に来る
+    turns[5] = 1
+    turns[4] = 3
+    # 14 は体力 20 で倒すのに 10 ターン、同じ 3 ターンの中では先頭
+    assert forecast.ranked(turns) == [5, 4, 1, 0, 6, 2, 3]
+
+
+def test_no_monsters():
+    forecast = Forecast([])
+    assert len(forecast) == 0
+    assert forecast.ranked() == []
+    assert forecast.damage.shape == (0,) and forecast.entering.dtype == np.float64
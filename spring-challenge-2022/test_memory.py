@@ -0,0 +1,141 @@
+from core.memory import Memory, drift
+from core.model import Base, Monster
+from core.physics import MONSTER_SPEED, toward
+
+BASE = Base(0, 0)
+
+
+class Hero:
+    def __init__(self, x: int, y: int):
+        self.x = x
+        self.y = y
+
+
+# 両陣地から遠く、どのモンスターも見えない位置のヒーロー
+FAR_HEROES = [Hero(9000, 8000)]
+
+
+def monster(entity_id: int, x: int, y: int, vx: int, vy: int, near_base: int = 0, shield: int = 0) -> Monster:
+    return Monster(entity_id, x, y, shield, 0, 10, vx, vy, near_base, BASE)
+
+
+def test_drift_pulled_toward_base():
+    m = monster(1, 3000, 3000, 400, 0, shield=3)
+    assert drift(m, True)
+    vx, vy = toward(3000, 3000, 0, 0, MONSTER_SPEED)
+    assert (m.x, m.y, m.vx, m.vy, m.near_base, m.shield) == (3000 + vx, 3000 + vy, vx, vy, True, 2)
+
+
+def test_drift_pulled_toward_enemy_base():
+    m = monster(1, 14000, 6000, 0, -400)
+    assert drift(m, True)
+    vx, vy = toward(14000, 6000, 17630, 9000, MONSTER_SPEED)
+    assert (m.x, m.y, m.vx, m.vy, m.near_base) == (14000 + vx, 6000 + vy, vx, vy, True)
+
+
+def test_drift_straight_outside_radius():
+    m = monster(1, 9000, 4000, 100, -300)
+    for k in range(1, 4):
+        assert drift(m, True)
+        assert (m.x, m.y, m.vx, m.vy, m.near_base) == (9000 + 100 * k, 4000 - 300 * k, 100, -300, False)
+
+
+def test_controlled_drift_keeps_velocity():
+    # CONTROL された直後のモンスターは基地の近くでも与えられた速度のまま
+    m = monster(1, 3000, 3000, 400, 0)
+    assert drift(m, False)
+    assert (m.x, m.y, m.vx, m.vy, m.near_base) == (3400, 3000, 400, 0, False)
+
+
+def test_drift_hits_base():
+    m = monster(1, 200, 200, -282, -282, near_base=1)
+    assert not drift(m, True)
+    # 基地の近くにいなければ、ダメージ半径を通っても当たらない
+    m = monster(2, 200, 200, -282, -282)
+    assert drift(m, False)
+
+
+def test_hidden_monster_follows_its_line():
+    memory = Memory()
+    m = monster(1, 12000, 500, -300, 100, shield=2)
+    assert memory.observe([m], FAR_HEROES) == []
+    for k in range(1, 4):
+        assert memory.observe([], FAR_HEROES) == [m]
+        assert (m.x, m.y, m.shield) == (12000 - 300 * k, 500 + 100 * k, max(0, 2 - k))
+    assert len(memory) == 1
+
+
+def test_our_control_is_kept_while_hidden():
+    memory = Memory()
+    m = monster(1, 14400, 6400, 0, -400)
+    memory.observe([m], FAR_HEROES)
+    # 自分の CONTROL の予測で向きを変えた、相手の基地には引かれない
+    m.is_controlled, m.vx, m.vy = True, -400, 0
+    assert memory.observe([], FAR_HEROES) == [m]
+    assert (m.x, m.y, m.near_base) == (14000, 6400, False)
+    # 次のターンからはまた基地に引かれる
+    assert memory.observe([], FAR_HEROES) == [m]
+    vx, vy = toward(14000, 6400, 17630, 9000, MONSTER_SPEED)
+    assert (m.x, m.y, m.near_base) == (14000 + vx, 6400 + vy, True)
+
+
+def test_forget_when_leaving_map():
+    memory = Memory()
+    m = monster(1, 17500, 2000, 400, 0)
+    memory.observe([m], FAR_HEROES)
+    assert memory.observe([], FAR_HEROES) == []
+    assert len(memory) == 0
+
+
+def test_keep_outside_map_before_entering():
+    # 生まれたばかりのモンスターは、マップに入るまでは外にいても忘れない
+    memory = Memory()
+    m = monster(1, 8815, -800, 0, 300)
+    memory.observe([m], FAR_HEROES)
+    assert memory.observe([], FAR_HEROES) == [m] and m.y == -500
+    assert memory.observe([], FAR_HEROES) == [m] and m.y == -200
+    assert memory.observe([], FAR_HEROES) == [m] and m.y == 100
+
+
+def test_forget_when_hitting_base():
+    memory = Memory()
+    m = monster(1, 17400, 8800, 0, 0, near_base=1)
+    memory.observe([m], FAR_HEROES)
+    assert memory.observe([], FAR_HEROES) == []
+    assert len(memory) == 0
+
+
+def test_forget_when_in_sight_but_not_seen():
+    memory = Memory()
+    m = monster(1, 7000, 0, -400, 0)
+    memory.observe([m], FAR_HEROES)
+    # (6600, 0) は基地の視界の外、ヒーローから見える
+    assert memory.observe([], [Hero(6600, 1000)]) == []
+    assert len(memory) == 0
+    m = monster(2, 7400, 0, -400, 0)
+    memory.observe([m], FAR_HEROES)
+    assert memory.observe([], FAR_HEROES) == [m]
+    # 見えるヒーローがいなければ覚えておき、次の (6600, 0) で 2000 離れたヒーローの視界に入る
+    assert memory.observe([], [Hero(6600, 2000)]) == []
+
+
+def test_forget_after_ttl():
+    memory = Memory(ttl=2)
+    m = monster(1, 9000, 4500, 0, 0)
+    memory.observe([m], FAR_HEROES)
+    assert memory.observe([], FAR_HEROES) == [m]
+    assert memory.observe([], FAR_HEROES) == [m]
+    assert memory.observe([], FAR_HEROES) == []
+    assert len(memory) == 0
+
+
+def test_capacity_keeps_last_seen():
+    memory = Memory(capacity=3)
+    a, b, c, d = (monster(i, 9000, 1000 * i, 0, 0) for i in range(1, 5))
+    memory.observe([a, b], FAR_HEROES)
+    memory.observe([c], FAR_HEROES)
+    # 4 体目で上限を超え、最も前に見た 2 体のうち先に入った a から忘れる
+    hidden = memory.observe([d], FAR_HEROES)
+    assert sorted(memory.monsters) == [2, 3, 4]
+    assert hidden == [b, c]
+    assert 1 not in memory.last_seen and 1 not in memory.entered
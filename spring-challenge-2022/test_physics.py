@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from core.physics import Spells, toward
+from referee import HERO, MONSTER, Entity, Referee
+
+
+class Body:
+    """A monster or enemy hero as the bot sees it, in player 0's frame where it is the referee's."""
+
+    def __init__(self, entity: Entity):
+        self.id = entity.id
+        self.x, self.y = entity.x, entity.y
+        self.vx, self.vy = entity.vx, entity.vy
+        self.shield = entity.shield
+        self.is_controlled = False
+        self.near_base = entity.near_base
+
+    def refresh(self):
+        pass
+
+
+def random_turn(rng: random.Random):
+    """A referee with heroes and monsters crowded around player 0's heroes."""
+    referee = Referee(0)
+    cx, cy = rng.randint(2000, 15000), rng.randint(2000, 7000)
+
+    def around():
+        return cx + rng.randint(-2500, 2500), cy + rng.randint(-2500, 2500)
+
+    for hero in referee.heroes:
+        hero.x, hero.y = around()
+        hero.shield = rng.choice([0, 0, 0, 5])
+    for _ in range(rng.randint(1, 8)):
+        monster = Entity(referee.next_id, MONSTER, *around())
+        monster.vx, monster.vy = toward(0, 0, rng.randint(-1000, 1000), rng.randint(-1000, 1000), 400)
+        monster.health = 10
+        monster.shield = rng.choice([0, 0, 0, 3])
+        monster.near_base = rng.random() < 0.3
+        referee.monsters.append(monster)
+        referee.next_id += 1
+    return referee
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_spells_match_referee(seed):
+    rng = random.Random(seed)
+    for _ in range(300):
+        referee = random_turn(rng)
+        ours = [hero for hero in referee.heroes if hero.owner == 0]
+        others = referee.monsters + [hero for hero in referee.heroes if hero.owner == 1]
+        winds, controls, shields = [], [], []
+        for hero in ours:
+            kind = rng.choice(["WIND", "CONTROL", "SHIELD"])
+            x, y = rng.randint(0, 17630), rng.randint(0, 9000)
+            target = rng.choice(others)
+            if kind == "WIND":
+                winds.append((hero, x, y))
+            elif kind == "CONTROL":
+                controls.append((hero, target, x, y))
+            else:
+                shields.append((hero, target))
+        # 同じモンスターへの CONTROL が重なる場合も混ぜる
+        if len(controls) == 1 and rng.random() < 0.5:
+            hero, target, _, _ = controls[0]
+            controls.append((hero, target, rng.randint(0, 17630), rng.randint(0, 9000)))
+
+        bodies = {entity.id: Body(entity) for entity in others}
+        spells = Spells([bodies[m.id] for m in referee.monsters],
+                        [bodies[h.id] for h in others if h.type == HERO])
+        # 呪文の解決は審判と同じ順、WIND を先に全部かける
+        for hero, x, y in winds:
+            spells.wind(hero.x, hero.y, x, y)
+        for hero, target, x, y in controls:
+            spells.control(hero.x, hero.y, bodies[target.id], x, y)
+        for hero, target in shields:
+            spells.shield(hero.x, hero.y, bodies[target.id])
+
+        referee._apply_winds(winds)
+        referee._apply_controls(controls)
+        referee._apply_shields(shields)
+        for entity in others:
+            body = bodies[entity.id]
+            assert (body.x, body.y, body.shield, body.is_controlled) == \
+                   (entity.x, entity.y, entity.shield, entity.is_controlled)
+            if entity.type == MONSTER:
+                assert (body.vx, body.vy, body.near_base) == (entity.vx, entity.vy, entity.near_base)
@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from common import recorder
+
+
+def test_zigzag_round_trip():
+    for n in [0, 1, -1, 63, -64, 64, 2 ** 31, -2 ** 31, 10 ** 18, -10 ** 18]:
+        assert recorder.unzigzag(recorder.zigzag(n)) == n
+    # 絶対値の小さい数ほど小さい符号なし整数になる
+    assert [recorder.zigzag(n) for n in (0, -1, 1, -2, 2)] == [0, 1, 2, 3, 4]
+
+
+def test_varint_round_trip():
+    values = [0, 1, 127, 128, 300, 2 ** 14, 2 ** 35 + 7, 10 ** 20]
+    out = bytearray()
+    for value in values:
+        recorder.put(out, value)
+    decoder = recorder.Decoder(bytes(out))
+    assert [decoder.get() for _ in values] == values
+    assert decoder.pos == len(out)
+
+
+def record(path: str, turns):
+    """Write the turns, each a list of reads followed by the printed text, and read them back."""
+    rec = recorder.Recorder(str(path))
+    for reads, text in turns:
+        for read in reads:
+            if isinstance(read, list):
+                rec.ints(read)
+            else:
+                rec.rows(*read)
+        rec.write(text)
+    rec.close()
+    return recorder.load(str(path))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_decode_encode_round_trip(seed, tmp_path):
+    rng = random.Random(seed)
+    ids = list(range(10))
+    turns = []
+    for turn in range(20):
+        # 行の順番や数がターンごとに変わっても ID で対応付けられる
+        rng.shuffle(ids)
+        entities = [(i, rng.randint(-20000, 20000), rng.randint(0, 9000), rng.randint(-400, 400))
+                    for i in ids[:rng.randint(0, len(ids))]]
+        # 先頭の列が重複する行は位置で対応付けられる
+        cells = [(rng.randint(0, 2), rng.randint(0, 100), rng.randint(0, 50)) for _ in range(rng.randint(1, 6))]
+        reads = [[turn, rng.randint(0, 3)], (entities, 4), (cells, 3)]
+        if turn % 7 == 3:
+            reads.append([rng.randint(-10 ** 12, 10 ** 12)])
+        turns.append((reads, f"MOVE {turn} {-turn}\nWAIT ですよ\n"))
+    frames = record(tmp_path / "game.rec", turns)
+    assert len(frames) == len(turns)
+    for frame, (reads, text) in zip(frames, turns):
+        assert frame.reads == [read if isinstance(read, list) else (read[1], read[0]) for read in reads]
+        assert frame.output == text.splitlines()
+
+
+def test_partial_writes_join_into_lines(tmp_path):
+    frames = record(tmp_path / "game.rec", [([[1]], "MO"), ([], "VE 1 2\nWA"), ([], "IT\n")])
+    assert len(frames) == 1
+    assert frames[0].reads == [[1]]
+    assert frames[0].output == ["MOVE 1 2", "WAIT"]
+
+
+def test_unclosed_recording_keeps_complete_turns(tmp_path):
+    # 強制終了されたボットのように close しないまま読む
+    path = str(tmp_path / "game.rec")
+    rec = recorder.Recorder(path)
+    for turn in range(3):
+        rec.ints([turn])
+        rec.write(f"WAIT {turn}\n")
+    frames = recorder.load(path)
+    assert [frame.reads for frame in frames] == [[[0]], [[1]]]
+    assert [frame.output for frame in frames] == [["WAIT 0"], ["WAIT 1"]]
+    rec.close()
+    assert len(recorder.load(path)) == 3
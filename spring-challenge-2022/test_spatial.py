@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from core.spatial import SpatialGrid
+
+
+class Item:
+    def __init__(self, x: int, y: int):
+        self.x = x
+        self.y = y
+
+
+def brute_nearest(items, x: int, y: int):
+    """The closest item, the first in the list on ties."""
+    return min(items, key=lambda item: (item.x - x) ** 2 + (item.y - y) ** 2, default=None)
+
+
+def test_nearest_on_empty_grid():
+    grid = SpatialGrid([])
+    assert grid.nearest(0, 0) is None
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_nearest_matches_brute_force(seed):
+    rng = random.Random(seed)
+    for _ in range(100):
+        # 少ない点を広く散らすと周の数が大きくなる
+        spread = rng.choice([2000, 20000, 100000])
+        items = [Item(rng.randint(-spread, spread), rng.randint(-spread, spread)) for _ in range(rng.randint(1, 30))]
+        grid = SpatialGrid(items)
+        for _ in range(20):
+            x, y = rng.randint(-2 * spread, 2 * spread), rng.randint(-2 * spread, 2 * spread)
+            assert grid.nearest(x, y) is brute_nearest(items, x, y)
+
+
+def test_nearest_ties_go_to_insertion_order():
+    # どれも (0, 0) から 1000 離れていて、別々のセルに入る
+    items = [Item(0, 1000), Item(1000, 0), Item(-1000, 0), Item(0, -1000)]
+    for order in ([0, 1, 2, 3], [3, 2, 1, 0], [2, 0, 3, 1]):
+        placed = [items[i] for i in order]
+        assert SpatialGrid(placed).nearest(0, 0) is placed[0]
+    same = [Item(500, 500), Item(500, 500)]
+    assert SpatialGrid(same).nearest(0, 0) is same[0]
+
+
+def test_nearest_follows_updates():
+    rng = random.Random(0)
+    items = [Item(rng.randint(0, 17630), rng.randint(0, 9000)) for _ in range(40)]
+    grid = SpatialGrid(items)
+    for _ in range(200):
+        item = rng.choice(items)
+        item.x, item.y = rng.randint(0, 17630), rng.randint(0, 9000)
+        grid.update(item)
+        x, y = rng.randint(0, 17630), rng.randint(0, 9000)
+        assert grid.nearest(x, y) is brute_nearest(items, x, y)
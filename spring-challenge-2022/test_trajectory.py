@@ -0,0 +1,49 @@
+import random
+from typing import Optional
+
+import pytest
+
+from core.trajectory import enter_circle, leave_range
+
+
+def step_into_circle(x: int, y: int, vx: int, vy: int, cx: int, cy: int, r: int) -> Optional[int]:
+    """enter_circle by moving one turn at a time until the distance to the center grows again."""
+    k = 0
+    while True:
+        dx, dy = x + k * vx - cx, y + k * vy - cy
+        if dx * dx + dy * dy <= r * r:
+            return k
+        # 中心に最も近づく点を過ぎたら、もう入らない
+        if dx * vx + dy * vy >= 0:
+            return None
+        k += 1
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_enter_circle_matches_stepping(seed):
+    rng = random.Random(seed)
+    for _ in range(2000):
+        x, y = rng.randint(-2000, 20000), rng.randint(-2000, 11000)
+        vx, vy = rng.randint(-400, 400), rng.randint(-400, 400)
+        cx, cy = rng.choice([(0, 0), (17630, 9000), (rng.randint(0, 17630), rng.randint(0, 9000))])
+        r = rng.choice([300, 5000, rng.randint(0, 6000)])
+        assert enter_circle(x, y, vx, vy, cx, cy, r) == step_into_circle(x, y, vx, vy, cx, cy, r)
+
+
+def test_enter_circle_edges():
+    # 円周ちょうどは中に入ったとみなす
+    assert enter_circle(300, 0, 0, 0, 0, 0, 300) == 0
+    assert enter_circle(700, 0, -400, 0, 0, 0, 300) == 1
+    assert enter_circle(701, 0, -400, 0, 0, 0, 300) == 2
+    assert enter_circle(1000, 0, 0, 0, 0, 0, 300) is None
+    assert enter_circle(1000, 0, 400, 0, 0, 0, 300) is None
+    # かすめるだけで整数のターンには円に入らない
+    assert enter_circle(-1000, 300, 400, 0, 0, 0, 299) is None
+
+
+def test_leave_range_matches_stepping():
+    rng = random.Random(0)
+    for _ in range(2000):
+        p, v, high = rng.randint(-100, 1100), rng.randint(-50, 50), 1000
+        expected = next((k for k in range(10 ** 4) if not 0 <= p + k * v <= high), None)
+        assert leave_range(p, v, high) == expected
@@ -0,0 +1,87 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+from math import sqrt
+from typing import List, Tuple
+
+from referee import play_match
+
+BOTS: List[str] = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+    for name in ("main.py", "wind.py", "defence.py", "attack.py")
+]
+
+
+def play(bot1: str, bot2: str, seed: int) -> Tuple[str, str, int]:
+    # ボットは対戦ごとに起動し直す、使い回さない理由は common/match.py の BotProcess に
+    # 先手後手の有利不利を打ち消すため、シードの偶奇で席を入れ替える
+    if seed % 2 == 0:
+        return bot1, bot2, play_match(bot1, bot2, seed).winner
+    winner = play_match(bot2, bot1, seed).winner
+    return bot1, bot2, winner if winner == -1 else 1 - winner
+
+
+def wilson(score: float, n: int, z: float = 1.96) -> Tuple[float, float]:
+    if n == 0:
+        return 0.0, 1.0
+    p = score / n
+    center = (p + z * z / (2 * n)) / (1 + z * z / n)
+    margin = z * sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+class Standing:
+    def __init__(self, bot1: str, bot2: str):
+        self.bot1 = bot1
+        self.bot2 = bot2
+        self.wins = 0
+        self.losses = 0
+        self.draws = 0
+
+    def add(self, winner: int):
+        if winner == 0:
+            self.wins += 1
+        elif winner == 1:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+    def __str__(self):
+        n = self.wins + self.losses + self.draws
+        score = self.wins + self.draws / 2
+        low, high = wilson(score, n)
+        rate = score / n if n else 0.0
+        return (f"{os.path.basename(self.bot1)} vs {os.path.basename(self.bot2)}: {self.wins}-{self.losses}-{self.draws} "
+                f"win rate {rate:.3f} (95% CI {low:.3f}-{high:.3f})")
+
+
+def run(bots: List[str], games: int, workers: int, seed: int) -> List[Standing]:
+    standings = {(bot1, bot2): Standing(bot1, bot2) for bot1, bot2 in combinations(bots, 2)}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(play, bot1, bot2, seed + i)
+            for bot1, bot2 in standings
+            for i in range(games)
+        ]
+        for future in as_completed(futures):
+            bot1, bot2, winner = future.result()
+            standings[bot1, bot2].add(winner)
+    return list(standings.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Spring Challenge 2022 bots against each other in parallel.")
+    parser.add_argument("bots", nargs="*", default=BOTS, help="bot files, every pair is played")
+    parser.add_argument("-n", "--games", type=int, default=100, help="games per pair")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if len(args.bots) < 2:
+        parser.error("at least two bots are required")
+    for standing in run(args.bots, args.games, args.workers, args.seed):
+        print(standing)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+import argparse
+import importlib.util
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Sequence
+
+from core.params import ENV_VAR, Params, Space
+from referee import play_match
+
+HERE: str = os.path.dirname(os.path.abspath(__file__))
+# 値をこの細かさに丸めて、ほぼ同じパラメータはキャッシュを共有する
+RESOLUTION: int = 1000
+
+
+def load_space(path: str) -> Space:
+    spec = importlib.util.spec_from_file_location("tuned_bot", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.SPACE
+
+
+def quantize(space: Space, vector: Sequence[float]) -> List[float]:
+    values = []
+    for (default, low, high), value in zip(space.values(), vector):
+        value = max(low, min(value, high))
+        if isinstance(default, int):
+            values.append(round(value))
+        else:
+            unit = (high - low) / RESOLUTION
+            values.append(round(low + round((value - low) / unit) * unit, 6))
+    return values
+
+
+def play(bot: str, opponent: str, params: str, seed: int) -> float:
+    # tournament と同じく、シードの偶奇で席を入れ替える
+    env = {ENV_VAR: params}
+    if seed % 2 == 0:
+        winner = play_match(bot, opponent, seed, [env, None]).winner
+    else:
+        winner = play_match(opponent, bot, seed, [None, env]).winner
+        winner = winner if winner == -1 else 1 - winner
+    return 0.5 if winner == -1 else float(winner == 0)
+
+
+class Cache:
+    """Scores of evaluated parameter sets, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.scores: Dict[str, float] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self.scores[entry["key"]] = entry["score"]
+
+    def get(self, key: str):
+        return self.scores.get(key)
+
+    def put(self, key: str, score: float):
+        self.scores[key] = score
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"key": key, "score": score}) + "\n")
+
+
+class Tuner:
+    """A real-coded genetic algorithm over a bot's parameter space.
+
+    Every generation plays `games` matches per new candidate against a fixed
+    opponent, all of them submitted to one process pool, on the same seeds
+    for every candidate so that scores are comparable.
+    """
+
+    def __init__(self, bot: str, opponent: str, space: Space, cache: Cache, games: int, workers: int, seed: int,
+                 population: int, elite: int = 2, mutation: float = 0.1):
+        self.bot = bot
+        self.opponent = opponent
+        self.space = space
+        self.cache = cache
+        self.games = games
+        self.workers = workers
+        self.seed = seed
+        self.size = population
+        self.elite = elite
+        self.mutation = mutation
+        self.random = random.Random(seed)
+
+    def key(self, vector: Sequence[float]) -> str:
+        return json.dumps({
+            "bot": os.path.basename(self.bot),
+            "opponent": os.path.basename(self.opponent),
+            "games": self.games,
+            "seed": self.seed,
+            "params": Params.from_vector(self.space, vector).as_dict(),
+        }, sort_keys=True)
+
+    def evaluate(self, executor: ProcessPoolExecutor, population: List[List[float]]) -> List[float]:
+        pending = {}
+        for vector in population:
+            key = self.key(vector)
+            if self.cache.get(key) is None and key not in pending:
+                params = json.dumps(Params.from_vector(self.space, vector).as_dict())
+                pending[key] = [
+                    executor.submit(play, self.bot, self.opponent, params, self.seed + i) for i in range(self.games)
+                ]
+        for key, futures in pending.items():
+            self.cache.put(key, sum(future.result() for future in futures) / self.games)
+        return [self.cache.get(self.key(vector)) for vector in population]
+
+    def initial(self) -> List[List[float]]:
+        population = [[default for default, _, _ in self.space.values()]]
+        while len(population) < self.size:
+            population.append(quantize(self.space, [
+                self.random.uniform(low, high) for _, low, high in self.space.values()
+            ]))
+        return population
+
+    def select(self, population: List[List[float]], scores: List[float]) -> List[float]:
+        i, j = self.random.sample(range(len(population)), 2)
+        return population[i] if scores[i] >= scores[j] else population[j]
+
+    def child(self, population: List[List[float]], scores: List[float]) -> List[float]:
+        a = self.select(population, scores)
+        b = self.select(population, scores)
+        vector = []
+        for x, y, (_, low, high) in zip(a, b, self.space.values()):
+            # BLX-0.5 交叉とガウス変異
+            lo, hi = min(x, y), max(x, y)
+            span = hi - lo
+            value = self.random.uniform(lo - span / 2, hi + span / 2)
+            value += self.random.gauss(0, self.mutation * (high - low))
+            vector.append(value)
+        return quantize(self.space, vector)
+
+    def run(self, generations: int) -> Params:
+        population = self.initial()
+        best, best_score = population[0], -1.0
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for generation in range(generations):
+                scores = self.evaluate(executor, population)
+                ranked = sorted(zip(scores, population), key=lambda pair: -pair[0])
+                if ranked[0][0] > best_score:
+                    best_score, best = ranked[0]
+                print(f"generation {generation}: best {ranked[0][0]:.3f} mean {sum(scores) / len(scores):.3f}",
+                      flush=True)
+                elite = [vector for _, vector in ranked[:self.elite]]
+                population = elite + [self.child(population, scores) for _ in range(self.size - len(elite))]
+        print(f"best {best_score:.3f}", flush=True)
+        return Params.from_vector(self.space, best)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune a bot's SPACE parameters with a genetic algorithm.")
+    parser.add_argument("--bot", default=os.path.join(HERE, "wind.py"), help="bot file defining SPACE")
+    parser.add_argument("--opponent", default=os.path.join(HERE, "wind.py"))
+    parser.add_argument("-p", "--population", type=int, default=16)
+    parser.add_argument("-g", "--generations", type=int, default=20)
+    parser.add_argument("-n", "--games", type=int, default=20, help="games per candidate")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", default=os.path.join(HERE, "tune_cache.jsonl"))
+    args = parser.parse_args()
+    space = load_space(args.bot)
+    tuner = Tuner(args.bot, args.opponent, space, Cache(args.cache), args.games, args.workers, args.seed,
+                  args.population)
+    # そのまま BOT_PARAMS に渡せる形で出力する
+    print(json.dumps(tuner.run(args.generations).as_dict()))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,151 +1,104 @@
-from math import sqrt, pi, cos, sin, atan2
+from math import pi, cos, sin
 from operator import attrgetter, itemgetter
-from typing import List, Union
-
-Number = Union[int, float]
-
-WIDTH: int = 17630
-HEIGHT: int = 9000
-BASE_RADIUS: int = 6000
-MONSTER_RADIUS: int = 5000
-SEARCH_RADIUS: int = 2200
-WIND_RADIUS: int = 1280
-
-
-def distance(x1: int, y1: int, x2: int, y2: int) -> float:
-    return sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
-
-
-class Point:
-    def __init__(self, x: Number, y: Number):
-        self.x = max(0, min(round(x), WIDTH))
-        self.y = max(0, min(round(y), HEIGHT))
-        self.distance = distance(self.x, self.y, 0, 0)
-
-
-class Base:
-    def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
-        self.side = [0, 1][self.y > 4500]
-        self.health = 0
-        self.mana = 0
-
-    def update(self, health: int, mana: int):
-        self.health = health
-        self.mana = mana
-
-    def spell(self):
-        self.mana -= 10
-
-    def has_mana(self):
-        return self.mana >= 10
-
-    def has_more_mana(self, monsters: List):
-        if monsters and min(map(attrgetter("distance"), monsters)) < BASE_RADIUS // 2:
-            return self.mana >= 20
-        else:
-            return self.mana >= 20
-
-
-class Monster:
-    def __init__(self, entity_id: int, x: int, y: int, shield: int, is_controlled, health: int, vx: int, vy: int,
-                 near_base: int, base: Base):
-        self.id = entity_id
-        self.x = x if base.side == 0 else WIDTH - x
-        self.y = y if base.side == 0 else HEIGHT - y
-        self.shield = shield
-        self.is_controlled = is_controlled == 1
-        self.health = health
-        self.vx = vx if base.side == 0 else -vx
-        self.vy = vy if base.side == 0 else -vy
-        self.near_base = near_base == 1
-        self.distance = distance(self.x, self.y, 0, 0)
-        self.distance2 = distance(self.x, self.y, WIDTH, HEIGHT)
-        self.argument = atan2(self.y, self.x)
-        self.next_point = Point(self.x + self.vx, self.y + self.vy)
-        self.in_base = self.distance < 6000
-        self.is_threat = self.distance < 3000
-        self.targeting = self.vx < 0 and self.vy < 0
-        self.is_controlling = self.is_controlled and not self.targeting
-        self.effective = True
-        self.effective2 = True
-        x, y = self.x, self.y
-        while True:
-            if distance(x, y, 0, 0) <= MONSTER_RADIUS:
-                self.effective2 = False
-                break
-            if distance(x, y, WIDTH, HEIGHT) <= MONSTER_RADIUS:
-                self.effective = False
-                break
-            if x < 0 or WIDTH < x or y < 0 or HEIGHT < y:
-                self.effective = False
-                self.effective2 = False
-                break
-            x += self.vx
-            y += self.vy
-
-    def behind_point(self) -> Point:
-        arg = atan2(HEIGHT - self.next_point.y, WIDTH - self.next_point.x)
-        r = distance(self.next_point.x, self.next_point.y, WIDTH, HEIGHT) + 1040
-        return Point(WIDTH - r * cos(arg), HEIGHT - r * sin(arg))
-
-
-class Enemy:
-    def __init__(self, entity_id: int, x: int, y: int, shield, is_controlled, base: Base):
-        self.id = entity_id
-        self.x = x if base.side == 0 else WIDTH - x
-        self.y = y if base.side == 0 else HEIGHT - y
-        self.shield = shield
-        self.is_controlled = is_controlled == 1
-        self.base = base
-        self.distance = distance(self.x, self.y, 0, 0)
-        self.distance2 = distance(self.x, self.y, WIDTH, HEIGHT)
+from time import perf_counter
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from common import profiling
+from common.fastio import IntReader
+from common.timing import TurnTimer
+from core import commands, model
+from core.assignment import Assignment
+from core.context import TurnContext
+from core.constants import BASE_RADIUS, HEIGHT, MONSTER_RADIUS, SEARCH_RADIUS, WIDTH, WIND_RADIUS
+from core.forecast import NEVER, Forecast, approach
+from core.memory import Memory
+from core.model import Base, Enemy, Monster, Point, distance
+from core.trajectory import OUR_BASE
+from core.params import load
+from core.physics import HERO_SPEED
+from core.registry import Registry
+from core.search import BeamSearch, MonsterState, candidates, format_action, parse_action, snapshot
+from core.table import EntityTable
+
+USE_TABLE: bool = False
+USE_SEARCH: bool = True
+# 探索を打ち切ってから出力するまでの余裕
+SEARCH_MARGIN: float = 0.005
+
+# 調整できる定数 name: (default, low, high)、環境変数 BOT_PARAMS で上書きできる
+SPACE = {
+    # 守備の巡回: 担当扇形の中心角、隣との間隔、1 手の角度、折り返す角度、半径
+    "patrol_center": (pi / 8, 0, pi / 4),
+    "patrol_spread": (pi / 4, pi / 8, pi / 3),
+    "patrol_step": (pi / 40, pi / 160, pi / 10),
+    "patrol_low": (pi / 40, 0, pi / 8),
+    "patrol_high": (9 * pi / 40, pi / 8, pi / 4),
+    "patrol_radius": (BASE_RADIUS, 3000, 8000),
+    # 守備の優先度: 脅威表の 1 順位ぶんをヒーローの道のりいくつとみなすか、
+    # 相手ヒーローが WIND で押し込めるモンスターを自陣にどれだけ近いとみなすか
+    "rank_step": (10000, 1000, 40000),
+    "guard_offset": (2200, 0, 4400),
+    "cluster_radius": (800, 400, 1280),
+    # 守備の割り当て: 迎撃が間に合わないターン数にかける重み
+    "late_weight": (1000, 0, 5000),
+    # 見えるモンスターがいないとき、これだけのターンで自陣に来る見えないモンスターを迎えに行く
+    "lurk_turns": (10, 0, 30),
+    # 攻撃の巡回: 敵陣からの半径、1 ターンごとに縮める量、1 手の角度、折り返す角度
+    "attack_radius": (MONSTER_RADIUS, 3000, 7000),
+    "spiral_step": (10, 0, 20),
+    "attack_step": (pi / 20, pi / 80, pi / 8),
+    "attack_low": (pi / 20, 0, pi / 4),
+    "attack_high": (9 * pi / 20, pi / 4, pi / 2),
+    # この範囲に相手ヒーローがいるモンスターは WIND で送らない
+    "escort_radius": (800, 0, 2200),
+}
+P = load(SPACE)
 
 
 class Command:
     def __init__(self, base: Base, monsters: List[Monster]):
         self.base = base
         self.monsters = monsters
+        self.context = TurnContext(monsters, [])
         self.turn = 0
 
     def next_action(self, enemies: List[Enemy]) -> str:
         pass
 
+    def fallback(self) -> str:
+        return self.move(self.dest)
+
     def move(self, target: Point) -> str:
-        if self.base.side == 0:
-            return f"MOVE {target.x} {target.y}"
-        else:
-            return f"MOVE {WIDTH - target.x} {HEIGHT - target.y}"
+        return commands.move(self.base.side, target.x, target.y)
+
+    def forecast(self) -> Forecast:
+        return self.context.memo("forecast", lambda: Forecast(self.monsters))
 
     def push_back(self, hero, target: Monster) -> str:
-        self.base.spell()
-        for i, monster in enumerate(self.monsters):
-            if monster.shield == 0 and distance(hero.x, hero.y, monster.x, monster.y) <= WIND_RADIUS:
-                self.monsters[i].x += target.x
-                self.monsters[i].y += target.y
-        return f"SPELL WIND {hero.x + target.x} {hero.y + target.y}"
+        x, y = hero.x + target.x, hero.y + target.y
+        # 座標を反転せずに出すので、自陣が右下のときは敵陣の方へ飛ばすことになる
+        aim = commands.mirror(self.base.side, x, y)
+        if self.base.spell():
+            self.context.wind(hero, *aim)
+        return commands.wind(0, x, y)
 
     def wind(self) -> str:
-        self.base.spell()
-        if self.base.side == 0:
-            return f"SPELL WIND {WIDTH} {HEIGHT}"
-        else:
-            return f"SPELL WIND 0 0"
+        if self.base.spell():
+            self.context.wind(self.hero, WIDTH, HEIGHT)
+        return commands.wind(self.base.side, WIDTH, HEIGHT)
 
     def shield(self, target: Monster) -> str:
-        self.base.spell()
-        target.shield = 11
-        return f"SPELL SHIELD {target.id}"
+        if self.base.spell():
+            self.context.shield(self.hero, target)
+        return commands.shield(target.id)
 
     def control(self, target: Union[Monster, Enemy], x: int, y: int) -> str:
-        self.base.spell()
-        target.is_controlled = True
+        if self.base.spell():
+            self.context.control(self.hero, target, x, y)
         target.is_controlling = True
-        if self.base.side == 0:
-            return f"SPELL CONTROL {target.id} {x} {y}"
-        else:
-            return f"SPELL CONTROL {target.id} {WIDTH - x} {HEIGHT - y}"
+        return commands.control(self.base.side, target.id, x, y)
 
 
 class DefenderCommand(Command):
@@ -153,97 +106,161 @@ class DefenderCommand(Command):
         super().__init__(base, monsters)
         self.index = index
         self.hero = hero
-        self.arg = pi / 8 + pi / 4 * self.index
-        self.dest = Point(BASE_RADIUS * cos(self.arg), BASE_RADIUS * sin(self.arg))
+        self.arg = P.patrol_center + P.patrol_spread * self.index
+        self.dest = Point(P.patrol_radius * cos(self.arg), P.patrol_radius * sin(self.arg))
         self.direction = 1
+        self.assignment = Assignment()
 
     def next_action(self, enemies: List[Enemy]) -> str:
         if (self.hero.x, self.hero.y) == (self.dest.x, self.dest.y):
-            self.arg += self.direction * pi / 40
-            self.dest = Point(BASE_RADIUS * cos(self.arg), BASE_RADIUS * sin(self.arg))
-            if self.arg < pi / 40 + pi / 4 * self.index:
+            self.arg += self.direction * P.patrol_step
+            self.dest = Point(P.patrol_radius * cos(self.arg), P.patrol_radius * sin(self.arg))
+            if self.arg < P.patrol_low + P.patrol_spread * self.index:
                 self.direction = 1
-            if self.arg > 9 * pi / 40 + pi / 4 * self.index:
+            if self.arg > P.patrol_high + P.patrol_spread * self.index:
                 self.direction = -1
         self.turn += 1
-        monsters = [monster for monster in self.monsters if monster.next_point.distance < BASE_RADIUS + SEARCH_RADIUS]
-        level = [monster.next_point.distance for monster in monsters]
-        for i, monster in enumerate(monsters):
-            if [enemy for enemy in enemies if distance(monster.x, monster.y, enemy.x, enemy.y) < WIND_RADIUS]:
-                level[i] = min(level[i], monster.distance - 2200)
-            level[i] **= 2
-            level[i] += distance(self.hero.x, self.hero.y, monster.x, monster.y)
-            level[i] -= monster.health * 5
-            level[i] -= monster.shield * 20
+        monsters, level = self.levels()
         if not monsters:
-            return self.move(self.dest)
-        target = min([(lv, monster) for monster, lv in zip(monsters, level)], key=itemgetter(0))[1]
+            lurking = self.context.lurking(P.lurk_turns)
+            return self.move(self.dest if lurking is None else lurking.next_point)
+        target = self.assigned(monsters, level)
         g, gx, gy = 0, 0, 0
         for monster, lv in zip(monsters, level):
             g += 1 / lv
             gx += monster.next_point.x / lv
             gy += monster.next_point.y / lv
         center = Point(gx / g, gy / g)
+        cluster = self.context.within(monsters, center.x, center.y, P.cluster_radius)
         if not self.base.has_mana() or distance(self.hero.x, self.hero.y, target.x, target.y) > WIND_RADIUS:
-            if target.id in [monster.id for monster in monsters if distance(center.x, center.y, monster.x, monster.y) < 800]:
+            if target.id in cluster:
                 return self.move(center)
             else:
                 return self.move(target.next_point)
-        if [enemy for enemy in enemies if distance(enemy.x, enemy.y, target.x, target.y) < WIND_RADIUS]:
+        if self.context.enemy_near(target, WIND_RADIUS):
             if target.shield == 0 and target.distance < SEARCH_RADIUS + WIND_RADIUS:
                 return self.push_back(self.hero, target)
         else:
             if target.shield == 0 and target.distance < WIND_RADIUS and target.health > 4:
                 return self.push_back(self.hero, target)
-        if target.id not in [monster.id for monster in monsters
-                             if distance(center.x, center.y, monster.x, monster.y) < 800]:
+        if target.id not in cluster:
             return self.move(target.next_point)
-        enemies = [enemy for enemy in enemies if distance(self.hero.x, self.hero.y, enemy.x, enemy.y) < SEARCH_RADIUS]
-        if enemies and len([
-            monster.id for monster in monsters
-            if distance(center.x, center.y, monster.x, monster.y) < 800
-        ]) <= len([
-            monster.id for monster in monsters
-            if distance(center.x, center.y, monster.x, monster.y) < 800
-        ]):
+        enemies = self.context.enemies_near(self.hero, SEARCH_RADIUS)
+        if enemies:
             return self.control(min(enemies, key=attrgetter("distance")), WIDTH, HEIGHT)
         return self.move(center)
 
+    def assigned(self, monsters: List[Monster], level: List[float]) -> Monster:
+        """This defender's share of the joint assignment, or its most urgent monster if it got none."""
+        defenders = [hero.command for hero in self.context.heroes if isinstance(hero.command, DefenderCommand)]
+        if self not in defenders:
+            defenders = [self]
+        matching = self.context.memo("assignment", lambda: self.assignment.solve(
+            [defender.hero.id for defender in defenders], [monster.id for monster in monsters],
+            lambda: [defender.costs() for defender in defenders]))
+        target_id = matching.get(self.hero.id)
+        for monster in monsters:
+            if monster.id == target_id:
+                return monster
+        return min([(lv, monster) for monster, lv in zip(monsters, level)], key=itemgetter(0))[1]
+
+    def costs(self) -> List[float]:
+        """level of each threat plus a penalty for every turn the hero would arrive too late to WIND it."""
+        monsters, level = self.levels()
+        cost = []
+        for monster, lv in zip(monsters, level):
+            if monster.impact == OUR_BASE:
+                reach = max(0.0, distance(self.hero.x, self.hero.y, monster.x, monster.y) - WIND_RADIUS) / HERO_SPEED
+                lv += P.late_weight * max(0.0, reach - monster.impact_turns)
+            cost.append(lv)
+        return cost
+
+    def levels(self) -> Tuple[List[Monster], List[float]]:
+        return self.context.memo(("levels", self.hero.id, self.hero.x, self.hero.y), self.hero_levels)
+
+    def hero_levels(self) -> Tuple[List[Monster], List[float]]:
+        monsters, rows, level = self.context.memo("threats", self.threats)
+        if not monsters:
+            return [], []
+        # ヒーローごとに違うのは自分からの距離だけ
+        if rows is not None:
+            table = self.context.table
+            return monsters, (level + table.hero_monster[table.hero_row[self.hero.id], rows]).tolist()
+        return monsters, [
+            lv + distance(self.hero.x, self.hero.y, monster.x, monster.y) for monster, lv in zip(monsters, level)
+        ]
+
+    def threats(self) -> Tuple[List[Monster], Optional[np.ndarray], np.ndarray]:
+        """Monsters worth defending against this turn, most urgent first, and the level every defender shares.
+
+        Those within reach of our base are ordered by the forecast's threat
+        table; one an enemy hero could WIND in counts as arriving as if
+        `guard_offset` nearer, and those that won't hit our base follow by
+        their next distance. Each place down the order adds `rank_step`.
+        """
+        forecast = self.forecast()
+        turns = forecast.ours.copy()
+        if self.context.table is not None:
+            table = self.context.table
+            rows = (table.next_base < BASE_RADIUS + SEARCH_RADIUS).nonzero()[0].tolist()
+            near = table.enemy_within(WIND_RADIUS)
+            base, next_base = table.base, table.next_base
+        else:
+            rows = [i for i, monster in enumerate(self.monsters)
+                    if monster.next_point.distance < BASE_RADIUS + SEARCH_RADIUS]
+            near = {i: self.context.enemy_near(self.monsters[i], WIND_RADIUS) for i in rows}
+            base = [monster.distance for monster in self.monsters]
+            next_base = [monster.next_point.distance for monster in self.monsters]
+        if not rows:
+            return [], None if self.context.table is None else np.zeros(0, dtype=np.int64), np.zeros(0)
+        for i in rows:
+            if near[i]:
+                turns[i] = min(turns[i], approach(max(0.0, base[i] - P.guard_offset)))
+        selected = set(rows)
+        order = [i for i in forecast.ranked(turns) if i in selected]
+        ranked = set(order)
+        order += sorted((i for i in rows if i not in ranked), key=lambda i: (next_base[i], i))
+        level = P.rank_step * np.arange(1, len(order) + 1, dtype=np.float64)
+        monsters = [self.monsters[i] for i in order]
+        return monsters, None if self.context.table is None else np.array(order, dtype=np.int64), level
+
 
 class AttackerCommand(Command):
     def __init__(self, hero, base: Base, monsters: List[Monster]):
         super().__init__(base, monsters)
         self.hero = hero
         self.arg = 0
-        self.dest = Point(WIDTH - MONSTER_RADIUS * cos(self.arg), HEIGHT - MONSTER_RADIUS * sin(self.arg))
+        self.dest = Point(WIDTH - P.attack_radius * cos(self.arg), HEIGHT - P.attack_radius * sin(self.arg))
         self.direction = 1
         self.forcing = False
 
     def next_action(self, enemies: List[Enemy]) -> str:
         if (self.hero.x, self.hero.y) == (self.dest.x, self.dest.y):
-            r = MONSTER_RADIUS - self.turn * 10
-            self.arg += self.direction * pi / 20
+            r = P.attack_radius - self.turn * P.spiral_step
+            self.arg += self.direction * P.attack_step
             self.dest = Point(WIDTH - r * cos(self.arg), HEIGHT - r * sin(self.arg))
-            if self.arg < pi / 20:
+            if self.arg < P.attack_low:
                 self.direction = 1
-            if self.arg > 9 * pi / 20:
+            if self.arg > P.attack_high:
                 self.direction = -1
         self.turn += 1
+        hero_distance = self.context.hero_distances(self.hero)
         if self.forcing and distance(self.hero.x, self.hero.y, WIDTH, HEIGHT) > SEARCH_RADIUS:
             if not self.base.has_mana():
                 return self.move(Point(WIDTH, HEIGHT))
             if [
-                monster for monster in self.monsters
+                monster for monster, d in zip(self.monsters, hero_distance)
                 if 0 < monster.x < WIDTH and 0 < monster.y < HEIGHT
                 and monster.distance2 < SEARCH_RADIUS
-                and distance(self.hero.x, self.hero.y, monster.x, monster.y)
+                and d
             ]:
-                self.wind()
+                # この WIND は出力されないので、盤面は動かさずマナだけ取っておく
+                self.base.spell()
             targets = [
-                monster for monster in self.monsters
-                if monster.health > monster.distance2 // 400 * 2 - self.base.mana // 10
-                and monster.distance2 < SEARCH_RADIUS
-                and distance(self.hero.x, self.hero.y, monster.x, monster.y) < SEARCH_RADIUS
+                monster for monster, d in zip(self.monsters, hero_distance)
+                if monster.distance2 < SEARCH_RADIUS
+                and d < SEARCH_RADIUS
+                and monster.health > self.forecast().enemy_damage(monster) - self.base.mana // 10
             ]
             if targets:
                 target = min(targets, key=attrgetter("distance2"))
@@ -251,84 +268,128 @@ class AttackerCommand(Command):
                     self.forcing = False
                     return self.shield(target)
             if [
-                monster for monster in self.monsters
+                monster for monster, d in zip(self.monsters, hero_distance)
                 if 0 < monster.x < WIDTH and 0 < monster.y < HEIGHT
-                and distance(self.hero.x, self.hero.y, monster.x, monster.y) < WIND_RADIUS
+                and d < WIND_RADIUS
                 and monster.shield == 0
             ]:
                 return self.wind()
             else:
                 return self.move(Point(WIDTH, HEIGHT))
         self.forcing = False
-        if self.base.has_more_mana(self.monsters) and [
-            monster for monster in self.monsters
-            if monster.health > monster.distance2 // 400 * 2 - self.base.mana // 10
-            and 0 < monster.x < WIDTH and 0 < monster.y < HEIGHT
-            and distance(self.hero.x, self.hero.y, monster.x, monster.y) < WIND_RADIUS
-            and not [enemy for enemy in enemies if distance(monster.x, monster.y, enemy.x, enemy.y) < 800]
+        if self.base.has_more_mana() and [
+            monster for monster, d in zip(self.monsters, hero_distance)
+            if 0 < monster.x < WIDTH and 0 < monster.y < HEIGHT
+            and d < WIND_RADIUS
+            and monster.health > self.forecast().enemy_damage(monster) - self.base.mana // 10
+            and not self.context.enemy_near(monster, P.escort_radius)
         ]:
             self.forcing = distance(self.hero.x, self.hero.y, WIDTH, HEIGHT) > SEARCH_RADIUS + WIND_RADIUS
             return self.wind()
         if distance(self.hero.x, self.hero.y, WIDTH, HEIGHT) > BASE_RADIUS + SEARCH_RADIUS:
             return self.move(self.dest)
-        targets = [
-            monster for monster in self.monsters
-            if distance(self.hero.x, self.hero.y, monster.x, monster.y) < SEARCH_RADIUS
-            and not [enemy for enemy in enemies if distance(self.hero.x, self.hero.y, enemy.x, enemy.y) < SEARCH_RADIUS]
+        targets = [] if self.context.enemies_near(self.hero, SEARCH_RADIUS) else [
+            monster for monster, d in zip(self.monsters, hero_distance) if d < SEARCH_RADIUS
         ]
         if targets:
             target = min(targets, key=attrgetter("distance2"))
-            if self.base.has_more_mana(self.monsters) and 0 < target.x < WIDTH and 0 < target.y < HEIGHT and distance(self.hero.x, self.hero.y, target.x, target.y) < WIND_RADIUS:
+            if self.base.has_more_mana() and 0 < target.x < WIDTH and 0 < target.y < HEIGHT and distance(self.hero.x, self.hero.y, target.x, target.y) < WIND_RADIUS:
                 return self.wind()
             else:
                 return self.move(target.behind_point())
         return self.move(self.dest)
 
 
-class Hero:
-    _count: int = 0
-
+class Hero(model.Hero):
     def __init__(self, x: int, y: int, base: Base, monsters: List[Monster]):
-        self.id = Hero._count
-        self.x = x if base.side == 0 else WIDTH - x
-        self.y = y if base.side == 0 else HEIGHT - y
-        self.base = base
+        super().__init__(x, y, base)
         self.command = AttackerCommand(self, base, monsters) if self.id == 0 else DefenderCommand(self, self.id - 1,
                                                                                                   base, monsters)
-        Hero._count += 1
 
     def update(self, x: int, y: int, monsters: List[Monster]):
-        self.x = x if self.base.side == 0 else WIDTH - x
-        self.y = y if self.base.side == 0 else HEIGHT - y
+        super().update(x, y)
         self.command.monsters = monsters
 
 
+def plan(search: BeamSearch, heroes: List[Hero], state: Tuple[MonsterState, ...], mana: int, actions: List[str],
+         timer: TurnTimer) -> List[str]:
+    """Let the search overrule the heuristic actions where it finds better.
+
+    `state` and `mana` must be taken before the heuristics ran, since their
+    spells already changed both.
+    """
+    side = heroes[0].base.side
+    roots = []
+    for hero, text in zip(heroes, actions):
+        heuristic = parse_action(text, side)
+        roots.append([heuristic] + [a for a in candidates((hero.x, hero.y), state, mana) if a != heuristic])
+    # 探索はノード数で止まる、締め切りは負荷で遅れたときの安全のための上限
+    joint = search.search([(hero.x, hero.y) for hero in heroes], state, mana, roots,
+                          perf_counter() + timer.remaining() - SEARCH_MARGIN)
+    if joint is None:
+        return actions
+    return [text if k == 0 else format_action(choices[k], side) for text, choices, k in zip(actions, roots, joint)]
+
+
 def main():
-    base_x, base_y = map(int, input().split())
+    reader = IntReader()
+    base_x, base_y = reader.ints(2)
     base = Base(base_x, base_y)
-    _ = int(input())
+    _ = reader.int()
     heroes = {}
+    timer = TurnTimer()
+    profiling.install(timer, branches=[
+        (Command, ("move", "push_back", "wind", "shield", "control")),
+        # 探索がヒューリスティックの手を置き換えた回数
+        (globals(), ("format_action",)),
+    ])
+    monster_registry = Registry(lambda entity_id, *fields: Monster(entity_id, *fields, base))
+    enemy_registry = Registry(lambda entity_id, *fields: Enemy(entity_id, *fields, base))
+    search = BeamSearch() if USE_SEARCH else None
+    # 守備の割り当ては全員で 1 つ、ターンをまたいで持つ
+    assignment = Assignment()
+    memory = Memory()
     while True:
-        my_health, my_mana = map(int, input().split())
+        monster_registry.next_turn()
+        enemy_registry.next_turn()
+        my_health, my_mana = reader.ints(2)
+        timer.start_turn()
         base.update(my_health, my_mana)
-        _ = map(int, input().split())
-        entity_count = int(input())
+        _ = reader.ints(2)
+        entity_count = reader.int()
         monsters = []
         enemies = []
-        for _ in range(entity_count):
-            entity_id, entity_type, x, y, shield_life, is_controlled, health, vx, vy, near_base, _ = map(int,
-                                                                                                         input().split())
+        for entity_id, entity_type, x, y, shield_life, is_controlled, health, vx, vy, near_base, _ in reader.rows(
+                entity_count, 11):
             if entity_type == 0:
-                monsters.append(Monster(entity_id, x, y, shield_life, is_controlled, health, vx, vy, near_base, base))
+                monsters.append(
+                    monster_registry.update(entity_id, x, y, shield_life, is_controlled, health, vx, vy, near_base))
             elif entity_type == 1:
                 if entity_id not in heroes:
                     heroes[entity_id] = Hero(x, y, base, monsters)
                 else:
                     heroes[entity_id].update(x, y, monsters)
             elif entity_type == 2:
-                enemies.append(Enemy(entity_id, x, y, shield_life, is_controlled, base))
-        for hero in sorted(heroes.values(), key=attrgetter('id')):
-            print(hero.command.next_action(enemies))
+                enemies.append(enemy_registry.update(entity_id, x, y, shield_life, is_controlled))
+        team = sorted(heroes.values(), key=attrgetter('id'))
+        table = EntityTable(team, monsters, enemies) if USE_TABLE else None
+        hidden = memory.observe(monsters, team)
+        context = TurnContext(monsters, enemies, table, team, hidden)
+        state = snapshot(monsters) if search is not None else None
+        mana = base.mana
+        # 割り当ては他の守備の状況も見るので、決める前に全員を今ターンにそろえる
+        for hero in team:
+            hero.command.context = context
+            if isinstance(hero.command, DefenderCommand):
+                hero.command.assignment = assignment
+        actions = []
+        for hero in team:
+            actions.append(timer.decide(lambda: hero.command.next_action(enemies), hero.command.fallback))
+        if search is not None:
+            actions = plan(search, team, state, mana, actions, timer)
+        for action in actions:
+            print(action)
+        timer.end_turn()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,65 @@
+from typing import Dict, List, Sequence, Tuple
+
+from core.distances import Distances
+
+
+def allocate(table: Distances, ants: Sequence[int], beacons: Dict[int, int]) -> List[Tuple[int, int, int]]:
+    """(from, beacon, ants) groups sending one player's ants to the beacons in proportion to their strength.
+
+    Every beacon first gets up to the floor of its share of the ants,
+    then up to the ceiling; in both passes the closest (ant cell, beacon)
+    pairs are served first, ties going to the lower cell numbers.
+    """
+    if not beacons:
+        return []
+    cells = [i for i, a in enumerate(ants) if a > 0]
+    total = sum(ants)
+    weight = sum(beacons.values())
+    targets = sorted(beacons)
+    low = [beacons[b] * total // weight for b in targets]
+    high = [-(-beacons[b] * total // weight) for b in targets]
+    n, dist = table.n, table.dist
+    # 距離ごとのバケツに、セル番号、ビーコンのセル番号の順で積めば並べ替えはいらない
+    buckets: Dict[int, List[Tuple[int, int]]] = {}
+    for k, i in enumerate(cells):
+        row = i * n
+        for j, b in enumerate(targets):
+            d = dist[row + b]
+            if d in buckets:
+                buckets[d].append((k, j))
+            else:
+                buckets[d] = [(k, j)]
+    pairs = [pair for d in sorted(buckets) for pair in buckets[d]]
+    remaining = [ants[i] for i in cells]
+    left = total
+    groups = []
+    for wanted, unmet in ((low, sum(low)), (high, total)):
+        for k, j in pairs:
+            count = remaining[k]
+            if count == 0 or wanted[j] <= 0:
+                continue
+            if wanted[j] < count:
+                count = wanted[j]
+            groups.append((cells[k], targets[j], count))
+            remaining[k] -= count
+            low[j] -= count
+            high[j] -= count
+            left -= count
+            if left == 0:
+                return groups
+            # 切り捨ての分が全部埋まれば、この回の残りの組は何も取らない
+            unmet -= count
+            if unmet <= 0:
+                break
+    return groups
+
+
+def advance(table: Distances, ants: Sequence[int], beacons: Dict[int, int]) -> List[int]:
+    """One player's ants after one move toward the beacons, one cell along a shortest path."""
+    n, step = table.n, table.step
+    moved = list(ants)
+    for a, b, count in allocate(table, ants, beacons):
+        if a != b:
+            moved[a] -= count
+            moved[step[a * n + b]] += count
+    return moved
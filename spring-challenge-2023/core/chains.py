@@ -0,0 +1,51 @@
+from typing import List, Optional, Sequence
+
+
+def strongest_chains(adjacency: Sequence[Sequence[int]], ants: Sequence[int], bases: Sequence[int],
+                     blocked: Optional[Sequence[bool]] = None) -> List[int]:
+    """For every cell, the strongest chain of ants reaching it from one of the bases, 0 if none.
+
+    A chain is a path of cells that all hold ants, and its strength the
+    fewest ants on one of them. Cells are settled strongest first from
+    buckets indexed by strength, a Dijkstra for the widest path that
+    needs no heap, so a call is O(cells + max ants). `blocked` cells are
+    left out of every chain.
+    """
+    n = len(ants)
+    strength = [0] * n
+    top = max(ants, default=0)
+    buckets: List[List[int]] = [[] for _ in range(top + 1)]
+    for base in bases:
+        if ants[base] > strength[base] and not (blocked and blocked[base]):
+            strength[base] = ants[base]
+            buckets[ants[base]].append(base)
+    for s in range(top, 0, -1):
+        # 同じ強さで届いたセルは走査中のバケツに積まれ、そのまま処理される
+        for i in buckets[s]:
+            if strength[i] != s:
+                continue
+            for j in adjacency[i]:
+                t = ants[j]
+                if t > s:
+                    t = s
+                if t > strength[j] and not (blocked and blocked[j]):
+                    strength[j] = t
+                    buckets[t].append(j)
+    return strength
+
+
+def harvest_chains(adjacency: Sequence[Sequence[int]], ants: Sequence[Sequence[int]],
+                   bases: Sequence[Sequence[int]]) -> List[List[int]]:
+    """Both players' harvesting chain strengths for every cell.
+
+    A player's ants on a cell are blocked when the opponent's attack
+    chain to it, the strongest chain over all cells, is stronger than
+    theirs; harvesting chains only go through cells that are not blocked.
+    """
+    attack = [strongest_chains(adjacency, ants[player], bases[player]) for player in range(2)]
+    harvest = []
+    for player in range(2):
+        mine, theirs = attack[player], attack[1 - player]
+        blocked = [a < b for a, b in zip(mine, theirs)]
+        harvest.append(strongest_chains(adjacency, ants[player], bases[player], blocked))
+    return harvest
@@ -0,0 +1,79 @@
+from array import array
+from typing import List, Sequence, Tuple
+
+
+class Distances:
+    """Shortest path lengths and first steps between every pair of cells.
+
+    Built once with a BFS from every cell. `dist[a * n + b]` is the number
+    of moves from a to b and `step[a * n + b]` the neighbor of a to go to
+    first, a itself when a == b; both are `unreachable` between cells that
+    are not connected. They are flat arrays of unsigned bytes, or shorts
+    on maps of 255 cells or more. Neighbors are tried in input order, so
+    ties break the same way on every call.
+    """
+
+    def __init__(self, neighbors: Sequence[Sequence[int]]):
+        n = self.n = len(neighbors)
+        typecode = "B" if n < 255 else "H"
+        self.unreachable = unreachable = (1 << 8 * array(typecode).itemsize) - 1
+        adjacency = [[j for j in row if j != -1] for row in neighbors]
+        self.dist = array(typecode, bytes(n * n * array(typecode).itemsize))
+        self.step = array(typecode, self.dist)
+        for source in range(n):
+            dist = [unreachable] * n
+            parent = [unreachable] * n
+            dist[source] = 0
+            parent[source] = source
+            frontier = [source]
+            d = 0
+            while frontier:
+                d += 1
+                reached = []
+                for i in frontier:
+                    for j in adjacency[i]:
+                        if dist[j] == unreachable:
+                            dist[j] = d
+                            parent[j] = i
+                            reached.append(j)
+                frontier = reached
+            self.dist[source * n:(source + 1) * n] = array(typecode, dist)
+            # BFS 木の親は、その点から source へ向かう最初の一歩
+            self.step[source::n] = array(typecode, parent)
+
+    def distance(self, a: int, b: int) -> int:
+        return self.dist[a * self.n + b]
+
+    def next_hop(self, a: int, b: int) -> int:
+        return self.step[a * self.n + b]
+
+    def row(self, a: int) -> array:
+        """Distances from a to every cell."""
+        return self.dist[a * self.n:(a + 1) * self.n]
+
+    def path(self, a: int, b: int) -> List[int]:
+        """Cells from a to b, both included; empty if b can't be reached."""
+        n, step = self.n, self.step
+        if self.dist[a * n + b] == self.unreachable:
+            return []
+        path = [a]
+        while a != b:
+            a = step[a * n + b]
+            path.append(a)
+        return path
+
+    def from_bases(self, bases: Sequence[int]) -> Tuple[List[int], List[int], List[int]]:
+        """Distance to the nearest base, the first step toward it and that base for every cell, -1 if none."""
+        n, unreachable = self.n, self.unreachable
+        distances, parent, nearest = [-1] * n, [-1] * n, [-1] * n
+        for base in bases:
+            row = self.row(base)
+            for i in range(n):
+                d = row[i]
+                if d != unreachable and (distances[i] == -1 or d < distances[i]):
+                    distances[i] = d
+                    nearest[i] = base
+        for i in range(n):
+            if nearest[i] != -1:
+                parent[i] = self.step[i * n + nearest[i]]
+        return distances, parent, nearest
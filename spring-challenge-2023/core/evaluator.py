@@ -0,0 +1,66 @@
+from typing import Dict, List, Sequence, Tuple
+
+from core.allocation import advance
+from core.chains import strongest_chains
+from core.distances import Distances
+
+EGG: int = 1
+CRYSTAL: int = 2
+
+
+class HarvestEvaluator:
+    """Predicted harvest of candidate beacon sets, by the referee's rules.
+
+    `update` takes one turn's resources and ants. `forecast` then plays
+    our ants `horizon` turns toward a beacon set with the allocation of
+    core/allocation.py and harvests along the chains of core/chains.py,
+    eggs hatching on the bases, against the opponent's ants held where
+    they are now. Their attack chain is therefore worked out once per
+    turn, and a candidate costs one allocation and two chain passes per
+    simulated turn.
+    """
+
+    def __init__(self, table: Distances, adjacency: Sequence[Sequence[int]], types: Sequence[int],
+                 bases: Sequence[int], opp_bases: Sequence[int], horizon: int = 5):
+        self.table = table
+        self.adjacency = adjacency
+        self.types = types
+        self.bases = bases
+        self.opp_bases = opp_bases
+        self.horizon = horizon
+        self.resources: Sequence[int] = [0] * len(types)
+        self.ants: Sequence[int] = [0] * len(types)
+        self.opp_attack: List[int] = [0] * len(types)
+        self.sources: List[int] = []
+
+    def update(self, resources: Sequence[int], ants: Sequence[int], opp_ants: Sequence[int]):
+        self.resources = resources
+        self.ants = ants
+        self.opp_attack = strongest_chains(self.adjacency, opp_ants, self.opp_bases)
+        # 資源のあるセルだけを見れば収穫は足りる
+        self.sources = [i for i, r in enumerate(resources) if r > 0 and self.types[i] in (EGG, CRYSTAL)]
+
+    def forecast(self, beacons: Dict[int, int]) -> Tuple[List[int], int, int]:
+        """Our ants after `horizon` turns and the crystals and eggs harvested over them."""
+        ants = list(self.ants)
+        left = {i: self.resources[i] for i in self.sources}
+        crystals, eggs = 0, 0
+        for _ in range(self.horizon):
+            if beacons:
+                ants = advance(self.table, ants, beacons)
+            attack = strongest_chains(self.adjacency, ants, self.bases)
+            blocked = [a < b for a, b in zip(attack, self.opp_attack)]
+            chains = strongest_chains(self.adjacency, ants, self.bases, blocked)
+            hatched = 0
+            for i, r in left.items():
+                if chains[i] and r:
+                    taken = min(chains[i], r)
+                    left[i] = r - taken
+                    if self.types[i] == CRYSTAL:
+                        crystals += taken
+                    else:
+                        hatched += taken
+            eggs += hatched
+            for k, base in enumerate(self.bases):
+                ants[base] += hatched // len(self.bases) + (k < hatched % len(self.bases))
+        return ants, crystals, eggs
@@ -0,0 +1,52 @@
+from typing import List, Optional, Sequence
+
+from core.distances import Distances
+
+
+class BeaconNetwork:
+    """A tree of beacon cells grown from the bases, one target at a time.
+
+    Each target joins along a shortest path to the closest cell already
+    in the tree, not to a base, so paths to nearby resources share their
+    trunk; taking the closest target first is the Takahashi-Matsuyama
+    heuristic for Steiner trees. Every cell's distance to the tree and
+    the tree cell giving it are kept up to date, so a query is O(1) and
+    joining k cells costs O(k n).
+    """
+
+    def __init__(self, table: Distances, bases: Sequence[int]):
+        self.table = table
+        self.cells: List[int] = []
+        self.member = [False] * table.n
+        self.gap = [table.unreachable] * table.n
+        self.attach = [-1] * table.n
+        for base in bases:
+            self.join(base)
+
+    def join(self, cell: int):
+        if self.member[cell]:
+            return
+        self.member[cell] = True
+        self.cells.append(cell)
+        gap, attach = self.gap, self.attach
+        for i, d in enumerate(self.table.row(cell)):
+            if d < gap[i]:
+                gap[i] = d
+                attach[i] = cell
+
+    def nearest(self, targets: Sequence[int]) -> Optional[int]:
+        """The reachable target closest to the tree, the first one on ties."""
+        gap, unreachable = self.gap, self.table.unreachable
+        best = None
+        for target in targets:
+            if gap[target] != unreachable and (best is None or gap[target] < gap[best]):
+                best = target
+        return best
+
+    def path(self, target: int) -> List[int]:
+        """Cells from the target to the tree, the tree cell it joins at included."""
+        return self.table.path(target, self.attach[target])
+
+    def connect(self, path: Sequence[int]):
+        for cell in path:
+            self.join(cell)
@@ -0,0 +1,44 @@
+from typing import Dict, Sequence
+
+
+class BeaconPlanner:
+    """The beacons of one turn, built path by path within a budget of ants.
+
+    Keeps the strength of every beacon cell and their running total, so
+    `add` touches only the cells of the new path. The cost is worked out
+    before anything changes, so a rejected path leaves nothing to undo.
+    A cell on several paths keeps the strongest beacon asked for.
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.beacons: Dict[int, int] = {}
+        self.total = 0
+
+    def cost(self, path: Sequence[int], strength: int) -> int:
+        """How much the total grows if the path gets beacons of `strength`."""
+        beacons = self.beacons
+        extra = 0
+        for i in path:
+            old = beacons.get(i)
+            if old is None:
+                extra += strength
+            elif strength > old:
+                extra += strength - old
+        return extra
+
+    def add(self, path: Sequence[int], strength: int) -> bool:
+        """Put beacons of `strength` along the path, unless the total would exceed the budget."""
+        extra = self.cost(path, strength)
+        if self.total + extra > self.budget:
+            return False
+        beacons = self.beacons
+        for i in path:
+            old = beacons.get(i)
+            if old is None or strength > old:
+                beacons[i] = strength
+        self.total += extra
+        return True
+
+    def __len__(self) -> int:
+        return len(self.beacons)
@@ -1,5 +1,27 @@
-from collections import deque
 import sys
+from time import perf_counter
+from typing import Dict, Iterator, List
+
+from common import profiling
+from common.fastio import IntReader
+from common.timing import TurnTimer
+from core.distances import Distances
+from core.evaluator import HarvestEvaluator
+from core.network import BeaconNetwork
+from core.planner import BeaconPlanner
+
+# 卵 1 個を結晶いくつとみなすか
+EGG_VALUE: float = 10.0
+# ビーコンの強さの合計をアリの何倍まで張るか、薄く広げすぎた分は評価で落ちる
+BUDGET_RATIO: int = 2
+# 1 ターン 100ms、初回 1000ms の制限に、入出力の分の余裕を残す
+TURN_BUDGET: float = 0.07
+FIRST_TURN_BUDGET: float = 0.9
+MAX_TURNS: int = 100
+# これより大きいマップでは、先読みを短くし評価する候補を減らす
+LARGE_MAP: int = 150
+HORIZON: int = 5
+LARGE_MAP_HORIZON: int = 3
 
 
 def log(*args, **kwargs):
@@ -24,86 +46,136 @@ class Cell:
         return f"Cell(id={self.id}, type={self.type}, resources={self.resources}, neighbors={self.neighbors})"
 
 
+def checkpoint(k: int, sparse: bool = False) -> bool:
+    """Whether to score the network after k targets: 1, 2, 3, 4, 6, 8, 12, ..., or only 1, 2, 4, 8, ... if sparse.
+
+    Each far target changes the network less, so fewer of them are tried.
+    """
+    if k & (k - 1) == 0:
+        return True
+    return not sparse and k % 3 == 0 and (k // 3) & (k // 3 - 1) == 0
+
+
+def grow(cells: List[Cell], nearest_cells: List[int], table: Distances, bases: List[int], target_type: int,
+         budget: int) -> Iterator[Dict[int, int]]:
+    """Beacons on a network joining our bases to resources of `target_type` (0 for any), after each target joins."""
+    targets = [
+        i for i in nearest_cells
+        if cells[i].resources > 0 and (target_type == 0 or cells[i].type == target_type)
+    ]
+    network = BeaconNetwork(table, bases)
+    planner = BeaconPlanner(budget)
+    # ネットワーク上の各セルから基地までの道の opp_ants + 1 の最小値
+    weakest = {base: cells[base].opp_ants + 1 for base in bases}
+    while targets:
+        # 基地ではなく、ここまでに張ったビーコンのいちばん近いところにつなぐ
+        target = network.nearest(targets)
+        if target is None:
+            break
+        targets.remove(target)
+        path = network.path(target)
+        # 基地など、すでにネットワーク上にある資源は自分のセルのビーコンだけで足りる
+        strength = weakest[path[-1]] if len(path) > 1 else 1
+        for i in path[1:-1]:
+            strength = min(strength, cells[i].opp_ants + 1)
+        # 足りなくなった時点で打ち切る、遠い資源ほど後に来る
+        if not planner.add(path, strength):
+            break
+        network.connect(path)
+        for k in range(len(path) - 2, -1, -1):
+            weakest.setdefault(path[k], min(weakest[path[k + 1]], cells[path[k]].opp_ants + 1))
+        yield planner.beacons
+
+
+def plan(cells: List[Cell], nearest_cells: List[int], table: Distances, bases: List[int],
+         evaluator: HarvestEvaluator, my_ants: int, opp_ants: int, eggs: int, timer: TurnTimer) -> Dict[int, int]:
+    """The beacon set with the best predicted income among the networks grown toward each kind of resource.
+
+    Candidates are scored in turn while the timer has room for another
+    forecast; once it has not, the best set scored so far is returned.
+    """
+    # 卵 1 個はアリ 1 匹になって先の収穫に効く、相手より少ないうちは重く見る
+    egg_value = EGG_VALUE if eggs > 0 and my_ants < opp_ants * 1.2 else EGG_VALUE / 4
+    sparse = len(cells) > LARGE_MAP
+    candidates = []
+    for target_type in (0, 1, 2):
+        # 出力するのは強さ 1 のビーコンなので、その配置で評価する
+        found = []
+        beacons: Dict[int, int] = {}
+        for k, beacons in enumerate(grow(cells, nearest_cells, table, bases, target_type, my_ants * BUDGET_RATIO), 1):
+            if checkpoint(k, sparse):
+                found.append(dict.fromkeys(beacons, 1))
+        if beacons and (not found or len(found[-1]) != len(beacons)):
+            found.append(dict.fromkeys(beacons, 1))
+        candidates.extend(found)
+    _, crystals, hatched = evaluator.forecast({})
+    best, best_score = {}, crystals + egg_value * hatched
+    # いちばん遅かった評価が残り時間に収まらなくなったら打ち切る
+    slowest = 0.0
+    scored = 0
+    for candidate in candidates:
+        if slowest > timer.remaining():
+            break
+        started = perf_counter()
+        _, crystals, hatched = evaluator.forecast(candidate)
+        slowest = max(slowest, perf_counter() - started)
+        scored += 1
+        score = crystals + egg_value * hatched
+        if score > best_score:
+            best, best_score = candidate, score
+    log(my_ants, opp_ants, f"{scored}/{len(candidates)}", best_score, best)
+    return best
+
+
 def main():
+    # 1 ターン分の計画を plan() 1 回として計測する
+    profiling.install(functions=[(globals(), "plan")])
+
     # Initial inputs
-    n_cells = int(input())
+    reader = IntReader()
+    n_cells = reader.int()
     cells = []
-    for i in range(n_cells):
-        t, r, *neigh = map(int, input().split())
+    for i, (t, r, *neigh) in enumerate(reader.rows(n_cells, 8)):
         cells.append(Cell(i, t, r, neigh))
-    n_bases = int(input())
-    my_bases = [int(i) for i in input().split()]
-    opp_bases = [int(i) for i in input().split()]
+    n_bases = reader.int()
+    my_bases = reader.ints(n_bases)
+    opp_bases = reader.ints(n_bases)
     base_id = my_bases[0]
+    # 初回の持ち時間は初期入力と一緒に始まる、全点対の BFS もその中で数える
+    timer = TurnTimer(TURN_BUDGET, FIRST_TURN_BUDGET, MAX_TURNS)
+    timer.start_turn()
 
     # Compute distances
-    distances = [-1] * n_cells
-    parent = [-1] * n_cells
-    nearset_base = [-1] * n_cells
-    todo = deque([(base, 0, base, base) for base in my_bases])
-    while todo:
-        i, d, p, b = todo.popleft()
-        if distances[i] != -1:
-            continue
-        distances[i] = d
-        parent[i] = p
-        nearset_base[i] = b
-        for j in cells[i].neighbors:
-            if j != -1:
-                todo.append((j, d + 1, i, b))
+    table = Distances([cell.neighbors for cell in cells])
+    distances, _, _ = table.from_bases(my_bases)
     nearest_cells = [cell.id for cell in sorted(cells, key=lambda cell: distances[cell.id])]
+    adjacency = [[j for j in cell.neighbors if j != -1] for cell in cells]
+    horizon = HORIZON if n_cells <= LARGE_MAP else LARGE_MAP_HORIZON
+    evaluator = HarvestEvaluator(table, adjacency, [cell.type for cell in cells], my_bases, opp_bases, horizon)
 
     # Game loop
     while True:
         my_ants, opp_ants = 0, 0
         eggs = 0
-        my_score, opp_score = map(int, input().split())
-        for i in range(n_cells):
-            r, my, opp = map(int, input().split())
+        my_score, opp_score = reader.ints(2)
+        if timer.turn:
+            timer.start_turn()
+        for i, (r, my, opp) in enumerate(reader.rows(n_cells, 3)):
             cells[i].update(r, my, opp)
             my_ants += my
             opp_ants += opp
             if cells[i].type == 1:
                 eggs += r
-        target_type = 0
-        if eggs > 0 and my_ants < opp_ants * 1.2:
-            target_type = 1
-        elif my_ants > opp_ants * 1.5:
-            target_type = 2
-        log(my_ants, opp_ants, target_type)
-        beacons = {}
-        for i in nearest_cells:
-            if cells[i].resources <= 0:
-                continue
-            if target_type == 1 and cells[i].type != 1:
-                continue
-            if target_type == 2 and cells[i].type != 2:
-                continue
-            target = i
-            b = {i}
-            strength = -1
-            while parent[i] != i:
-                i = parent[i]
-                b.add(i)
-                if strength == -1 or cells[i].opp_ants + 1 < strength:
-                    strength = cells[i].opp_ants + 1
-            updated = {**beacons}
-            for bi in b:
-                if bi in updated:
-                    updated[bi] = max(updated[bi], strength)
-                else:
-                    updated[bi] = strength
-            if sum(updated.values()) > my_ants:
-                break
-            log(target, strength, b)
-            beacons = updated
-        log(beacons)
+        evaluator.update([cell.resources for cell in cells], [cell.my_ants for cell in cells],
+                         [cell.opp_ants for cell in cells])
+        beacons = plan(cells, nearest_cells, table, my_bases, evaluator, my_ants, opp_ants, eggs, timer)
         if beacons:
-            output = ";".join(f"BEACON {b} 1" for b in beacons)
+            output = ";".join(f"BEACON {b} {s}" for b, s in beacons.items())
         else:
             output = "WAIT"
         output += f";MESSAGE ({my_score}, {my_ants}) vs ({opp_score}, {opp_ants})"
         print(output)
+        timer.end_turn()
 
 
 if __name__ == '__main__':
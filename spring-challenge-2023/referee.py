@@ -0,0 +1,332 @@
+import argparse
+import random
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from common import match
+from common.match import Result
+
+MAX_TURNS: int = 100
+MIN_RADIUS: int = 4
+MAX_RADIUS: int = 7
+# 点対称の組ごとに穴を開ける確率
+HOLE_RATE: float = 0.15
+MIN_PAIRS: int = 15
+EGG_RATE: float = 0.15
+CRYSTAL_RATE: float = 0.25
+EGG_RESOURCES: Tuple[int, int] = (10, 30)
+CRYSTAL_RESOURCES: Tuple[int, int] = (20, 100)
+ANTS_PER_BASE: Tuple[int, int] = (10, 20)
+DIRECTIONS: List[Tuple[int, int]] = [(1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1)]
+
+EMPTY: int = 0
+EGG: int = 1
+CRYSTAL: int = 2
+
+
+class Referee:
+    """Headless implementation of the Spring Challenge 2023 rules.
+
+    A turn resolves in this order: every player's ants are allocated to
+    their beacons and move one cell, then both players harvest at once
+    along their chains, crystals going to the score and eggs hatching as
+    new ants on the bases. Per-cell state is kept in NumPy arrays. The
+    rules are written here on their own, not shared with the bot's core,
+    so local games check the bot's predictions instead of repeating them.
+    """
+
+    ACTION_LINES: int = 1
+
+    def __init__(self, seed: int = 0):
+        self.random = random.Random(seed)
+        self.turn = 0
+        self.types: List[int] = []
+        self.neighbors: List[List[int]] = []
+        self._generate()
+        n = len(self.types)
+        # 隣のない方向は末尾の番兵 n を指す、番兵の値はいつも 0
+        self.padded = np.array(self.neighbors, dtype=np.int64).reshape(n, 6)
+        self.padded[self.padded == -1] = n
+        self.dist, self.step = self._distances()
+        self.initial_resources = self.resources.copy()
+        self.egg_cells = np.array(self.types) == EGG
+        self.crystal_cells = np.array(self.types) == CRYSTAL
+        self.crystals = int(self.resources[self.crystal_cells].sum())
+        self.scores = [0, 0]
+        self.messages = ["", ""]
+        self.errors: List[List[str]] = [[], []]
+
+    def _generate(self):
+        """A connected, point-symmetric hex map; cell 2k + 1 mirrors cell 2k + 2."""
+        rng = self.random
+        half: List[Tuple[int, int]] = []
+        # 穴で中央が囲まれて小さくなりすぎた盤面は作り直す
+        while len(half) < MIN_PAIRS:
+            radius = rng.randint(MIN_RADIUS, MAX_RADIUS)
+            coords = [(q, r) for q in range(-radius, radius + 1) for r in range(-radius, radius + 1)
+                      if abs(q + r) <= radius]
+            kept = {(0, 0)}
+            for c in sorted(c for c in coords if c > (0, 0)):
+                if rng.random() >= HOLE_RATE:
+                    kept.update((c, (-c[0], -c[1])))
+            # 中央から届かないセルを落とす、盤面が点対称なので落ちるセルも対称
+            reached, frontier = {(0, 0)}, [(0, 0)]
+            while frontier:
+                q, r = frontier.pop()
+                for dq, dr in DIRECTIONS:
+                    c = (q + dq, r + dr)
+                    if c in kept and c not in reached:
+                        reached.add(c)
+                        frontier.append(c)
+            half = sorted(c for c in reached if c > (0, 0))
+        order = [(0, 0)] + [c for pair in ((c, (-c[0], -c[1])) for c in half) for c in pair]
+        index = {c: i for i, c in enumerate(order)}
+        self.neighbors = [[index.get((q + dq, r + dr), -1) for dq, dr in DIRECTIONS] for q, r in order]
+
+        # 基地は中央から離れた組から選び、資源は置かない
+        reach = max(map(hex_length, half))
+        far = [i for i in range(1, len(order), 2) if hex_length(order[i]) >= reach // 2]
+        n_bases = 2 if len(far) >= 4 and rng.random() < 0.5 else 1
+        picked = rng.sample(far, n_bases)
+        self.bases = [picked, [i + 1 for i in picked]]
+        types, resources = [EMPTY] * len(order), [0] * len(order)
+        for i in range(1, len(order), 2):
+            if i in picked:
+                continue
+            roll = rng.random()
+            if roll < EGG_RATE:
+                types[i], resources[i] = EGG, rng.randint(*EGG_RESOURCES)
+            elif roll < EGG_RATE + CRYSTAL_RATE:
+                types[i], resources[i] = CRYSTAL, rng.randint(*CRYSTAL_RESOURCES)
+            types[i + 1], resources[i + 1] = types[i], resources[i]
+        if CRYSTAL not in types:
+            types[0], resources[0] = CRYSTAL, rng.randint(*CRYSTAL_RESOURCES)
+        self.types = types
+        self.resources = np.array(resources, dtype=np.int64)
+        self.ants = np.zeros((2, len(order)), dtype=np.int64)
+        for base in picked:
+            count = rng.randint(*ANTS_PER_BASE)
+            self.ants[0, base] = self.ants[1, base + 1] = count
+
+    def initial_input(self, player: int) -> List[str]:
+        rows = [f"{t} {r} {' '.join(map(str, neigh))}"
+                for t, r, neigh in zip(self.types, self.initial_resources.tolist(), self.neighbors)]
+        return [
+            str(len(self.types)),
+            *rows,
+            str(len(self.bases[player])),
+            " ".join(map(str, self.bases[player])),
+            " ".join(map(str, self.bases[1 - player])),
+        ]
+
+    def turn_input(self, player: int) -> List[str]:
+        mine, theirs = self.ants[player].tolist(), self.ants[1 - player].tolist()
+        return [
+            f"{self.scores[player]} {self.scores[1 - player]}",
+            *(f"{r} {a} {b}" for r, a, b in zip(self.resources.tolist(), mine, theirs)),
+        ]
+
+    def is_over(self) -> bool:
+        if self.turn >= MAX_TURNS or max(self.scores) * 2 > self.crystals:
+            return True
+        return not self.resources[self.crystal_cells].any()
+
+    def summary(self) -> Dict[str, List[int]]:
+        return {"scores": list(self.scores), "ants": self.ants.sum(axis=1).tolist()}
+
+    def winner(self) -> int:
+        """0 or 1 for the winning player, -1 for a draw; ties on score go to the player with more ants."""
+        if self.scores[0] != self.scores[1]:
+            return 0 if self.scores[0] > self.scores[1] else 1
+        ants = self.ants.sum(axis=1)
+        if ants[0] != ants[1]:
+            return 0 if ants[0] > ants[1] else 1
+        return -1
+
+    def _parse(self, player: int, line: str) -> Dict[int, int]:
+        """Beacon strengths from one output line; beacons placed twice on a cell add up."""
+        n = len(self.types)
+        beacons: Dict[int, int] = {}
+        for command in line.split(";"):
+            words = command.split()
+            if not words or words[0] == "WAIT":
+                continue
+            if words[0] == "MESSAGE":
+                self.messages[player] = command.strip()[len("MESSAGE"):].strip()
+                continue
+            try:
+                if words[0] == "BEACON" and len(words) == 3:
+                    path, strength = [int(words[1])], int(words[2])
+                elif words[0] == "LINE" and len(words) == 4:
+                    a, b, strength = int(words[1]), int(words[2]), int(words[3])
+                    if not (0 <= a < n and 0 <= b < n):
+                        raise ValueError(command)
+                    path = self._path(a, b)
+                else:
+                    raise ValueError(command)
+                if strength < 1 or not all(0 <= i < n for i in path):
+                    raise ValueError(command)
+            except ValueError:
+                self.errors[player].append(f"turn {self.turn}: invalid action {command.strip()!r}")
+                continue
+            for i in path:
+                beacons[i] = beacons.get(i, 0) + strength
+        return beacons
+
+    def play_turn(self, actions: List[List[str]]):
+        for player in range(2):
+            self._move(player, self._parse(player, actions[player][0]))
+        self._harvest()
+        self.turn += 1
+
+    def _distances(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Moves between every pair of cells, -1 if unreachable, and the first step from a toward b.
+
+        A BFS from all cells at once on boolean frontiers. The step is the
+        first neighbor, in input order, one move closer; a itself when a == b.
+        """
+        n = len(self.types)
+        dist = np.full((n, n), -1, dtype=np.int64)
+        np.fill_diagonal(dist, 0)
+        frontier = np.eye(n + 1, dtype=bool)[:, :n]
+        d = 0
+        while frontier.any():
+            d += 1
+            # 行 i が届いたセル、その隣はどれも距離 d
+            reached = frontier[self.padded].any(axis=1)[:n] & (dist == -1)
+            dist[reached] = d
+            frontier = np.vstack([reached, np.zeros((1, n), dtype=bool)])
+        # step[a, b]: 隣 j から b までが 1 少ないもの、後ろの方向から上書きして先頭を残す
+        step = np.tile(np.arange(n)[:, None], (1, n))
+        padded_dist = np.vstack([dist, np.full((1, n), -2)])
+        for k in range(5, -1, -1):
+            j = self.padded[:, k]
+            closer = (padded_dist[j] == dist - 1) & (dist > 0)
+            step = np.where(closer, j[:, None], step)
+        return dist, step
+
+    def _path(self, a: int, b: int) -> List[int]:
+        """Cells from a to b along the first steps, both included; empty if b can't be reached."""
+        if self.dist[a, b] < 0:
+            return []
+        path = [a]
+        while a != b:
+            a = int(self.step[a, b])
+            path.append(a)
+        return path
+
+    def _move(self, player: int, beacons: Dict[int, int]):
+        """Allocate the player's ants to the beacons in proportion to their strength and move them one cell.
+
+        Every beacon first gets up to the floor of its share, then up to the
+        ceiling; in both passes the closest (ant cell, beacon) pairs go first,
+        ties to the lower cell numbers.
+        """
+        if not beacons:
+            return
+        ants = self.ants[player]
+        cells = np.flatnonzero(ants)
+        targets = np.array(sorted(beacons), dtype=np.int64)
+        strengths = np.array([beacons[b] for b in targets.tolist()], dtype=np.int64)
+        total, weight = int(ants.sum()), int(strengths.sum())
+        low = strengths * total // weight
+        high = -(-strengths * total // weight)
+        k, j = np.meshgrid(np.arange(len(cells)), np.arange(len(targets)), indexing="ij")
+        k, j = k.ravel(), j.ravel()
+        order = np.lexsort((targets[j], cells[k], self.dist[cells[k], targets[j]]))
+        pairs = list(zip(k[order].tolist(), j[order].tolist()))
+        remaining = ants[cells].tolist()
+        sent = np.zeros((len(cells), len(targets)), dtype=np.int64)
+        for wanted in (low, high):
+            wanted = wanted - sent.sum(axis=0)
+            for a, b in pairs:
+                count = min(remaining[a], int(wanted[b]))
+                if count > 0:
+                    sent[a, b] += count
+                    remaining[a] -= count
+                    wanted[b] -= count
+        moved = ants.copy()
+        for a, b in zip(*np.nonzero(sent)):
+            source = cells[a]
+            moved[source] -= sent[a, b]
+            moved[self.step[source, targets[b]]] += sent[a, b]
+        self.ants[player] = moved
+
+    def _chains(self, ants: np.ndarray, bases: List[int]) -> np.ndarray:
+        """The strongest chain of ants from one of the bases to every cell, 0 if none.
+
+        A chain's strength is the fewest ants on one of its cells; widest
+        paths are relaxed over all cells at once until nothing changes.
+        """
+        n = len(self.types)
+        width = np.zeros(n + 1, dtype=np.int64)
+        width[bases] = ants[bases]
+        while True:
+            relaxed = np.maximum(width[:n], np.minimum(ants, width[self.padded].max(axis=1)))
+            if np.array_equal(relaxed, width[:n]):
+                return relaxed
+            width[:n] = relaxed
+
+    def _harvest(self):
+        """Both players harvest along their chains and the eggs hatch on the bases.
+
+        A player's ants on a cell are blocked when the opponent's attack
+        chain there, over all cells, is stronger; harvesting chains leave
+        blocked cells out. When the cell can't give both players what they
+        ask for, a player asking for at most half keeps it and the other
+        gets the rest; otherwise each gets half and an odd unit stays.
+        """
+        attack = np.array([self._chains(self.ants[p], self.bases[p]) for p in range(2)])
+        blocked = attack < attack[::-1]
+        chains = np.array([self._chains(np.where(blocked[p], 0, self.ants[p]), self.bases[p]) for p in range(2)])
+        wanted = np.minimum(chains, self.resources)
+        # 相手が半分 (奇数なら切り上げ) を超えて求めれば、こちらに残るのは切り捨ての半分
+        upper = self.resources - self.resources // 2
+        short = wanted.sum(axis=0) > self.resources
+        taken = wanted.copy()
+        for p in range(2):
+            rest = self.resources - np.minimum(wanted[1 - p], upper)
+            taken[p] = np.where(short, np.minimum(wanted[p], rest), wanted[p])
+        self.resources = self.resources - taken.sum(axis=0)
+        for player in range(2):
+            self.scores[player] += int(taken[player, self.crystal_cells].sum())
+            hatched = int(taken[player, self.egg_cells].sum())
+            bases = self.bases[player]
+            for k, base in enumerate(bases):
+                self.ants[player, base] += hatched // len(bases) + (k < hatched % len(bases))
+
+
+def hex_length(c: Tuple[int, int]) -> int:
+    q, r = c
+    return max(abs(q), abs(r), abs(q + r))
+
+
+def play_match(bot1: str, bot2: str, seed: int = 0, envs: Optional[List[Optional[dict]]] = None,
+               stderr: bool = False) -> Result:
+    return match.play_match(Referee(seed), bot1, bot2, envs, stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Spring Challenge 2023 matches locally.")
+    parser.add_argument("bot1")
+    parser.add_argument("bot2")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--games", type=int, default=1, help="play seeds seed, seed + 1, ... and sum up the results")
+    parser.add_argument("--stderr", action="store_true", help="show the bots' stderr")
+    args = parser.parse_args()
+    wins = [0, 0, 0]
+    start = perf_counter()
+    for seed in range(args.seed, args.seed + args.games):
+        result = play_match(args.bot1, args.bot2, seed, stderr=args.stderr)
+        # 引き分けの -1 は末尾に数える
+        wins[result.winner] += 1
+        print(f"seed={seed} {result}")
+    if args.games > 1:
+        elapsed = perf_counter() - start
+        print(f"{wins[0]}-{wins[1]}-{wins[2]} in {elapsed:.1f}s ({args.games / elapsed * 60:.0f} games/min)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+import argparse
+import gc
+import json
+import platform
+import random
+import subprocess
+import sys
+from statistics import median
+from time import perf_counter, time
+from typing import Callable, Dict, List, Tuple
+
+import main
+from common.timing import TurnTimer
+from core.chains import harvest_chains
+from core.distances import Distances
+from core.evaluator import HarvestEvaluator
+
+# 六角形の盤面の半径、セル数は 3 r (r + 1) + 1
+RADII: List[int] = [2, 4, 6, 8, 10]
+REPEAT: int = 200
+NOISE_US: float = 2.0
+DIRECTIONS: List[Tuple[int, int]] = [(1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1)]
+
+
+class Game:
+    """A synthetic hexagonal map with one turn of resources and ants.
+
+    Cells are numbered like the referee's: point-symmetric pairs next to
+    each other, so the map is fair and the bases mirror each other.
+    """
+
+    def __init__(self, radius: int, seed: int):
+        rng = random.Random(seed)
+        coords = [(q, r) for q in range(-radius, radius + 1) for r in range(-radius, radius + 1)
+                  if abs(q + r) <= radius]
+        half = [c for c in coords if c > (0, 0)]
+        order = [(0, 0)] + [c for pair in ((c, (-c[0], -c[1])) for c in half) for c in pair]
+        index = {c: i for i, c in enumerate(order)}
+        self.cells = []
+        for i, (q, r) in enumerate(order):
+            neighbors = [index.get((q + dq, r + dr), -1) for dq, dr in DIRECTIONS]
+            if i == 0:
+                kind, resources = 0, 0
+            elif i % 2:
+                kind = rng.choice([0, 0, 1, 2])
+                resources = rng.randint(10, 60) if kind else 0
+            else:
+                kind, resources = self.cells[i - 1].type, self.cells[i - 1].resources
+            self.cells.append(main.Cell(i, kind, resources, neighbors))
+        self.bases = [len(order) - 2]
+        for cell in self.cells:
+            ants = rng.randint(0, 8) if rng.random() < 0.3 else 0
+            cell.update(cell.resources, ants, rng.randint(0, 8) if rng.random() < 0.3 else 0)
+
+    def totals(self) -> Tuple[int, int, int]:
+        my_ants = sum(cell.my_ants for cell in self.cells)
+        opp_ants = sum(cell.opp_ants for cell in self.cells)
+        eggs = sum(cell.resources for cell in self.cells if cell.type == 1)
+        return my_ants, opp_ants, eggs
+
+
+def bench_distances(game: Game) -> Callable[[], object]:
+    neighbors = [cell.neighbors for cell in game.cells]
+    return lambda: Distances(neighbors)
+
+
+def bench_from_bases(game: Game) -> Callable[[], object]:
+    table = Distances([cell.neighbors for cell in game.cells])
+    return lambda: table.from_bases(game.bases)
+
+
+def bench_harvest_chains(game: Game) -> Callable[[], object]:
+    adjacency = [[j for j in cell.neighbors if j != -1] for cell in game.cells]
+    ants = [[cell.my_ants for cell in game.cells], [cell.opp_ants for cell in game.cells]]
+    # 相手の基地は自分の基地の点対称
+    bases = [game.bases, [base + 1 for base in game.bases]]
+    return lambda: harvest_chains(adjacency, ants, bases)
+
+
+def bench_plan(game: Game) -> Callable[[], object]:
+    table = Distances([cell.neighbors for cell in game.cells])
+    distances, _, _ = table.from_bases(game.bases)
+    nearest_cells = [cell.id for cell in sorted(game.cells, key=lambda cell: distances[cell.id])]
+    adjacency = [[j for j in cell.neighbors if j != -1] for cell in game.cells]
+    horizon = main.HORIZON if len(game.cells) <= main.LARGE_MAP else main.LARGE_MAP_HORIZON
+    evaluator = HarvestEvaluator(table, adjacency, [cell.type for cell in game.cells], game.bases,
+                                 [base + 1 for base in game.bases], horizon)
+    evaluator.update([cell.resources for cell in game.cells], [cell.my_ants for cell in game.cells],
+                     [cell.opp_ants for cell in game.cells])
+    my_ants, opp_ants, eggs = game.totals()
+    # 初回ではない普通のターンの持ち時間で測る
+    timer = TurnTimer(main.TURN_BUDGET, main.TURN_BUDGET, main.MAX_TURNS)
+
+    def run():
+        timer.start_turn()
+        return main.plan(game.cells, nearest_cells, table, game.bases, evaluator, my_ants, opp_ants, eggs, timer)
+
+    return run
+
+
+BENCHMARKS: Dict[str, Callable[[Game], Callable[[], object]]] = {
+    "Distances": bench_distances,
+    "Distances.from_bases": bench_from_bases,
+    "harvest_chains": bench_harvest_chains,
+    "plan": bench_plan,
+}
+
+
+def measure(setup: Callable[[Game], Callable[[], object]], game: Game, repeat: int) -> List[float]:
+    times = []
+    # timeit と同じく GC を止めて測る
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            call = setup(game)
+            started = perf_counter()
+            call()
+            times.append(perf_counter() - started)
+    finally:
+        gc.enable()
+    return times
+
+
+def commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def run(names: List[str], radii: List[int], repeat: int) -> List[Dict]:
+    # 計画中のログは測りたいものではないので捨てる
+    main.log = lambda *args, **kwargs: None
+    results = []
+    for name in names:
+        for radius in radii:
+            game = Game(radius, seed=radius)
+            times = sorted(measure(BENCHMARKS[name], game, repeat))
+            results.append({
+                "name": name,
+                "cells": len(game.cells),
+                "repeat": repeat,
+                "min_us": times[0] * 1e6,
+                "median_us": median(times) * 1e6,
+                "p95_us": times[min(len(times) - 1, int(0.95 * len(times)))] * 1e6,
+            })
+            print(f"{name:16} {len(game.cells):4d} cells  median {results[-1]['median_us']:9.1f}us  "
+                  f"p95 {results[-1]['p95_us']:9.1f}us", flush=True)
+    return results
+
+
+def compare(results: List[Dict], path: str, threshold: float) -> bool:
+    # 中央値は揺れるので最速値で比べ、数 us の差は誤差とみなす
+    with open(path) as f:
+        previous = {(r["name"], r["cells"]): r for r in json.load(f)["results"]}
+    ok = True
+    for result in results:
+        old = previous.get((result["name"], result["cells"]))
+        if old is None or result["min_us"] - old["min_us"] < NOISE_US:
+            continue
+        ratio = result["min_us"] / old["min_us"]
+        if ratio > threshold:
+            ok = False
+            print(f"REGRESSION {result['name']} {result['cells']} cells: "
+                  f"{old['min_us']:.1f}us -> {result['min_us']:.1f}us (x{ratio:.2f})")
+    return ok
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the 2023 beacon planning on synthetic maps.")
+    parser.add_argument("names", nargs="*", default=list(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--radii", type=int, nargs="+", default=RADII, help="map radii")
+    parser.add_argument("-r", "--repeat", type=int, default=REPEAT)
+    parser.add_argument("-o", "--out", default="bench_2023.json")
+    parser.add_argument("--compare", help="earlier output to check against")
+    parser.add_argument("--threshold", type=float, default=1.3, help="slowdown counted as a regression")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    results = run(args.names, args.radii, args.repeat)
+    with open(args.out, "w") as f:
+        json.dump({
+            "commit": commit(),
+            "python": platform.python_version(),
+            "time": time(),
+            "results": results,
+        }, f, indent=1)
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
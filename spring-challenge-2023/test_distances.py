@@ -0,0 +1,69 @@
+from core.distances import Distances
+
+# 手で作った 8 セルのマップ、7 はどこともつながらない
+#
+#   0 - 1 - 2 - 3
+#       |   |   |
+#       4   5 - 6
+NEIGHBORS = [
+    [1, -1, -1, -1, -1, -1],
+    [0, 2, 4, -1, -1, -1],
+    [1, 3, 5, -1, -1, -1],
+    [2, 6, -1, -1, -1, -1],
+    [1, -1, -1, -1, -1, -1],
+    [2, 6, -1, -1, -1, -1],
+    [3, 5, -1, -1, -1, -1],
+    [-1, -1, -1, -1, -1, -1],
+]
+EXPECTED = [
+    [0, 1, 2, 3, 2, 3, 4],
+    [1, 0, 1, 2, 1, 2, 3],
+    [2, 1, 0, 1, 2, 1, 2],
+    [3, 2, 1, 0, 3, 2, 1],
+    [2, 1, 2, 3, 0, 3, 4],
+    [3, 2, 1, 2, 3, 0, 1],
+    [4, 3, 2, 1, 4, 1, 0],
+]
+
+
+def test_distances_on_hand_built_map():
+    table = Distances(NEIGHBORS)
+    for a, row in enumerate(EXPECTED):
+        assert [table.distance(a, b) for b in range(7)] == row
+        assert table.distance(a, 7) == table.unreachable
+        assert table.distance(7, a) == table.unreachable
+    assert table.distance(7, 7) == 0
+    assert list(table.row(4)) == EXPECTED[4] + [table.unreachable]
+
+
+def test_paths_follow_next_hops():
+    table = Distances(NEIGHBORS)
+    for a in range(7):
+        for b in range(7):
+            path = table.path(a, b)
+            assert path[0] == a and path[-1] == b
+            assert len(path) == EXPECTED[a][b] + 1
+            for i, j in zip(path, path[1:]):
+                assert j in NEIGHBORS[i]
+            assert table.next_hop(a, b) == (path[1] if a != b else a)
+    assert table.path(0, 7) == []
+    # 2 から 6 へは 3 回りでも 5 回りでも 2 歩、先に並んでいる 3 を通る
+    assert table.path(2, 6) == [2, 3, 6]
+
+
+def test_from_bases_picks_nearest_base():
+    table = Distances(NEIGHBORS)
+    distances, parent, nearest = table.from_bases([0, 6])
+    assert distances == [0, 1, 2, 1, 2, 1, 0, -1]
+    assert nearest == [0, 0, 0, 6, 0, 6, 6, -1]
+    assert parent == [0, 0, 1, 6, 1, 6, 6, -1]
+
+
+def test_long_map_uses_wider_entries():
+    # 255 セル以上では 1 バイトに収まらない距離も正しく持つ
+    n = 300
+    line = [[i - 1 if i > 0 else -1, i + 1 if i < n - 1 else -1, -1, -1, -1, -1] for i in range(n)]
+    table = Distances(line)
+    assert table.distance(0, n - 1) == n - 1
+    assert table.next_hop(n - 1, 0) == n - 2
+    assert table.path(0, n - 1) == list(range(n))
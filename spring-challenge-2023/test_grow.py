@@ -0,0 +1,31 @@
+import main
+from core.distances import Distances
+
+# 0 - 1 - 2 の一列、基地 0 にも資源がある
+NEIGHBORS = [
+    [1, -1, -1, -1, -1, -1],
+    [0, 2, -1, -1, -1, -1],
+    [1, -1, -1, -1, -1, -1],
+]
+
+
+def grown(resources, opp_ants, bases, budget):
+    cells = [main.Cell(i, 2 if r else 0, r, neigh) for i, (r, neigh) in enumerate(zip(resources, NEIGHBORS))]
+    for cell, opp in zip(cells, opp_ants):
+        cell.update(cell.resources, 0, opp)
+    table = Distances(NEIGHBORS)
+    distances, _, _ = table.from_bases(bases)
+    nearest_cells = sorted(range(len(cells)), key=lambda i: distances[i])
+    return [dict(beacons) for beacons in main.grow(cells, nearest_cells, table, bases, 0, budget)]
+
+
+def test_target_on_the_base_gets_a_positive_beacon():
+    steps = grown([30, 0, 0], [0, 0, 0], [0], 10)
+    assert steps == [{0: 1}]
+
+
+def test_base_target_then_farther_targets():
+    steps = grown([30, 0, 20], [0, 2, 0], [0], 10)
+    # 基地の資源が先、次に 2 までの道には道中でいちばん弱いところの強さを置く
+    assert steps == [{0: 1}, {0: 1, 1: 1, 2: 1}]
+    assert all(s > 0 for beacons in steps for s in beacons.values())
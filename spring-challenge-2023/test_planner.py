@@ -0,0 +1,48 @@
+import random
+
+from core.planner import BeaconPlanner
+
+
+def test_add_within_budget():
+    planner = BeaconPlanner(10)
+    assert planner.add([0, 1, 2], 2)
+    assert planner.beacons == {0: 2, 1: 2, 2: 2}
+    assert planner.total == 6
+    # 重なるセルは強い方だけを数える
+    assert planner.cost([2, 3], 3) == 4
+    assert planner.add([2, 3], 3)
+    assert planner.beacons == {0: 2, 1: 2, 2: 3, 3: 3}
+    assert planner.total == 10
+    assert len(planner) == 4
+
+
+def test_rejected_path_changes_nothing():
+    planner = BeaconPlanner(5)
+    assert planner.add([0, 1], 2)
+    assert not planner.add([1, 2], 3)
+    assert planner.beacons == {0: 2, 1: 2}
+    assert planner.total == 4
+    # 弱いビーコンしか求めない道は、重なったセルの分は只
+    assert planner.cost([1, 0], 1) == 0
+    assert planner.add([1, 5], 1)
+    assert planner.total == 5
+
+
+def test_total_matches_beacons():
+    rng = random.Random(0)
+    for _ in range(200):
+        planner = BeaconPlanner(rng.randint(0, 60))
+        for _ in range(10):
+            path = rng.sample(range(20), rng.randint(1, 5))
+            strength = rng.randint(1, 4)
+            before = dict(planner.beacons)
+            cost = planner.cost(path, strength)
+            if planner.add(path, strength):
+                expected = dict(before)
+                for i in path:
+                    expected[i] = max(expected.get(i, 0), strength)
+                assert planner.beacons == expected
+                assert sum(expected.values()) - sum(before.values()) == cost
+            else:
+                assert planner.beacons == before
+            assert planner.total == sum(planner.beacons.values()) <= planner.budget
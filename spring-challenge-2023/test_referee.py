@@ -0,0 +1,83 @@
+import numpy as np
+
+from referee import CRYSTAL, EGG, EMPTY, Referee
+
+# 手で作った 7 セルのマップ、基地は 0 と 4
+#
+#   0 - 1 - 2 - 3 - 4     1 と 3 もつながる
+#   |       |
+#   6 ----- 5
+EDGES = [(0, 1), (1, 2), (2, 3), (3, 4), (1, 3), (0, 6), (6, 5), (5, 2)]
+
+
+def neighbors_of(n, edges):
+    rows = [[] for _ in range(n)]
+    for a, b in edges:
+        rows[a].append(b)
+        rows[b].append(a)
+    return [row + [-1] * (6 - len(row)) for row in rows]
+
+
+class HandReferee(Referee):
+    """The referee on a fixed map instead of a generated one."""
+
+    def __init__(self, neighbors, types, resources, bases, ants):
+        self.map = neighbors, types, resources, bases, ants
+        super().__init__()
+
+    def _generate(self):
+        neighbors, types, resources, bases, ants = self.map
+        self.neighbors = neighbors
+        self.types = types
+        self.resources = np.array(resources, dtype=np.int64)
+        self.bases = bases
+        self.ants = np.array(ants, dtype=np.int64)
+
+
+def hand_referee():
+    return HandReferee(
+        neighbors_of(7, EDGES),
+        [EMPTY, CRYSTAL, CRYSTAL, EMPTY, EMPTY, EGG, EMPTY],
+        [0, 4, 6, 0, 0, 3, 0],
+        [[0], [4]],
+        [[8, 6, 5, 0, 0, 2, 2], [0, 7, 5, 9, 9, 0, 0]],
+    )
+
+
+def test_chains_on_hand_built_map():
+    referee = hand_referee()
+    # 0 から 2 へは 1 を通れば 5、5 を回ると 2
+    assert referee._chains(referee.ants[0], [0]).tolist() == [8, 6, 5, 0, 0, 2, 2]
+    # 4 から 1 へは 3 から直に 7
+    assert referee._chains(referee.ants[1], [4]).tolist() == [0, 7, 5, 9, 9, 0, 0]
+    # 基地に蟻がいなければどこにも届かない
+    assert referee._chains(np.array([0, 6, 5, 0, 0, 2, 2]), [0]).tolist() == [0] * 7
+    # 1 を除くと 0 からは 6 と 5 を回るしかない
+    assert referee._chains(np.array([8, 0, 5, 0, 0, 2, 2]), [0]).tolist() == [8, 0, 2, 0, 0, 2, 2]
+
+
+def test_harvest_on_hand_built_map():
+    referee = hand_referee()
+    referee._harvest()
+    # 1 は相手の攻撃の鎖 7 が 6 より強いので塞がれ、0 の収穫の鎖は 2 まで 2 しかない。
+    # 2 の 6 個は 2 と 5 を求められて足りない、半分以下の 2 はそのまま、相手は残りの 4
+    assert referee.scores == [2, 4 + 4]
+    assert referee.resources.tolist() == [0, 0, 0, 0, 0, 1, 0]
+    # 卵の 2 個が基地で孵る
+    assert referee.ants[0].tolist() == [10, 6, 5, 0, 0, 2, 2]
+    assert referee.ants[1].tolist() == [0, 7, 5, 9, 9, 0, 0]
+
+
+def test_short_cell_split_in_half():
+    # 0 - 1 - 2 の一列、両者とも 1 まで強さ 3 の鎖で 5 個を取り合う
+    referee = HandReferee(
+        neighbors_of(3, [(0, 1), (1, 2)]),
+        [EMPTY, CRYSTAL, EMPTY],
+        [0, 5, 0],
+        [[0], [2]],
+        [[4, 3, 0], [0, 3, 4]],
+    )
+    referee._harvest()
+    # どちらも半分より多く求めるので 2 ずつ、奇数の 1 個は残る
+    assert referee.scores == [2, 2]
+    assert referee.resources.tolist() == [0, 1, 0]
@@ -0,0 +1,36 @@
+import os
+import sys
+
+from common import profiling, recorder, replay
+from common.match import FIRST_TURN_TIMEOUT, BotProcess, bot_command
+from referee import Referee
+
+HERE: str = os.path.dirname(os.path.abspath(__file__))
+TURNS: int = 8
+
+
+def record(bot: str, path: str):
+    """Play a few turns of the bot against a player that only waits, recording its I/O."""
+    referee = Referee(0)
+    process = BotProcess(bot_command(bot), {recorder.ENV_VAR: path})
+    try:
+        process.send(referee.initial_input(0))
+        for _ in range(TURNS):
+            process.send(referee.turn_input(0))
+            referee.play_turn([process.receive(Referee.ACTION_LINES, FIRST_TURN_TIMEOUT), ["WAIT"]])
+    finally:
+        process.close()
+
+
+def test_replay_matches_recording(tmp_path, monkeypatch):
+    bot = os.path.join(HERE, "main.py")
+    path = str(tmp_path / "game.rec")
+    record(bot, path)
+    frames = recorder.load(path)
+    assert len(frames) == TURNS
+    # 計測を有効にして、install が差し込む包みも一緒に通す
+    monkeypatch.setenv(profiling.ENV_VAR, f"1:{tmp_path / 'profile.txt'}")
+    # replay.py は fd 0 を差し替えて読ませる、pytest の sys.stdin には fileno がない
+    monkeypatch.setattr(sys, "stdin", sys.__stdin__)
+    output = replay.drive(bot, frames)
+    assert replay.first_mismatch(frames, output) is None